@@ -0,0 +1,34 @@
+"""
+Compare the single-pass inline tokenizer with the five-pass pipeline.
+
+Usage: python3 bench/bench_inline.py [repeat]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from inline_markdown import text_to_textnodes, text_to_textnodes_multipass
+
+
+def link_dense_paragraph(links: int) -> str:
+    return " ".join(
+        f"see [link {i}](/blog/{i}) and ![img {i}](/images/{i}.png) with **bold {i}** text"
+        for i in range(links)
+    )
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"{'links':>8} {'multipass ms':>14} {'single-pass ms':>15} {'speedup':>8}")
+    for links in (10, 100, 1000, 5000):
+        text = link_dense_paragraph(links)
+        assert text_to_textnodes(text) == text_to_textnodes_multipass(text)
+        old = min(timeit.repeat(lambda: text_to_textnodes_multipass(text), number=1, repeat=repeat))
+        new = min(timeit.repeat(lambda: text_to_textnodes(text), number=1, repeat=repeat))
+        print(f"{links:>8} {old * 1000:>14.2f} {new * 1000:>15.2f} {old / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Reproducible synthetic markdown corpora for the benchmarks.
+
+Every generator takes a `random.Random` so the same seed always yields
+byte-identical documents.
+"""
+import os
+import random
+
+WORDS = (
+    "the ring of power was forged in the fires of mount doom by sauron lord "
+    "of mordor elves dwarves and men received rings while hobbits lived "
+    "quietly in the shire until gandalf arrived with news of the enemy"
+).split()
+
+
+def sentence(rng: random.Random, words: int = 12) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def inline_paragraph(rng: random.Random, sentences: int = 4) -> str:
+    """A paragraph mixing plain text with bold, italic, code and a link."""
+    parts = []
+    for i in range(sentences):
+        text = sentence(rng)
+        match i % 4:
+            case 1:
+                text = f"{text} **{rng.choice(WORDS)}**"
+            case 2:
+                text = f"{text} _{rng.choice(WORDS)}_ and `{rng.choice(WORDS)}()`"
+            case 3:
+                text = f"{text} [{rng.choice(WORDS)}](/blog/{rng.choice(WORDS)})"
+        parts.append(text)
+    return " ".join(parts)
+
+
+def link_heavy_paragraph(rng: random.Random, links: int = 200) -> str:
+    """One long paragraph where almost every token is a link or an image."""
+    parts = []
+    for i in range(links):
+        word = rng.choice(WORDS)
+        if i % 5 == 0:
+            parts.append(f"![{word}](/images/{word}-{i}.png)")
+        else:
+            parts.append(f"[{word} {i}](/blog/{word}/{i})")
+    return " ".join(parts)
+
+
+def nested_quote(rng: random.Random, depth: int = 50, lines: int = 40) -> str:
+    """A quote block whose lines carry up to `depth` levels of '>' markers."""
+    return "\n".join(
+        f"{'> ' * (1 + i % depth)}{sentence(rng)}" for i in range(lines)
+    )
+
+
+def code_block(rng: random.Random, lines: int = 2000) -> str:
+    body = "\n".join(
+        f"    value_{i} = compute({rng.choice(WORDS)!r}, **options)  # {sentence(rng, 4)}"
+        for i in range(lines)
+    )
+    return f"```\n{body}\n```"
+
+
+def small_page(rng: random.Random, index: int) -> str:
+    blocks = [f"# Page {index}: {sentence(rng, 4)}"]
+    for _ in range(rng.randint(3, 8)):
+        kind = rng.random()
+        if kind < 0.55:
+            blocks.append(inline_paragraph(rng))
+        elif kind < 0.7:
+            blocks.append(f"## {sentence(rng, 5)}")
+        elif kind < 0.82:
+            blocks.append("\n".join(f"- {inline_paragraph(rng, 1)}" for _ in range(rng.randint(2, 6))))
+        elif kind < 0.9:
+            blocks.append("\n".join(f"{n}. {sentence(rng)}" for n in range(1, rng.randint(3, 6))))
+        elif kind < 0.96:
+            blocks.append(f"> {sentence(rng)}\n> {sentence(rng)}")
+        else:
+            blocks.append(code_block(rng, rng.randint(3, 15)))
+    return "\n\n".join(blocks) + "\n"
+
+
+def large_document(rng: random.Random, target_bytes: int = 5 * 1024 * 1024) -> str:
+    """A single document of roughly `target_bytes` made of mixed blocks."""
+    blocks = ["# Large reference document"]
+    size = len(blocks[0])
+    i = 0
+    while size < target_bytes:
+        match i % 10:
+            case 0:
+                block = f"## Section {i}"
+            case 3:
+                block = "\n".join(f"- {inline_paragraph(rng, 1)}" for _ in range(5))
+            case 6:
+                block = code_block(rng, 20)
+            case 8:
+                block = nested_quote(rng, depth=5, lines=4)
+            case _:
+                block = inline_paragraph(rng, 6)
+        blocks.append(block)
+        size += len(block) + 2
+        i += 1
+    return "\n\n".join(blocks) + "\n"
+
+
+def generate_corpus(seed: int = 0, scale: float = 1.0) -> dict[str, list[str]]:
+    """
+    Build every corpus the suite measures. `scale` shrinks counts and sizes
+    proportionally for quick runs (scale=1.0 is the full 10k-page corpus).
+    """
+    rng = random.Random(seed)
+    return {
+        "small_pages": [small_page(rng, i) for i in range(max(1, int(10_000 * scale)))],
+        "large_documents": [large_document(rng, max(64 * 1024, int(5 * 1024 * 1024 * scale))) for _ in range(3)],
+        "link_heavy": [link_heavy_paragraph(rng, max(10, int(2_000 * scale))) for _ in range(10)],
+        "nested_quotes": [nested_quote(rng, depth=100, lines=max(10, int(2_000 * scale))) for _ in range(10)],
+        "code_blocks": [code_block(rng, max(10, int(20_000 * scale))) for _ in range(5)],
+    }
+
+
+def write_site(pages: list[str], content_dir: str):
+    """Lay `pages` out as content/<n>/index.md, the structure main.py builds."""
+    for i, page in enumerate(pages):
+        page_dir = os.path.join(content_dir, f"page-{i:05d}")
+        os.makedirs(page_dir, exist_ok=True)
+        with open(os.path.join(page_dir, "index.md"), "w", encoding="utf-8") as f:
+            f.write(page)
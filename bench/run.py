@@ -0,0 +1,174 @@
+"""
+Benchmark suite: times each parsing/rendering stage and the full build on
+synthetic corpora, and prints the results as JSON.
+
+Usage:
+    python3 bench/run.py [--scale 0.1] [--repeat 3] [--jobs 1] [--engine tree] [--output results.json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from block_markdown import (
+    BlockType, block_to_block_type, markdown_to_blocks, markdown_to_html_node, markdown_to_typed_blocks,
+)
+from fast_render import ENGINES, markdown_to_html
+from generate_content import generate_pages_recursive
+from parallel_render import markdown_to_html_parallel
+from inline_markdown import text_to_textnodes
+from corpus import generate_corpus, write_site
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "template.html")
+
+
+def best_of(repeat: int, func) -> list[float]:
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - start)
+    return runs
+
+
+def result(runs: list[float], items: int, size: int) -> dict:
+    best = min(runs)
+    return {
+        "seconds": best,
+        "runs": runs,
+        "items": items,
+        "bytes": size,
+        "mb_per_second": size / best / 1e6 if best else None,
+    }
+
+
+def bench_stages(corpus: dict, repeat: int) -> dict:
+    documents = corpus["small_pages"] + corpus["large_documents"] + corpus["nested_quotes"] + corpus["code_blocks"]
+    doc_bytes = sum(len(doc) for doc in documents)
+    results = {}
+
+    runs = best_of(repeat, lambda: [markdown_to_blocks(doc) for doc in documents])
+    results["markdown_to_blocks"] = result(runs, len(documents), doc_bytes)
+
+    runs = best_of(repeat, lambda: [markdown_to_typed_blocks(doc) for doc in documents])
+    results["markdown_to_typed_blocks"] = result(runs, len(documents), doc_bytes)
+
+    blocks = [block for doc in documents for block in markdown_to_blocks(doc)]
+    runs = best_of(repeat, lambda: [block_to_block_type(block) for block in blocks])
+    results["block_to_block_type"] = result(runs, len(blocks), sum(len(b) for b in blocks))
+
+    inline_texts = [" ".join(block.split("\n")) for block in blocks
+                    if block_to_block_type(block) == BlockType.PARAGRAPH]
+    inline_texts += corpus["link_heavy"]
+    runs = best_of(repeat, lambda: [text_to_textnodes(text) for text in inline_texts])
+    results["text_to_textnodes"] = result(runs, len(inline_texts), sum(len(t) for t in inline_texts))
+
+    trees = [markdown_to_html_node(doc) for doc in documents]
+    runs = best_of(repeat, lambda: [tree.to_html() for tree in trees])
+    results["ParentNode.to_html"] = result(runs, len(trees), doc_bytes)
+
+    # Whole markdown -> HTML string, per engine
+    runs = best_of(repeat, lambda: [markdown_to_html_node(doc).to_html() for doc in documents])
+    results["engine.tree"] = result(runs, len(documents), doc_bytes)
+    runs = best_of(repeat, lambda: [markdown_to_html(doc) for doc in documents])
+    results["engine.fast"] = result(runs, len(documents), doc_bytes)
+    return results
+
+
+def bench_memory(corpus: dict, repeat: int) -> dict:
+    """
+    Time to build the node trees (TextNode/LeafNode/ParentNode) for the
+    small-page corpus, plus the peak traced memory and the live allocated
+    blocks while holding all of them.
+    """
+    documents = corpus["small_pages"]
+    runs = best_of(repeat, lambda: [markdown_to_html_node(doc) for doc in documents])
+
+    tracemalloc.start()
+    blocks_before = sys.getallocatedblocks()
+    trees = [markdown_to_html_node(doc) for doc in documents]
+    blocks_after = sys.getallocatedblocks()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del trees
+
+    report = result(runs, len(documents), sum(len(doc) for doc in documents))
+    report["peak_bytes"] = peak
+    report["live_blocks"] = blocks_after - blocks_before
+    return report
+
+
+def bench_parallel(documents: list[str], repeat: int, jobs: int) -> dict:
+    """One huge document at a time, its blocks rendered across `jobs` processes."""
+    runs = best_of(repeat, lambda: [markdown_to_html_parallel(doc, jobs=jobs) for doc in documents])
+    return result(runs, len(documents), sum(len(doc) for doc in documents))
+
+
+def bench_build(pages: list[str], repeat: int, jobs: int, engine: str = "tree") -> dict:
+    with tempfile.TemporaryDirectory() as root:
+        content_dir = os.path.join(root, "content")
+        write_site(pages, content_dir)
+        runs = []
+        for i in range(repeat):
+            dest_dir = os.path.join(root, f"docs-{i}")
+            start = time.perf_counter()
+            # The build prints one line per page; keep the JSON output clean
+            with contextlib.redirect_stdout(io.StringIO()):
+                failures = generate_pages_recursive(content_dir, TEMPLATE_PATH, dest_dir, "/", jobs=jobs,
+                                                    engine=engine)
+            runs.append(time.perf_counter() - start)
+            if failures:
+                raise RuntimeError(f"{failures} page(s) failed to build")
+    return result(runs, len(pages), sum(len(page) for page in pages))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="shrink the corpus for quick runs (1.0 = 10k pages, 5 MB documents)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--jobs", type=int, default=1, help="worker processes for the full build")
+    parser.add_argument("--engine", choices=ENGINES, default="tree", help="render engine for the full build")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    corpus = generate_corpus(args.seed, args.scale)
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "scale": args.scale,
+            "repeat": args.repeat,
+            "jobs": args.jobs,
+            "engine": args.engine,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": bench_stages(corpus, args.repeat),
+    }
+    report["results"]["node_memory"] = bench_memory(corpus, args.repeat)
+    if args.jobs > 1:
+        report["results"]["markdown_to_html_parallel"] = bench_parallel(corpus["large_documents"], args.repeat,
+                                                                        args.jobs)
+    report["results"]["generate_pages_recursive"] = bench_build(corpus["small_pages"], args.repeat, args.jobs,
+                                                                       args.engine)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,10 @@
 #!/bin/bash
 
+# Development server: pages are rendered when requested, nothing is built to docs/
 if [[ "$OSTYPE" == "cygwin" || "$OSTYPE" == "msys" || "$OSTYPE" == "win32" ]]; then
   # Windows
-  python src/main.py
+  python src/main.py serve --port 8888
 else
   # Linux/macOS
-  python3 src/main.py
+  python3 src/main.py serve --port 8888
 fi
-
-
-if [[ "$OSTYPE" == "cygwin" || "$OSTYPE" == "msys" || "$OSTYPE" == "win32" ]]; then
-  # Windows
-  cd docs && python -m http.server 8888
-else
-  # Linux/macOS
-  cd docs && python3 -m http.server 8888
-fi
-
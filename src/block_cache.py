@@ -0,0 +1,119 @@
+from collections import OrderedDict
+from state_file import load_state, save_state
+
+
+# Bump whenever a change to the block parsers alters their HTML output,
+# so cached fragments from older builds are never reused
+PARSER_VERSION = 1
+
+
+class BlockCache:
+    """
+    Bounded LRU of rendered block HTML, keyed by parser version, basepath
+    and the block's markdown text. Pages that share blocks verbatim (footers,
+    disclaimers, repeated snippets) only parse them once per build.
+
+    A `max_size` of 0 disables the cache. A pool worker configured with
+    `track=True` also records what it adds, so the parent can `merge` each
+    worker's `drain` into its own cache, counters included.
+    """
+
+    def __init__(self, max_size: int = 0, path: str = None):
+        self.max_size = max_size
+        self.path = path
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.fresh = None  # Entries put since the last `drain`, when tracking
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def configure(self, max_size: int, path: str = None, track: bool = False):
+        """
+        Resize the cache and, if `path` is given, load what a previous build
+        persisted. Reconfiguring with the same settings keeps the entries
+        (a long-lived process stays warm) and only resets the counters.
+        """
+        self.hits = self.misses = 0
+        self.fresh = [] if track else None
+        if self.entries and (max_size, path) == (self.max_size, self.path):
+            return
+        self.max_size = max_size
+        self.path = path
+        self.entries.clear()
+        if path is not None and self.enabled:
+            self.load()
+
+    def get(self, block: str, basepath: str):
+        key = (PARSER_VERSION, basepath, block)
+        html = self.entries.get(key)
+        if html is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return html
+
+    def put(self, block: str, basepath: str, html: str):
+        key = (PARSER_VERSION, basepath, block)
+        self.entries[key] = html
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+        if self.fresh is not None:
+            self.fresh.append((basepath, block, html))
+
+    def drain(self) -> tuple[list, int, int]:
+        """
+        Return (entries put, hits, misses) since the last drain and start
+        over. Empty unless the cache was configured with `track=True`.
+        """
+        if self.fresh is None:
+            return [], 0, 0
+        updates = (self.fresh, self.hits, self.misses)
+        self.fresh = []
+        self.hits = self.misses = 0
+        return updates
+
+    def merge(self, updates: tuple[list, int, int]):
+        """Add what another process's cache `drain`ed: its entries and its counters."""
+        entries, hits, misses = updates
+        for basepath, block, html in entries:
+            self.put(block, basepath, html)
+        self.hits += hits
+        self.misses += misses
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def load(self):
+        data = load_state(self.path, {})
+        if data.get("version") != PARSER_VERSION:
+            return  # Rendered by a different parser: start cold
+        entries = data.get("entries")
+        if not isinstance(entries, list) or not all(
+                isinstance(entry, list) and len(entry) == 3 and all(isinstance(part, str) for part in entry)
+                for entry in entries):
+            return  # Not written by `save`: start cold
+        for basepath, block, html in entries[-self.max_size:]:
+            self.entries[(PARSER_VERSION, basepath, block)] = html
+
+    def save(self):
+        if self.path is None or not self.enabled:
+            return
+        # Least recently used first, so loading preserves the eviction order
+        entries = [[basepath, block, html] for (_, basepath, block), html in self.entries.items()]
+        save_state(self.path, {"version": PARSER_VERSION, "entries": entries})
+
+
+# Per-process cache used by generate_page; disabled until configured
+block_cache = BlockCache()
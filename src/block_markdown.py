@@ -1,6 +1,8 @@
+from collections import namedtuple
+from collections.abc import Iterable, Iterator
 from enum import Enum
 import re
-from html_node import HTMLNode, ParentNode
+from html_node import HTMLNode, ParentNode, RawHTMLNode, write_html
 from text_node import TextNode, TextType, text_node_to_html_node
 from inline_markdown import text_to_textnodes
 
@@ -14,46 +16,96 @@ class BlockType(Enum):
     ORDERED_LIST = "ordered_list"
 
 # Precompile patterns as constants; compile patterns only once
+HEADING_PATTERN = re.compile(r"^#{1,6}\s.+")
+QUOTE_PATTERN = re.compile(r"^>\s[^\s].+")
+ULIST_PATTERN = re.compile(r"^-\s[^\s].+")
+OLIST_PATTERN = re.compile(r"^\d+\.\s[^\s].+")
+
 PATTERNS = {
-    re.compile(r"^#{1,6}\s.+"): BlockType.HEADING,
-    re.compile(r"^>\s[^\s].+"): BlockType.QUOTE,
-    re.compile(r"^-\s[^\s].+"): BlockType.UNORDERED_LIST,
-    re.compile(r"^\d+\.\s[^\s].+"): BlockType.ORDERED_LIST,
+    HEADING_PATTERN: BlockType.HEADING,
+    QUOTE_PATTERN: BlockType.QUOTE,
+    ULIST_PATTERN: BlockType.UNORDERED_LIST,
+    OLIST_PATTERN: BlockType.ORDERED_LIST,
+}
+
+# Every pattern requires a specific first character, so a block only has
+# to be tried against the one its first line starts with
+PATTERNS_BY_FIRST_CHAR = {
+    "#": (HEADING_PATTERN, BlockType.HEADING),
+    ">": (QUOTE_PATTERN, BlockType.QUOTE),
+    "-": (ULIST_PATTERN, BlockType.UNORDERED_LIST),
 }
 
+# A block as produced by `scan_blocks`: its type, its raw lines and the
+# line number of the first one
+Block = namedtuple("Block", ["type", "lines", "start"], defaults=(None,))
+
+
 def block_to_block_type(md_block: str) -> BlockType: 
     """Determine the block type of a given Markdown block."""
+    return classify_block_lines(md_block.split("\n"))
+
+
+def classify_block_lines(lines: list[str]) -> BlockType:
+    """Determine the block type from a block's lines, without joining them."""
+    first_line = lines[0]
     # Special case for code blocks
-    if md_block.startswith("```") and md_block.endswith("```"):
+    if first_line.startswith("```") and lines[-1].endswith("```"):
         return BlockType.CODE
-    
-    # Check first line against patterns
-    first_line = md_block.split('\n', 1)[0]
 
-    for pattern, block_type in PATTERNS.items():
-        if pattern.match(first_line):
-            return block_type
-    
-    return BlockType.PARAGRAPH
+    # Check the first line against the pattern for its first character
+    first_char = first_line[:1]
+    if first_char in PATTERNS_BY_FIRST_CHAR:
+        pattern, block_type = PATTERNS_BY_FIRST_CHAR[first_char]
+    elif first_char.isdecimal():  # What \d matches
+        pattern, block_type = OLIST_PATTERN, BlockType.ORDERED_LIST
+    else:
+        return BlockType.PARAGRAPH
+    return block_type if pattern.match(first_line) else BlockType.PARAGRAPH
 
 
 def markdown_to_blocks(markdown: str) -> list[str]:
     """
     Parses a Markdown document into a list of block elements.
     
-    Returns a list instead of a generator.
+    Returns a list; use `iter_blocks` to read blocks lazily from a file.
+    """
+    return list(iter_blocks(markdown.split("\n")))
+
+
+def iter_blocks(lines: Iterable[str]) -> Iterator[str]:
+    """Yield each block of `lines` as one string, like `markdown_to_blocks`."""
+    for block_lines in iter_block_lines(lines):
+        yield "\n".join(block_lines)
+
+
+def iter_block_lines(lines: Iterable[str]) -> Iterator[list[str]]:
     """
-    parsed_blocks = []  # Store parsed blocks
+    Group lines into blocks lazily, yielding each block's lines as soon as
+    it ends. `lines` may be an open file: only the current block is held in
+    memory. A trailing newline on each line is ignored, and text that ends
+    in a newline gets the final empty line `str.split("\n")` would give it,
+    so a file and the same text as a string are grouped identically.
+    """
+    for _, block_lines in iter_numbered_block_lines(lines):
+        yield block_lines
+
+
+def iter_numbered_block_lines(lines: Iterable[str], first_line: int = 1) -> Iterator[tuple[int, list[str]]]:
+    """Like `iter_block_lines`, but yields (line number of the block's first line, lines)."""
     temp_block = []   # Temporarily store lines of the current block
+    start = first_line
     inside_code_block = False
 
-    for line in markdown.split("\n"):
+    for number, line in enumerate(_split_lines(lines), first_line):
         # Handle code blocks
         if line.startswith("```"):  
             inside_code_block = not inside_code_block  # Toggle code block state
+            if not temp_block:
+                start = number
             temp_block.append(line)
             if not inside_code_block:  # If code block just ended, store it
-                parsed_blocks.append("\n".join(temp_block))
+                yield start, temp_block
                 temp_block = []
             continue
 
@@ -64,68 +116,182 @@ def markdown_to_blocks(markdown: str) -> list[str]:
         # If we hit an empty line and there's something in the block, save it
         if not line.strip():
             if temp_block:
-                parsed_blocks.append("\n".join(temp_block))
+                yield start, temp_block
                 temp_block = []
             continue
         
         #If not code blocks or empty lies, just append the line.
+        if not temp_block:
+            start = number
         temp_block.append(line)
 
     if temp_block:  # Store any remaining block
-        parsed_blocks.append("\n".join(temp_block))
+        yield start, temp_block
+
+
+def _split_lines(lines: Iterable[str]) -> Iterator[str]:
+    line = None
+    for line in lines:
+        yield line[:-1] if line.endswith("\n") else line
+    # "a\n".split("\n") is ["a", ""]; a file only yields "a\n"
+    if line is not None and line.endswith("\n"):
+        yield ""
+
+
+def scan_blocks(lines: Iterable[str], first_line: int = 1) -> Iterator[Block]:
+    """
+    Split `lines` into blocks and classify each one as it is read, yielding
+    `Block(type, lines, start)` records, numbering lines from `first_line`.
+    The lines are handed to the builders as they are, so no block is joined
+    into a string and split again.
+    """
+    for start, block_lines in iter_numbered_block_lines(lines, first_line):
+        yield Block(classify_block_lines(block_lines), block_lines, start)
 
-    return parsed_blocks
 
+def markdown_to_typed_blocks(markdown: str, first_line: int = 1) -> list[Block]:
+    """Like `markdown_to_blocks`, but returns typed `Block` records."""
+    return list(scan_blocks(markdown.split("\n"), first_line))
 
-def markdown_to_html_node(markdown: str) -> ParentNode:
-    blocks = markdown_to_blocks(markdown)
+
+def markdown_to_html_node(markdown: str, basepath: str = "/", cache=None) -> ParentNode:
+    """
+    Convert a markdown document into a <div> node tree. Root-relative link
+    and image URLs are prefixed with `basepath` as they are produced.
+
+    With a `BlockCache`, blocks rendered before are reused as pre-rendered
+    fragments instead of being parsed again.
+    """
+    return blocks_to_html_node(markdown_to_typed_blocks(markdown), basepath, cache)
+
+
+def blocks_to_html_node(blocks: Iterable[Block], basepath: str = "/", cache=None, facts=None) -> ParentNode:
+    """
+    The <div> node tree of typed blocks. With a `PageFacts`, the links of
+    every block are collected from the same inline parse (see `page_facts`).
+    """
     children = []
     for block in blocks:
-        html_node = block_to_html_node(block)
+        if cache is None:
+            html_node = typed_block_to_html_node(block, basepath, facts)
+        else:
+            # The cache is keyed by the block's text, as it was written
+            text = "\n".join(block.lines)
+            html = cache.get(text, basepath)
+            if html is None:
+                html = typed_block_to_html_node(block, basepath, facts).to_html()
+                cache.put(text, basepath, html)
+            elif facts is not None:
+                facts.add_block(block)
+            html_node = RawHTMLNode(html)
         children.append(html_node)
     return ParentNode("div", children, None)
 
 
-def block_to_html_node(block: str) -> ParentNode:
-    block_type = block_to_block_type(block)
-    match block_type:
+def write_markdown_html(lines: Iterable[str], sink, basepath: str = "/", cache=None, facts=None,
+                        first_line: int = 1):
+    """
+    Streaming counterpart of `markdown_to_html_node(...).to_html()`: read
+    blocks lazily from `lines` and write each one to `sink` as soon as it is
+    converted, so memory is bounded by the largest single block. `lines`
+    are numbered from `first_line` for the links collected in `facts`.
+    """
+    empty = True
+    for block in scan_blocks(lines, first_line):
+        if empty:
+            sink.write("<div>")
+            empty = False
+        if cache is None:
+            write_html(typed_block_to_html_node(block, basepath, facts), sink)
+            continue
+        text = "\n".join(block.lines)
+        html = cache.get(text, basepath)
+        if html is None:
+            html = typed_block_to_html_node(block, basepath, facts).to_html()
+            cache.put(text, basepath, html)
+        elif facts is not None:
+            facts.add_block(block)
+        sink.write(html)
+    if empty:
+        raise ValueError("invalid HTML: no children")
+    sink.write("</div>")
+
+
+def block_to_html_node(block: str, basepath: str = "/") -> ParentNode:
+    lines = block.split("\n")
+    return typed_block_to_html_node(Block(classify_block_lines(lines), lines), basepath)
+
+
+def typed_block_to_html_node(block: Block, basepath: str = "/", facts=None) -> ParentNode:
+    if facts is not None:
+        facts.begin_block(block)
+    match block.type:
+        case BlockType.PARAGRAPH:
+            return paragraph_lines_to_html_node(block.lines, basepath, facts)
+        case BlockType.HEADING:
+            return heading_to_html_node("\n".join(block.lines), basepath, facts)
+        case BlockType.CODE:
+            return code_to_html_node("\n".join(block.lines))
+        case BlockType.QUOTE:
+            return quote_lines_to_html_node(block.lines, basepath, facts)
+        case BlockType.UNORDERED_LIST:
+            return ulist_lines_to_html_node(block.lines, basepath, facts)
+        case BlockType.ORDERED_LIST:
+            return olist_lines_to_html_node(block.lines, basepath, facts)
+        case _:
+            raise ValueError(f"Unknown block type: {block.type}")
+
+
+def block_to_textnodes(block: Block) -> list[TextNode]:
+    """
+    The inline `TextNode`s of a block with its block markup (#, >, list
+    markers, code fences) stripped, split exactly as the HTML builders do.
+    A code block is a single CODE node.
+    """
+    match block.type:
         case BlockType.PARAGRAPH:
-            return paragraph_to_html_node(block)
+            return text_to_textnodes(" ".join(block.lines))
         case BlockType.HEADING:
-            return heading_to_html_node(block)
+            text = "\n".join(block.lines)
+            return text_to_textnodes(text[text.count("#", 0, 7) + 1:])
         case BlockType.CODE:
-            return code_to_html_node(block)
+            return [TextNode("\n".join(block.lines)[4:-3], TextType.CODE)]
         case BlockType.QUOTE:
-            return quote_to_html_node(block)
+            return text_to_textnodes(" ".join(line.lstrip(">").strip() for line in block.lines))
         case BlockType.UNORDERED_LIST:
-            return ulist_to_html_node(block)
+            return [node for item in block.lines for node in text_to_textnodes(item[2:])]
         case BlockType.ORDERED_LIST:
-            return olist_to_html_node(block)
+            return [node for item in block.lines for node in text_to_textnodes(item[3:])]
         case _:
-            raise ValueError(f"Unknown block type: {block_type}")
+            raise ValueError(f"Unknown block type: {block.type}")
 
 
-def text_to_children(text: str) -> list[HTMLNode]:
+def text_to_children(text: str, basepath: str = "/", facts=None) -> list[HTMLNode]:
     text_nodes = text_to_textnodes(text)
     children = []
     for text_node in text_nodes:
-        html_node = text_node_to_html_node(text_node)
+        if facts is not None:
+            facts.add_token(text_node.text, text_node.text_type, text_node.url)
+        html_node = text_node_to_html_node(text_node, basepath)
         children.append(html_node)
     return children
 
 
-def paragraph_to_html_node(block):
-    lines = block.split("\n")
+def paragraph_to_html_node(block, basepath="/"):
+    return paragraph_lines_to_html_node(block.split("\n"), basepath)
+
+
+def paragraph_lines_to_html_node(lines, basepath="/", facts=None):
     paragraph = " ".join(lines)
-    children = text_to_children(paragraph)
+    children = text_to_children(paragraph, basepath, facts)
     return ParentNode("p", children)
 
 
-def heading_to_html_node(block: str) -> ParentNode:
+def heading_to_html_node(block: str, basepath: str = "/", facts=None) -> ParentNode:
     # Headings are wrapped in <h1> to <h6> tags based on the number of #
     heading_level = block.count("#", 0, 7)
     text = block[heading_level + 1 :]
-    children = text_to_children(text)
+    children = text_to_children(text, basepath, facts)
     return ParentNode(f"h{heading_level}", children)
 
 
@@ -137,33 +303,42 @@ def code_to_html_node(block):
     return ParentNode("pre", [code])
 
 
-def olist_to_html_node(block):
-    items = block.split("\n")
+def olist_to_html_node(block, basepath="/"):
+    return olist_lines_to_html_node(block.split("\n"), basepath)
+
+
+def olist_lines_to_html_node(items, basepath="/", facts=None):
     html_items = []
     for item in items:
         text = item[3:]
-        children = text_to_children(text)
+        children = text_to_children(text, basepath, facts)
         html_items.append(ParentNode("li", children))
     return ParentNode("ol", html_items)
 
 
-def ulist_to_html_node(block):
-    items = block.split("\n")
+def ulist_to_html_node(block, basepath="/"):
+    return ulist_lines_to_html_node(block.split("\n"), basepath)
+
+
+def ulist_lines_to_html_node(items, basepath="/", facts=None):
     html_items = []
     for item in items:
         text = item[2:]
-        children = text_to_children(text)
+        children = text_to_children(text, basepath, facts)
         html_items.append(ParentNode("li", children))
     return ParentNode("ul", html_items)
 
 
-def quote_to_html_node(block):
-    lines = block.split("\n")
+def quote_to_html_node(block, basepath="/"):
+    return quote_lines_to_html_node(block.split("\n"), basepath)
+
+
+def quote_lines_to_html_node(lines, basepath="/", facts=None):
     new_lines = []
     for line in lines:
         if not line.startswith(">"):
             raise ValueError("invalid quote block")
         new_lines.append(line.lstrip(">").strip())
     content = " ".join(new_lines)
-    children = text_to_children(content)
+    children = text_to_children(content, basepath, facts)
     return ParentNode("blockquote", children)
@@ -0,0 +1,46 @@
+"""
+Thin client for the build daemon started with `python3 src/main.py serve-build`.
+
+Forwards its arguments (basepath, --only paths and any other build option)
+to the daemon, prints the build output and exits with the build status.
+Imports nothing from the site generator, so it starts in milliseconds.
+
+Usage:
+    python3 src/build_client.py [--socket PATH] [basepath] [--only PATH ...] [build options]
+"""
+import argparse
+import json
+import os
+import socket
+import sys
+
+DEFAULT_SOCKET = os.path.join(".ssg-cache", "build.sock")
+
+
+def main(argv=None) -> int:
+    # Only --socket is the client's; everything else, -h included, is for the daemon's build
+    parser = argparse.ArgumentParser(prog="build_client.py", add_help=False, allow_abbrev=False,
+                                     usage="%(prog)s [--socket PATH] [basepath] [--only PATH ...] [build options]")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, metavar="PATH")
+    args, argv = parser.parse_known_args(sys.argv[1:] if argv is None else list(argv))
+    socket_path = args.socket
+
+    request = json.dumps({"cwd": os.getcwd(), "argv": argv}).encode("utf-8") + b"\n"
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(socket_path)
+            client.sendall(request)
+            with client.makefile("rb") as reply:
+                response = json.loads(reply.readline())
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f"No build daemon listening on {socket_path}; start one with: python3 src/main.py serve-build",
+              file=sys.stderr)
+        return 2
+
+    sys.stdout.write(response["output"])
+    print(f"Built in {response['elapsed_ms']:.1f} ms (daemon)")
+    return response["status"]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
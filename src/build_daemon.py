@@ -0,0 +1,71 @@
+import contextlib
+import io
+import json
+import os
+import socketserver
+import time
+import traceback
+
+
+class BuildDaemon(socketserver.UnixStreamServer):
+    """
+    Long-lived build server on a local Unix socket.
+
+    Every connection carries one request, a JSON line such as
+    {"cwd": "/path/to/site", "argv": ["/SSG/", "--only", "content/a.md"]},
+    and gets back one JSON reply {"status": 0, "output": "...", "elapsed_ms": 3.1}.
+    `run_build(argv)` does the work in this process, so imports, compiled
+    regexes, compiled templates and the block cache stay warm between
+    builds. Requests are served one at a time.
+    """
+
+    def __init__(self, socket_path, run_build):
+        self.socket_path = socket_path
+        self.run_build = run_build
+        dir_path = os.path.dirname(socket_path)
+        if dir_path != "":
+            os.makedirs(dir_path, exist_ok=True)
+        if os.path.exists(socket_path):
+            os.remove(socket_path)  # Left behind by a daemon that was killed
+        super().__init__(socket_path, BuildRequestHandler)
+
+    def handle_build(self, request: dict) -> dict:
+        start = time.perf_counter()
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            status = self.run_request(request)
+        return {
+            "status": status,
+            "output": output.getvalue(),
+            "elapsed_ms": (time.perf_counter() - start) * 1000,
+        }
+
+    def run_request(self, request: dict) -> int:
+        # Sources and outputs are relative paths: only serve the site we started in
+        if os.path.realpath(request.get("cwd", "")) != os.path.realpath(os.getcwd()):
+            print(f"This daemon builds {os.getcwd()}, not {request.get('cwd')}")
+            return 2
+        try:
+            return self.run_build(request.get("argv", [])) or 0
+        except SystemExit as e:
+            # argparse rejected the arguments (usage was printed)
+            return e.code if isinstance(e.code, int) else 1
+        except Exception:
+            traceback.print_exc()
+            return 1
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+
+class BuildRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+        except ValueError:
+            reply = {"status": 2, "output": "Malformed build request\n", "elapsed_ms": 0}
+        else:
+            reply = self.server.handle_build(request)
+        self.wfile.write(json.dumps(reply).encode("utf-8") + b"\n")
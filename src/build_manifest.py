@@ -0,0 +1,112 @@
+import hashlib
+import os
+from state_file import load_state, save_state
+
+
+def hash_text(*parts: str) -> str:
+    """Return a stable sha256 hex digest of the given strings."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")  # Separator so ("ab", "c") != ("a", "bc")
+    return digest.hexdigest()
+
+
+def file_digest(path: str) -> str:
+    """Return the sha256 hex digest of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    """
+    On-disk record of which output each source produced on the last build.
+
+    Every entry stores the output path, a digest of the build context
+    (template and basepath), the source digest and its stat stamp. A source
+    whose stamp is unchanged is never re-read, so checking an unchanged site
+    only costs one stat per file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries = {}
+        self.seen = set()
+
+    @classmethod
+    def load(cls, path: str) -> "BuildManifest":
+        manifest = cls(path)
+        # Missing or corrupt manifest: everything is rebuilt
+        manifest.entries = load_state(path, {})
+        return manifest
+
+    def save(self):
+        save_state(self.path, self.entries, indent=1, sort_keys=True)
+
+    def needs_build(self, source: str, output: str, context: str) -> bool:
+        """Return True if `source` must be regenerated into `output`."""
+        source, output = str(source), str(output)
+        self.seen.add(source)
+        entry = self.entries.get(source)
+        if (entry is None
+                or entry["context"] != context
+                or entry["output"] != output
+                or not os.path.exists(output)):
+            return True
+
+        stat = os.stat(source)
+        if entry["mtime"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            return False
+
+        # Touched but maybe not modified: compare contents before rebuilding
+        if entry["digest"] == file_digest(source):
+            entry["mtime"] = stat.st_mtime_ns
+            entry["size"] = stat.st_size
+            return False
+        return True
+
+    def record(self, source: str, output: str, context: str):
+        """Remember that `source` was successfully built into `output`."""
+        source, output = str(source), str(output)
+        stat = os.stat(source)
+        self.seen.add(source)
+        self.entries[source] = {
+            "output": output,
+            "context": context,
+            "digest": file_digest(source),
+            "mtime": stat.st_mtime_ns,
+            "size": stat.st_size,
+        }
+
+    def forget(self, source: str):
+        self.entries.pop(str(source), None)
+
+    def prune(self, root: str = None) -> list[str]:
+        """
+        Drop entries whose source was not seen in this build and delete
+        their outputs, along with any directories left empty below `root`.
+        Returns the removed output paths.
+        """
+        removed = []
+        for source in [s for s in self.entries if s not in self.seen]:
+            output = self.entries.pop(source)["output"]
+            if os.path.exists(output):
+                os.remove(output)
+                remove_empty_dirs(os.path.dirname(output), root)
+                removed.append(output)
+        return removed
+
+
+def remove_empty_dirs(dir_path: str, root: str = None):
+    """Remove `dir_path` and its parents while they are empty, stopping at `root`."""
+    stop = os.path.abspath(root) if root else None
+    dir_path = os.path.abspath(dir_path)
+    while dir_path != stop and dir_path != os.path.dirname(dir_path):
+        try:
+            os.rmdir(dir_path)
+        except OSError:
+            return  # Not empty (or not ours to remove)
+        dir_path = os.path.dirname(dir_path)
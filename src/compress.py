@@ -0,0 +1,110 @@
+import gzip
+import os
+from concurrent.futures import ThreadPoolExecutor
+from build_manifest import file_digest
+from state_file import load_state, save_state
+
+
+# Text outputs worth pre-compressing; images, fonts and archives already are
+COMPRESSIBLE_EXTENSIONS = {".html", ".htm", ".css", ".js", ".mjs", ".json", ".xml", ".svg", ".txt", ".map"}
+GZIP_SUFFIX = ".gz"
+
+
+class CompressSummary:
+    def __init__(self):
+        self.compressed = 0
+        self.unchanged = 0
+        self.skipped = 0
+        self.removed = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def __str__(self):
+        saved = 1 - self.bytes_out / self.bytes_in if self.bytes_in else 0.0
+        return (f"Gzip: {self.compressed} compressed, {self.unchanged} unchanged, "
+                f"{self.skipped} not worth it, {self.removed} removed "
+                f"({self.bytes_in / 1024:.1f} KiB -> {self.bytes_out / 1024:.1f} KiB, {saved:.0%} saved)")
+
+
+def is_compressible(path) -> bool:
+    return os.path.splitext(path)[1].lower() in COMPRESSIBLE_EXTENSIONS
+
+
+def precompress(dest_dir_path, state_path=None, max_workers=None, level=9) -> CompressSummary:
+    """
+    Write a `.gz` sidecar next to every compressible file under
+    `dest_dir_path`, so the server can send it as is instead of compressing
+    on every request.
+
+    The content digest of every file is kept in `state_path`, with whether
+    it got a sidecar; files whose digest is unchanged and whose sidecar
+    still exists (or that gzip could not shrink) are skipped. Sidecars whose
+    file is gone are removed. Compression runs on a thread pool (zlib
+    releases the GIL).
+    """
+    state = load_state(state_path, {}) if state_path is not None else {}
+    paths = []
+    orphans = []
+    for dir_path, _, filenames in os.walk(dest_dir_path):
+        for filename in filenames:
+            path = os.path.join(dir_path, filename)
+            source = path[:-len(GZIP_SUFFIX)]
+            if filename.endswith(GZIP_SUFFIX) and is_compressible(source):
+                # One of our sidecars: drop it if its file is gone
+                if not os.path.exists(source):
+                    orphans.append(path)
+            elif is_compressible(path):
+                paths.append(path)
+
+    summary = CompressSummary()
+    digests = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(lambda path: compress_file(path, state.get(path), level), paths)
+        for path, (status, entry, size_in, size_out) in zip(paths, results):
+            setattr(summary, status, getattr(summary, status) + 1)
+            digests[path] = entry
+            if entry["gzip"]:
+                summary.bytes_in += size_in
+                summary.bytes_out += size_out
+
+    for path in orphans:
+        os.remove(path)
+        summary.removed += 1
+
+    if state_path is not None:
+        save_state(state_path, digests, indent=1, sort_keys=True)
+    return summary
+
+
+def compress_file(path, previous=None, level=9) -> tuple[str, dict, int, int]:
+    """
+    Bring `path`.gz up to date. `previous` is the state entry of the last
+    build, {"digest": ..., "gzip": whether a sidecar was written}. Returns
+    (status, new entry, original size, compressed size), where status is
+    "compressed", "unchanged", or "skipped" when gzip would not make the
+    file smaller.
+    """
+    gz_path = path + GZIP_SUFFIX
+    digest = file_digest(path)
+    size_in = os.path.getsize(path)
+    if isinstance(previous, dict) and previous.get("digest") == digest:
+        if not previous.get("gzip"):
+            return "unchanged", previous, size_in, size_in  # Known not to shrink
+        if os.path.exists(gz_path):
+            return "unchanged", previous, size_in, os.path.getsize(gz_path)
+
+    with open(path, "rb") as f:
+        data = f.read()
+    # mtime=0 keeps the sidecar byte-identical across builds of the same file
+    compressed = gzip.compress(data, compresslevel=level, mtime=0)
+    if len(compressed) >= len(data):
+        if os.path.exists(gz_path):
+            os.remove(gz_path)
+        return "skipped", {"digest": digest, "gzip": False}, size_in, size_in
+
+    tmp_path = f"{gz_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(compressed)
+    os.replace(tmp_path, gz_path)
+    return "compressed", {"digest": digest, "gzip": True}, size_in, len(compressed)
+
@@ -0,0 +1,248 @@
+import io
+import json
+import os
+import sqlite3
+from collections import Counter, namedtuple
+from collections.abc import Iterator
+from build_manifest import hash_text
+from front_matter import parse_front_matter, split_front_matter
+from generate_content import discover_pages, extract_title_from_lines
+from page_facts import LinkRef, PageFacts, collect_facts
+
+
+# Bump when the schema or what is extracted changes; the index is then rebuilt
+INDEX_VERSION = 4
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    source TEXT PRIMARY KEY,
+    digest TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    output TEXT NOT NULL,
+    title TEXT,
+    date TEXT,
+    draft INTEGER NOT NULL,
+    layout TEXT,
+    meta TEXT NOT NULL,
+    parsed INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS page_tags (
+    source TEXT NOT NULL REFERENCES pages(source) ON DELETE CASCADE,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (source, tag)
+);
+CREATE TABLE IF NOT EXISTS page_links (
+    source TEXT NOT NULL REFERENCES pages(source) ON DELETE CASCADE,
+    line INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    url TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS page_terms (
+    source TEXT NOT NULL REFERENCES pages(source) ON DELETE CASCADE,
+    term TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (source, term)
+);
+CREATE INDEX IF NOT EXISTS page_links_by_source ON page_links(source);
+CREATE INDEX IF NOT EXISTS pages_by_date ON pages(date);
+CREATE INDEX IF NOT EXISTS page_tags_by_tag ON page_tags(tag);
+"""
+
+# One page as the index knows it. `output` is relative to the output
+# directory ("blog/tom/index.html"); `meta` is the whole front matter
+PageInfo = namedtuple("PageInfo", ["source", "output", "title", "date", "draft", "layout", "tags", "meta"])
+
+
+class ContentIndex:
+    """
+    Persistent SQLite index of page metadata, keyed by source path and
+    content digest.
+
+    `refresh` re-reads only sources whose stat stamp changed, and re-parses
+    only those whose content digest changed: the front matter and the title
+    come from prefix scans. The links and images (with their line numbers)
+    and the search terms are the `PageFacts` the build collects while
+    rendering each page,
+    handed over with `store_facts`; `parse_pending` parses the bodies of
+    the pages that were not rendered. Listing pages, feeds, link checks and
+    queries then read everything from the index.
+    """
+
+    def __init__(self, path: str = ":memory:", check_same_thread: bool = True):
+        self.path = path
+        if path != ":memory:":
+            dir_path = os.path.dirname(path)
+            if dir_path != "":
+                os.makedirs(dir_path, exist_ok=True)
+        # A server thread pool may share one index, guarded by its own lock
+        self.db = sqlite3.connect(path, check_same_thread=check_same_thread)
+        self.db.execute("PRAGMA foreign_keys = ON")
+        if self.db.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+            self.db.executescript(
+                "DROP TABLE IF EXISTS page_terms; DROP TABLE IF EXISTS page_links; "
+                "DROP TABLE IF EXISTS page_tags; DROP TABLE IF EXISTS pages;"
+            )
+            self.db.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+        self.db.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.db.close()
+
+    def refresh(self, dir_path_content) -> dict[str, int]:
+        """Bring the index in line with `dir_path_content`. Returns counts per outcome."""
+        counts = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0}
+        known = {
+            source: (digest, mtime_ns, size)
+            for source, digest, mtime_ns, size in self.db.execute("SELECT source, digest, mtime_ns, size FROM pages")
+        }
+        with self.db:
+            for source, output in discover_pages(dir_path_content, ""):
+                stat = os.stat(source)
+                entry = known.pop(source, None)
+                if entry is not None and entry[1:] == (stat.st_mtime_ns, stat.st_size):
+                    counts["unchanged"] += 1
+                    continue
+                with open(source, "r", encoding="utf-8") as f:
+                    text = f.read()
+                digest = hash_text(text)
+                if entry is not None and entry[0] == digest:
+                    # Touched but not modified
+                    self.db.execute("UPDATE pages SET mtime_ns = ?, size = ? WHERE source = ?",
+                                    (stat.st_mtime_ns, stat.st_size, source))
+                    counts["unchanged"] += 1
+                    continue
+                self.store(source, str(output).replace(os.sep, "/"), digest, stat, text)
+                counts["added" if entry is None else "updated"] += 1
+
+            for source in known:
+                self.db.execute("DELETE FROM pages WHERE source = ?", (source,))
+                counts["removed"] += 1
+        return counts
+
+    def store(self, source, output, digest, stat, text):
+        stream = io.StringIO(text)
+        meta, consumed = parse_front_matter(stream)
+        if consumed == 0:
+            stream.seek(0)
+        title = meta.get("title")
+        if not isinstance(title, str):
+            try:
+                title = extract_title_from_lines(stream)
+            except ValueError:
+                title = None  # Reported when the page itself is built
+        date = meta.get("date")
+        tags = meta.get("tags", [])
+        tags = [str(tag) for tag in (tags if isinstance(tags, list) else [tags])]
+        layout = meta.get("layout")
+        self.db.execute(
+            "INSERT OR REPLACE INTO pages (source, digest, mtime_ns, size, output, title, date, draft, layout, meta, "
+            "parsed) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0)",
+            (source, digest, stat.st_mtime_ns, stat.st_size, output, title,
+             None if date is None else str(date), meta.get("draft") is True,
+             None if layout is None else str(layout), json.dumps(meta)),
+        )
+        self.db.execute("DELETE FROM page_tags WHERE source = ?", (source,))
+        self.db.executemany("INSERT OR IGNORE INTO page_tags (source, tag) VALUES (?, ?)",
+                            [(source, tag) for tag in tags])
+        # Its links and terms are stored with its facts, once the page is rendered or parsed
+        self.db.execute("DELETE FROM page_links WHERE source = ?", (source,))
+        self.db.execute("DELETE FROM page_terms WHERE source = ?", (source,))
+
+    def store_facts(self, facts: dict[str, PageFacts]):
+        """
+        Store the `PageFacts` collected while rendering pages, by source
+        path. Call after `refresh`, so they replace those of the old content.
+        """
+        with self.db:
+            for source, page_facts in facts.items():
+                self.store_page_facts(str(source), page_facts)
+
+    def store_page_facts(self, source, facts: PageFacts):
+        if self.db.execute("UPDATE pages SET parsed = 1 WHERE source = ?", (source,)).rowcount == 0:
+            return  # Not indexed
+        self.db.execute("DELETE FROM page_links WHERE source = ?", (source,))
+        self.db.executemany("INSERT INTO page_links (source, line, kind, url) VALUES (?, ?, ?, ?)",
+                            [(source, *link) for link in facts.links])
+        self.db.execute("DELETE FROM page_terms WHERE source = ?", (source,))
+        self.db.executemany("INSERT INTO page_terms (source, term, count) VALUES (?, ?, ?)",
+                            [(source, term, count) for term, count in facts.terms.items()])
+
+    def parse_pending(self) -> int:
+        """
+        Parse the pages whose facts no render provided (drafts, pages the
+        build skipped, an index built after the pages). Returns how many.
+        """
+        pending = [source for source, in self.db.execute("SELECT source FROM pages WHERE NOT parsed")]
+        with self.db:
+            for source in pending:
+                with open(source, "r", encoding="utf-8") as f:
+                    text = f.read()
+                _, body = split_front_matter(text)
+                try:
+                    facts = collect_facts(body.split("\n"), text.count("\n", 0, len(text) - len(body)) + 1)
+                except (SyntaxError, ValueError) as e:
+                    print(f"Error indexing {source}: {e}")
+                    facts = PageFacts()
+                self.store_page_facts(source, facts)
+        return len(pending)
+
+    def get(self, source) -> PageInfo:
+        """The indexed metadata of one source, or None if it is not indexed."""
+        rows = self.query("WHERE p.source = ?", (str(source),))
+        return rows[0] if rows else None
+
+    def pages(self, tag: str = None, include_drafts: bool = False) -> list[PageInfo]:
+        """Indexed pages, newest first (undated pages last, by source path)."""
+        clauses, params = [], []
+        if tag is not None:
+            clauses.append("p.source IN (SELECT source FROM page_tags WHERE tag = ?)")
+            params.append(tag)
+        if not include_drafts:
+            clauses.append("NOT p.draft")
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self.query(f"{where} ORDER BY p.date IS NULL, p.date DESC, p.source", params)
+
+    def links(self, include_drafts: bool = False) -> Iterator[tuple[str, str, LinkRef]]:
+        """Yield (source, output, `LinkRef`) for every link and image of the indexed pages."""
+        rows = self.db.execute(
+            "SELECT l.source, p.output, l.line, l.kind, l.url FROM page_links l JOIN pages p ON p.source = l.source "
+            f"{'' if include_drafts else 'WHERE NOT p.draft '}ORDER BY l.source, l.line"
+        )
+        for source, output, line, kind, url in rows:
+            yield source, output, LinkRef(line, kind, url)
+
+    def terms(self, source) -> Counter:
+        """The search term frequencies of one page's body."""
+        rows = self.db.execute("SELECT term, count FROM page_terms WHERE source = ?", (str(source),))
+        return Counter(dict(rows.fetchall()))
+
+    def digests(self) -> dict[str, str]:
+        """The content digest of every indexed source."""
+        return dict(self.db.execute("SELECT source, digest FROM pages").fetchall())
+
+    def tags(self, include_drafts: bool = False) -> dict[str, int]:
+        """Every tag with its number of pages, by tag name."""
+        rows = self.db.execute(
+            "SELECT t.tag, COUNT(*) FROM page_tags t JOIN pages p ON p.source = t.source "
+            f"{'' if include_drafts else 'WHERE NOT p.draft '}GROUP BY t.tag ORDER BY t.tag"
+        )
+        return dict(rows.fetchall())
+
+    def query(self, clause: str, params=()) -> list[PageInfo]:
+        rows = self.db.execute(
+            "SELECT p.source, p.output, p.title, p.date, p.draft, p.layout, p.meta, "
+            "(SELECT json_group_array(tag) FROM (SELECT tag FROM page_tags WHERE source = p.source ORDER BY tag)) "
+            f"FROM pages p {clause}",
+            params,
+        )
+        return [
+            PageInfo(source, output, title, date, bool(draft), layout, json.loads(tags), json.loads(meta))
+            for source, output, title, date, draft, layout, meta, tags in rows
+        ]
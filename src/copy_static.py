@@ -1,22 +1,129 @@
 import os
-from shutil import copy
-
-
-def copy_files_recursive(source_dir_path, dest_dir_path):
-    # Crear directorio destino si no existe
-    if not os.path.exists(dest_dir_path):
-        os.mkdir(dest_dir_path)
-    
-    # Listar elementos en from_path
-    for filename in os.listdir(source_dir_path):
-        from_path = os.path.join(source_dir_path, filename)
-        dest_path = os.path.join(dest_dir_path, filename)
-        
-        if os.path.isfile(from_path):
-            # Copiar archivo
-            copy(from_path, dest_path)
-            print(f"📄 Copiado {from_path} -> {dest_path}")
-        else:
-            # Llamada recursiva para directorios
-            print(f"📂 Procesando directorio: {from_path}")
-            copy_files_recursive(from_path, dest_path)
+from concurrent.futures import ThreadPoolExecutor
+from shutil import copy2, copystat
+from build_manifest import file_digest, remove_empty_dirs
+from state_file import load_state, save_state
+
+
+LINK_MODES = ("copy", "hardlink", "reflink")
+FICLONE = 0x40049409  # Linux ioctl that shares extents between two files
+
+
+class SyncSummary:
+    def __init__(self):
+        self.copied = 0
+        self.linked = 0
+        self.unchanged = 0
+        self.removed = 0
+        self.bytes = 0
+        self.paths = {"copied": [], "linked": [], "removed": []}
+
+    def __str__(self):
+        return (f"Static: {self.copied} copied, {self.linked} linked, "
+                f"{self.unchanged} unchanged, {self.removed} removed "
+                f"({self.bytes / 1024:.1f} KiB transferred)")
+
+
+def sync_static(source_dir_path, dest_dir_path, link_mode="copy", checksum=False,
+                state_path=None, max_workers=None) -> SyncSummary:
+    """
+    Mirror `source_dir_path` into `dest_dir_path`, touching only what changed.
+
+    Files are compared by size and mtime (or by content with `checksum`), and
+    changed ones are copied, hardlinked or reflinked across a thread pool.
+    The set of synced files is kept in `state_path`, so assets deleted from
+    the source are pruned without touching the generated pages next to them.
+    """
+    if link_mode not in LINK_MODES:
+        raise ValueError(f"Unknown link mode: {link_mode}")
+
+    jobs = []
+    for dir_path, _, filenames in os.walk(source_dir_path):
+        rel_dir = os.path.relpath(dir_path, source_dir_path)
+        dest_dir = os.path.normpath(os.path.join(dest_dir_path, rel_dir))
+        os.makedirs(dest_dir, exist_ok=True)
+        for filename in filenames:
+            jobs.append((os.path.join(dir_path, filename), os.path.join(dest_dir, filename)))
+
+    summary = SyncSummary()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(lambda job: sync_file(*job, link_mode, checksum), jobs)
+        for (from_path, dest_path), status in zip(jobs, results):
+            if status == "unchanged":
+                summary.unchanged += 1
+                continue
+            setattr(summary, status, getattr(summary, status) + 1)
+            summary.paths[status].append(dest_path)
+            if status == "copied":
+                summary.bytes += os.path.getsize(dest_path)
+
+    synced = [dest_path for _, dest_path in jobs]
+    if state_path is not None:
+        for dest_path in set(load_synced(state_path)) - set(synced):
+            if os.path.exists(dest_path):
+                os.remove(dest_path)
+                remove_empty_dirs(os.path.dirname(dest_path), dest_dir_path)
+                summary.removed += 1
+                summary.paths["removed"].append(dest_path)
+        save_synced(state_path, synced)
+    return summary
+
+
+def sync_file(from_path, dest_path, link_mode="copy", checksum=False) -> str:
+    """
+    Bring `dest_path` up to date with `from_path`.
+
+    Returns "unchanged", "linked" or "copied". Linking falls back to a copy
+    when the filesystem does not support it (e.g. across devices).
+    """
+    if os.path.exists(dest_path) and files_match(from_path, dest_path, checksum):
+        return "unchanged"
+
+    # Never write through an existing file: it may be a hardlink to the source
+    tmp_path = f"{dest_path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    if link_mode != "copy":
+        try:
+            if link_mode == "hardlink":
+                os.link(from_path, tmp_path)
+            else:
+                reflink(from_path, tmp_path)
+            os.replace(tmp_path, dest_path)
+            return "linked"
+        except (OSError, ImportError):
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    copy2(from_path, tmp_path)
+    os.replace(tmp_path, dest_path)
+    return "copied"
+
+
+def files_match(from_path, dest_path, checksum=False) -> bool:
+    from_stat = os.stat(from_path)
+    dest_stat = os.stat(dest_path)
+    if os.path.samestat(from_stat, dest_stat):
+        return True  # Hardlinked
+    if from_stat.st_size != dest_stat.st_size:
+        return False
+    if checksum:
+        return file_digest(from_path) == file_digest(dest_path)
+    return from_stat.st_mtime_ns == dest_stat.st_mtime_ns
+
+
+def reflink(from_path, dest_path):
+    """Copy-on-write clone of `from_path`; raises OSError where unsupported."""
+    import fcntl  # Not available on Windows
+
+    with open(from_path, "rb") as src, open(dest_path, "wb") as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+    # Carry the mtime over so later syncs see the clone as unchanged
+    copystat(from_path, dest_path)
+
+
+def load_synced(state_path) -> list[str]:
+    return load_state(state_path, [])
+
+
+def save_synced(state_path, synced: list[str]):
+    save_state(state_path, sorted(synced), indent=1)
@@ -0,0 +1,62 @@
+import os
+from build_manifest import remove_empty_dirs
+from state_file import save_state
+from watch import scan_tree
+
+
+def snapshot(dest_dir_path) -> dict[str, tuple[int, int]]:
+    """Stamp every output under `dest_dir_path`; compare two with `compute_delta`."""
+    return {os.path.normpath(path): stamp for path, stamp in scan_tree(dest_dir_path).items()}
+
+
+def compute_delta(before: dict, after: dict, dest_dir_path, basepath="/") -> dict:
+    """
+    Compare two snapshots of the output directory and list the added,
+    changed and deleted files as URL paths under `basepath`.
+
+    Outputs are only rewritten when their bytes change, so a file whose
+    stamp moved really is different. `invalidate` merges the three lists and
+    adds the directory URL of every index.html, ready for a CDN purge.
+    """
+    def url(path):
+        rel_path = os.path.relpath(path, dest_dir_path).replace(os.sep, "/")
+        return basepath + rel_path
+
+    added = sorted(url(path) for path in after if path not in before)
+    changed = sorted(url(path) for path, stamp in after.items() if path in before and before[path] != stamp)
+    deleted = sorted(url(path) for path in before if path not in after)
+
+    invalidate = set()
+    for path in added + changed + deleted:
+        invalidate.add(path)
+        if path.endswith("/index.html"):
+            invalidate.add(path[:-len("index.html")])
+    return {
+        "basepath": basepath,
+        "added": added,
+        "changed": changed,
+        "deleted": deleted,
+        "invalidate": sorted(invalidate),
+    }
+
+
+def save_delta(path, delta: dict):
+    save_state(path, delta, indent=1)
+
+
+def remove_stale_outputs(dest_dir_path, keep, keep_sidecars=False) -> list[str]:
+    """
+    Delete every file under `dest_dir_path` that is not in `keep`, the way
+    wiping the directory used to, but without touching the files that
+    stay. With `keep_sidecars`, .gz files next to a kept file survive too.
+    Returns the removed paths.
+    """
+    keep = {os.path.normpath(path) for path in keep}
+    removed = []
+    for path in snapshot(dest_dir_path):
+        if path in keep or (keep_sidecars and path.endswith(".gz") and path[:-3] in keep):
+            continue
+        os.remove(path)
+        remove_empty_dirs(os.path.dirname(path), dest_dir_path)
+        removed.append(path)
+    return removed
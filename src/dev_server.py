@@ -0,0 +1,202 @@
+import hashlib
+import io
+import mimetypes
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+from content_index import ContentIndex
+from front_matter import read_front_matter
+from generate_content import render_page
+from listings import PAGE_SIZE, iter_listing_pages, listing_template, render_listing
+from templates import template_cache
+
+
+class PageCache:
+    """
+    Rendered pages kept in memory, keyed by source path. An entry is reused
+    while the source's (mtime_ns, size) stamp and its layout's digest are
+    unchanged, so editing a page or a layout shows up on the next request.
+    """
+
+    def __init__(self):
+        self.entries = {}  # source path -> (stamp, etag, body)
+        self.lock = threading.Lock()
+        self.renders = 0
+
+    def get(self, content_path, stamp):
+        entry = self.entries.get(content_path)
+        if entry is None or entry[0] != stamp:
+            return None
+        return entry[1], entry[2]
+
+    def put(self, content_path, stamp, body: bytes) -> str:
+        etag = body_etag(body)
+        self.entries[content_path] = (stamp, etag, body)
+        self.renders += 1
+        return etag
+
+
+class DevServer(ThreadingHTTPServer):
+    """
+    Development server that renders each page when it is requested instead
+    of building the site first, so startup does not depend on site size.
+
+    A URL maps onto the source the build would turn into it: "/blog/tom/"
+    is content/blog/tom/index.md and "/about.html" is content/about.md.
+    Listing pages ("/blog/", "/tags/<tag>/", "/archive/<year>/<month>/")
+    are rendered from a `ContentIndex`, refreshed on each listing request.
+    Anything else is served from the static directory. Responses carry an
+    ETag and are revalidated on every request (304 when unchanged).
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, dir_path_content, dir_path_static, template_path, basepath="/", engine="fast",
+                 index_path=":memory:", page_size: int = PAGE_SIZE):
+        super().__init__(address, DevRequestHandler)
+        self.dir_path_content = dir_path_content
+        self.dir_path_static = dir_path_static
+        self.template_path = template_path
+        self.basepath = basepath
+        self.engine = engine
+        self.pages = PageCache()
+        self.index = ContentIndex(index_path, check_same_thread=False)
+        self.index_lock = threading.Lock()
+        self.page_size = page_size
+
+    def server_close(self):
+        super().server_close()
+        self.index.close()
+
+    def resolve(self, url_path):
+        """
+        Map a URL path to ("page", source), ("listing", listing page),
+        ("static", file), ("redirect", url) or (None, None) when nothing
+        serves it.
+        """
+        if url_path + "/" == self.basepath:
+            return "redirect", self.basepath
+        if not url_path.startswith(self.basepath):
+            return None, None
+        parts = [part for part in url_path[len(self.basepath):].split("/") if part not in ("", ".")]
+        # Never leave the site directories ("/../etc/passwd")
+        if ".." in parts:
+            return None, None
+        if not parts or url_path.endswith("/"):
+            parts.append("index.html")
+
+        root, ext = os.path.splitext(parts[-1])
+        if ext == ".html":
+            source = os.path.join(self.dir_path_content, *parts[:-1], f"{root}.md")
+            if os.path.isfile(source):
+                return "page", source
+            listing_page = self.find_listing("/".join(parts))
+            if listing_page is not None:
+                return "listing", listing_page
+        elif ext == "" and (os.path.isfile(os.path.join(self.dir_path_content, *parts, "index.md"))
+                            or self.find_listing("/".join(parts + ["index.html"])) is not None):
+            return "redirect", url_path + "/"
+
+        static_path = os.path.join(self.dir_path_static, *parts)
+        if os.path.isfile(static_path):
+            return "static", static_path
+        return None, None
+
+    def render(self, content_path) -> tuple[str, bytes]:
+        """Return (etag, body) for a page, rendering it only if its inputs changed."""
+        layout = read_front_matter(content_path).get("layout")
+        template = template_cache.resolve_layout(content_path, self.dir_path_content, self.template_path, layout)
+        stat = os.stat(content_path)
+        stamp = (stat.st_mtime_ns, stat.st_size, template.digest)
+        with self.pages.lock:
+            cached = self.pages.get(content_path, stamp)
+        if cached is not None:
+            return cached
+        # Render without the lock so one slow page does not hold up requests for the others
+        body = render_page(content_path, template, self.basepath, self.engine).encode("utf-8")
+        with self.pages.lock:
+            return self.pages.put(content_path, stamp, body), body
+
+    def find_listing(self, output):
+        """The (output, listing, number, count, pages) the build would write to `output`, or None."""
+        if not output.endswith("/index.html"):
+            return None  # Listings only live in directories of their own
+        with self.index_lock:
+            self.index.refresh(self.dir_path_content)
+            for listing_page in iter_listing_pages(self.index, self.page_size):
+                if listing_page[0] == output:
+                    return listing_page
+        return None
+
+    def render_listing(self, listing_page) -> tuple[str, bytes]:
+        """Return (etag, body) for a listing page found by `find_listing`, as the build would write it."""
+        _, listing, number, count, pages = listing_page
+        template = listing_template(self.template_path).for_basepath(self.basepath)
+        sink = io.StringIO()
+        render_listing(sink, template, listing, number, count, pages, self.basepath)
+        body = sink.getvalue().encode("utf-8")
+        return body_etag(body), body
+
+
+class DevRequestHandler(BaseHTTPRequestHandler):
+    server_version = "SSGDevServer"
+
+    def do_HEAD(self):
+        self.respond(send_body=False)
+
+    def do_GET(self):
+        self.respond(send_body=True)
+
+    def respond(self, send_body):
+        url_path = unquote(urlsplit(self.path).path)
+        kind, path = self.server.resolve(url_path)
+        if kind == "redirect":
+            self.send_response(301)
+            self.send_header("Location", path)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if kind is None:
+            self.send_error(404, f"Nothing to serve for {url_path}")
+            return
+
+        try:
+            if kind == "page":
+                content_type = "text/html; charset=utf-8"
+                etag, body = self.server.render(path)
+            elif kind == "listing":
+                content_type = "text/html; charset=utf-8"
+                etag, body = self.server.render_listing(path)
+            else:
+                content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+                etag, body = static_file(path)
+        except Exception as e:
+            self.send_error(500, f"Error rendering {path}: {e}")
+            return
+
+        if etag in self.headers.get("If-None-Match", ""):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        # Always revalidate: the page may have been edited since
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+
+def body_etag(body: bytes) -> str:
+    return f'"{hashlib.sha256(body).hexdigest()[:20]}"'
+
+
+def static_file(path) -> tuple[str, bytes]:
+    stat = os.stat(path)
+    with open(path, "rb") as f:
+        body = f.read()
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"', body
@@ -0,0 +1,90 @@
+"""
+Fast render engine: markdown straight to HTML text.
+
+The tree engine (`block_markdown`) builds TextNodes, converts them to
+LeafNodes, wraps those in ParentNodes and only then serializes. This engine
+renders every inline token and block directly to a string instead. Its output
+is byte-identical, errors included: if anything goes wrong, the page is
+rendered again with the tree engine so the same exception is raised.
+"""
+from block_markdown import Block, BlockType, blocks_to_html_node, markdown_to_typed_blocks
+from inline_markdown import scan_inline
+from text_node import text_to_html
+
+
+# Render engines selectable with --engine
+ENGINES = ("tree", "fast")
+
+
+def markdown_to_html(markdown: str, basepath: str = "/", cache=None) -> str:
+    """Same as `markdown_to_html_node(markdown, basepath, cache).to_html()`."""
+    return blocks_to_html(markdown_to_typed_blocks(markdown), basepath, cache)
+
+
+def blocks_to_html(blocks: list[Block], basepath: str = "/", cache=None, facts=None) -> str:
+    """The <div> of typed blocks; links are collected into `facts` as the tree engine does."""
+    try:
+        parts = []
+        for block in blocks:
+            if cache is None:
+                parts.append(block_to_html(block, basepath, facts))
+                continue
+            text = "\n".join(block.lines)
+            html = cache.get(text, basepath)
+            if html is None:
+                html = block_to_html(block, basepath, facts)
+                cache.put(text, basepath, html)
+            elif facts is not None:
+                facts.add_block(block)
+            parts.append(html)
+        return _wrap("div", "".join(parts))
+    except Exception:
+        # Let the tree engine raise exactly the error it would have
+        if facts is not None:
+            facts.reset()
+        return blocks_to_html_node(blocks, basepath, cache, facts).to_html()
+
+
+def block_to_html(block: Block, basepath: str = "/", facts=None) -> str:
+    if facts is not None:
+        facts.begin_block(block)
+    lines = block.lines
+    match block.type:
+        case BlockType.PARAGRAPH:
+            return _wrap("p", inline_to_html(" ".join(lines), basepath, facts))
+        case BlockType.HEADING:
+            text = "\n".join(lines)
+            level = text.count("#", 0, 7)
+            return _wrap(f"h{level}", inline_to_html(text[level + 1 :], basepath, facts))
+        case BlockType.CODE:
+            text = "\n".join(lines)
+            return f"<pre><code>{text[4:-3]}</code></pre>"
+        case BlockType.QUOTE:
+            for line in lines:
+                if not line.startswith(">"):
+                    raise ValueError("invalid quote block")
+            content = " ".join(line.lstrip(">").strip() for line in lines)
+            return _wrap("blockquote", inline_to_html(content, basepath, facts))
+        case BlockType.UNORDERED_LIST:
+            return _wrap("ul", "".join(_wrap("li", inline_to_html(item[2:], basepath, facts)) for item in lines))
+        case BlockType.ORDERED_LIST:
+            return _wrap("ol", "".join(_wrap("li", inline_to_html(item[3:], basepath, facts)) for item in lines))
+        case _:
+            raise ValueError(f"Unknown block type: {block.type}")
+
+
+def inline_to_html(text: str, basepath: str = "/", facts=None) -> str:
+    """Render inline markdown without creating TextNodes or LeafNodes."""
+    def render_token(text, text_type, url=None):
+        if facts is not None:
+            facts.add_token(text, text_type, url)
+        return text_to_html(text, text_type, url, basepath)
+    return "".join(scan_inline(text, render_token))
+
+
+def _wrap(tag: str, inner: str) -> str:
+    # Every inline token renders to at least one character, so an empty
+    # body means the tree engine's ParentNode would have had no children
+    if not inner:
+        raise ValueError("invalid HTML: no children")
+    return f"<{tag}>{inner}</{tag}>"
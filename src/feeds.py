@@ -0,0 +1,228 @@
+import os
+import re
+import time
+from itertools import chain, islice
+from xml.sax.saxutils import escape, quoteattr
+from generate_content import body_to_html, render_body, write_page
+from listings import output_url
+from templates import template_cache
+
+
+# The sitemap protocol's limit per file; larger sites get a sitemap index
+MAX_SITEMAP_URLS = 50000
+# Newest entries in the feed
+FEED_ENTRIES = 20
+SITEMAP_NAMESPACE = "http://www.sitemaps.org/schemas/sitemap/0.9"
+ATOM_NAMESPACE = "http://www.w3.org/2005/Atom"
+DAY_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+SITEMAP_PART_PATTERN = re.compile(r"^sitemap-\d+\.xml$")
+
+
+class FeedSummary:
+    def __init__(self):
+        self.outputs = []
+        self.urls = 0
+        self.sitemaps = 0
+        self.removed = []
+        self.entries = 0
+        self.rendered = 0
+        self.missing = 0
+
+    def __str__(self):
+        return (f"Sitemap: {self.urls} URLs in {self.sitemaps} file(s), {len(self.removed)} removed; "
+                f"Feed: {self.entries} entries ({self.rendered} bodies rendered from markdown, "
+                f"{self.missing} without a body)")
+
+
+def absolute_url(site_url: str, output: str, basepath: str = "/") -> str:
+    """The full URL of an output, e.g. "https://example.com/SSG/blog/tom/" for blog/tom/index.html."""
+    return site_url.rstrip("/") + output_url(output, basepath)
+
+
+def timestamp(seconds: float) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(seconds))
+
+
+def iter_site_outputs(index, dest_dir_path, extra_outputs=()):
+    """
+    Yield every published page as (output relative to `dest_dir_path`,
+    mtime of the output): the indexed pages, then `extra_outputs` (paths
+    such as the generated listings). Pages that were not written are skipped.
+    """
+    pages = (os.path.join(dest_dir_path, *page.output.split("/")) for page in index.pages())
+    for dest_path in chain(pages, extra_outputs):
+        try:
+            mtime = os.stat(dest_path).st_mtime
+        except FileNotFoundError:
+            continue
+        yield os.path.relpath(dest_path, dest_dir_path).replace(os.sep, "/"), mtime
+
+
+def write_urlset(sink, outputs, site_url, basepath) -> int:
+    sink.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{SITEMAP_NAMESPACE}">\n')
+    count = 0
+    for output, mtime in outputs:
+        sink.write(f"  <url><loc>{escape(absolute_url(site_url, output, basepath))}</loc>"
+                   f"<lastmod>{timestamp(mtime)}</lastmod></url>\n")
+        count += 1
+    sink.write("</urlset>\n")
+    return count
+
+
+def write_sitemaps(outputs, dest_dir_path, site_url, basepath="/",
+                   max_urls: int = MAX_SITEMAP_URLS) -> tuple[list[str], int]:
+    """
+    Stream (output, mtime) pairs into `sitemap.xml`, a URL at a time. Past
+    `max_urls` the URLs go to sitemap-1.xml, sitemap-2.xml... and
+    sitemap.xml becomes the sitemap index. Returns (paths written, URLs).
+    """
+    outputs = iter(outputs)
+    sitemap_path = os.path.join(dest_dir_path, "sitemap.xml")
+    counts = []
+
+    def write_part(path, head):
+        urls = chain(head, islice(outputs, max_urls - len(head)))
+        write_page(path, lambda f: counts.append(write_urlset(f, urls, site_url, basepath)))
+
+    # Only the first file's worth is held, to know whether an index is needed
+    head = list(islice(outputs, max_urls + 1))
+    if len(head) <= max_urls:
+        write_part(sitemap_path, head)
+        return [sitemap_path], counts[0]
+
+    paths = []
+    carry = head[max_urls:]
+    write_part(os.path.join(dest_dir_path, "sitemap-1.xml"), head[:max_urls])
+    paths.append(os.path.join(dest_dir_path, "sitemap-1.xml"))
+    while carry:
+        path = os.path.join(dest_dir_path, f"sitemap-{len(paths) + 1}.xml")
+        write_part(path, carry)
+        paths.append(path)
+        carry = list(islice(outputs, 1))
+
+    def write_index(f):
+        f.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="{SITEMAP_NAMESPACE}">\n')
+        for path in paths:
+            loc = absolute_url(site_url, os.path.basename(path), basepath)
+            lastmod = timestamp(os.stat(path).st_mtime)
+            f.write(f"  <sitemap><loc>{escape(loc)}</loc><lastmod>{lastmod}</lastmod></sitemap>\n")
+        f.write("</sitemapindex>\n")
+
+    write_page(sitemap_path, write_index)
+    return [sitemap_path] + paths, sum(counts)
+
+
+def remove_stale_sitemaps(dest_dir_path, paths) -> list[str]:
+    """Remove the sitemap-N.xml files in `dest_dir_path` that are not in `paths`, e.g. after the site shrank."""
+    keep = {os.path.basename(path) for path in paths}
+    removed = []
+    with os.scandir(dest_dir_path) as entries:
+        for entry in entries:
+            if SITEMAP_PART_PATTERN.match(entry.name) and entry.name not in keep:
+                os.remove(entry.path)
+                removed.append(entry.path)
+    return removed
+
+
+def page_body(page, dest_path, dir_path_content, template_path, basepath):
+    """
+    The rendered HTML body of a generated page, cut back out of its output
+    file with the page's layout (see `Template.extract`). Returns None when
+    the output does not match the layout, e.g. it was written by an older
+    build or the layout uses {{ Content }} more than once.
+    """
+    template = template_cache.resolve_layout(page.source, dir_path_content, template_path, page.layout)
+    with open(dest_path, "r", encoding="utf-8") as f:
+        html = f.read()
+    return template.for_basepath(basepath).extract(html, {"Title": page.title})
+
+
+def entry_body(page, dest_path, dir_path_content, template_path, basepath, summary):
+    """
+    `page_body`, or else the body rendered again from the markdown. The
+    fallback is reported and counted in `summary`; None if it fails too.
+    """
+    body = page_body(page, dest_path, dir_path_content, template_path, basepath)
+    if body is not None:
+        return body
+    print(f"Feed: {dest_path} does not match its layout, rendering {page.source} again")
+    try:
+        body = body_to_html(render_body(page.source, basepath)[1])
+    except Exception as e:
+        print(f"Feed: no body for {page.source}: {e}")
+        summary.missing += 1
+        return None
+    summary.rendered += 1
+    return body
+
+
+def write_feed(index, dest_dir_path, dir_path_content, template_path, site_url, basepath="/", section="blog",
+               title="Blog", limit: int = FEED_ENTRIES, summary: FeedSummary = None) -> tuple[str, int]:
+    """
+    Write an Atom feed of the newest `limit` pages under `section/` to
+    `feed.xml`, one entry at a time. Entry bodies are cut out of the pages
+    `generate_page` already wrote instead of rendering the markdown again;
+    an entry whose output does not match its layout has its body rendered
+    from the markdown (see `entry_body`). Returns (path, entries).
+    """
+    if summary is None:
+        summary = FeedSummary()
+    section_index = f"{section}/index.html"
+    pages = []
+    for page in index.pages():
+        if page.output.startswith(f"{section}/") and page.output != section_index:
+            dest_path = os.path.join(dest_dir_path, *page.output.split("/"))
+            if os.path.exists(dest_path):
+                pages.append((page, dest_path))
+                if len(pages) == limit:
+                    break
+
+    def updated(page, dest_path):
+        if DAY_PATTERN.match(page.date or ""):
+            return f"{page.date}T00:00:00Z"
+        return timestamp(os.stat(dest_path).st_mtime)
+
+    feed_path = os.path.join(dest_dir_path, "feed.xml")
+
+    def write(f):
+        # xml:base resolves the root-relative links inside entry bodies
+        base = quoteattr(site_url.rstrip("/") + "/")
+        f.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<feed xmlns="{ATOM_NAMESPACE}" xml:base={base}>\n')
+        f.write(f"  <title>{escape(title)}</title>\n")
+        f.write(f"  <id>{escape(absolute_url(site_url, section_index, basepath))}</id>\n")
+        f.write(f"  <link href={quoteattr(absolute_url(site_url, section_index, basepath))} />\n")
+        f.write(f"  <link rel=\"self\" href={quoteattr(absolute_url(site_url, 'feed.xml', basepath))} />\n")
+        newest = max((updated(page, dest_path) for page, dest_path in pages), default=timestamp(0))
+        f.write(f"  <updated>{newest}</updated>\n")
+        for page, dest_path in pages:
+            body = entry_body(page, dest_path, dir_path_content, template_path, basepath, summary)
+            url = absolute_url(site_url, page.output, basepath)
+            f.write("  <entry>\n")
+            f.write(f"    <title>{escape(page.title or page.output)}</title>\n")
+            f.write(f"    <id>{escape(url)}</id>\n")
+            f.write(f"    <link href={quoteattr(url)} />\n")
+            f.write(f"    <updated>{updated(page, dest_path)}</updated>\n")
+            for tag in page.tags:
+                f.write(f"    <category term={quoteattr(tag)} />\n")
+            if body is not None:
+                f.write(f'    <content type="html">{escape(body)}</content>\n')
+            f.write("  </entry>\n")
+        f.write("</feed>\n")
+
+    write_page(feed_path, write)
+    return feed_path, len(pages)
+
+
+def generate_feeds(index, dest_dir_path, dir_path_content, template_path, site_url, basepath="/",
+                   extra_outputs=()) -> FeedSummary:
+    """Write the sitemap(s) and the Atom feed for a built site."""
+    summary = FeedSummary()
+    paths, summary.urls = write_sitemaps(iter_site_outputs(index, dest_dir_path, extra_outputs), dest_dir_path,
+                                         site_url, basepath)
+    summary.sitemaps = len(paths) - 1 if len(paths) > 1 else 1
+    # Parts left over from a bigger site; a full build would prune them, an incremental one would not
+    summary.removed = remove_stale_sitemaps(dest_dir_path, paths)
+    feed_path, summary.entries = write_feed(index, dest_dir_path, dir_path_content, template_path, site_url, basepath,
+                                            summary=summary)
+    summary.outputs = paths + [feed_path]
+    return summary
@@ -0,0 +1,81 @@
+import io
+import re
+
+
+FENCE = "---"
+KEY_PATTERN = re.compile(r"^([A-Za-z_][\w-]*):(?:\s+(.*))?$")
+INT_PATTERN = re.compile(r"-?\d+")
+
+
+def parse_front_matter(stream) -> tuple[dict, int]:
+    """
+    Read YAML-lite front matter from the start of `stream` (an open file or
+    `io.StringIO`), stopping at the closing fence:
+
+        ---
+        title: Why Tom Bombadil Was a Mistake
+        date: 2024-05-01
+        tags: [tolkien, essays]
+        draft: false
+        ---
+
+    Supported values are strings (optionally quoted), true/false, integers,
+    inline lists and "- item" lists under an empty key. Returns (metadata,
+    characters consumed); a document without valid front matter gives
+    ({}, 0) after reading as little as possible, and the caller should
+    rewind.
+    """
+    line = stream.readline()
+    if line.rstrip() != FENCE:
+        return {}, 0
+    consumed = len(line)
+    meta = {}
+    last_key = None
+    while True:
+        line = stream.readline()
+        if not line:
+            return {}, 0  # Never closed: not front matter
+        consumed += len(line)
+        text = line.rstrip()
+        if text == FENCE:
+            return meta, consumed
+        if not text.strip() or text.lstrip().startswith("#"):
+            continue
+        if text.lstrip().startswith("- ") and last_key is not None and isinstance(meta[last_key], list):
+            meta[last_key].append(parse_scalar(text.lstrip()[2:]))
+            continue
+        match = KEY_PATTERN.match(text)
+        if match is None:
+            return {}, 0  # Not a key: this is markdown, not front matter
+        last_key, value = match[1], match[2]
+        meta[last_key] = parse_value(value) if value else []
+
+
+def split_front_matter(markdown: str) -> tuple[dict, str]:
+    """Return (metadata, body) for a markdown document, reading only the front matter."""
+    meta, consumed = parse_front_matter(io.StringIO(markdown))
+    return meta, markdown[consumed:]
+
+
+def read_front_matter(path) -> dict:
+    """The front matter of a file, without reading the rest of it."""
+    with open(path, "r", encoding="utf-8") as f:
+        return parse_front_matter(f)[0]
+
+
+def parse_value(text: str):
+    text = text.strip()
+    if text.startswith("[") and text.endswith("]"):
+        return [parse_scalar(item) for item in text[1:-1].split(",") if item.strip()]
+    return parse_scalar(text)
+
+
+def parse_scalar(text: str):
+    text = text.strip()
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "\"'":
+        return text[1:-1]
+    if text in ("true", "false"):
+        return text == "true"
+    if INT_PATTERN.fullmatch(text):
+        return int(text)
+    return text
@@ -1,62 +1,238 @@
+import io
 import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
-from block_markdown import markdown_to_html_node
+from block_markdown import blocks_to_html_node, markdown_to_typed_blocks, write_markdown_html
+from html_node import write_html
+from build_manifest import hash_text
+from templates import compile_template, template_cache
+from profiling import BuildProfiler, no_stage
+from block_cache import block_cache
+from fast_render import blocks_to_html
+from parallel_render import write_markdown_html_parallel
+from page_facts import PageFacts
+from front_matter import parse_front_matter, read_front_matter, split_front_matter
 
 
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath):
-    # Load template once to avoid repeated disk access
-    try:
-        with open(template_path, "r", encoding="utf-8") as f:
-            template = f.read()
-    except Exception as e:
-        raise IOError(f"Error reading template file: {e}")
-    
-    # Process Files
+# Pages at least this large are rendered block by block without loading them whole
+STREAMING_THRESHOLD = 8 * 1024 * 1024
+# With a process pool, pages at least this large have their blocks rendered across it
+PARALLEL_THRESHOLD = 1024 * 1024
+
+
+def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath, manifest=None, jobs=1,
+                             profiler=None, engine="tree", index=None, facts=None):
+    """
+    Generate every page under `dir_path_content`.
+
+    Each page is filled with its layout (see `TemplateCache.resolve_layout`),
+    compiled once and cached. A `layout:` in the page's front matter picks
+    the layout explicitly, and pages marked `draft: true` are skipped; with
+    a `ContentIndex` that metadata comes from the index instead of the
+    files. When a `BuildManifest` is given, pages whose
+    markdown, layout and basepath are unchanged since the last build are
+    skipped, and every successfully generated page is recorded in it. With
+    `jobs > 1` the pages are rendered across a process pool, and with a
+    `BuildProfiler` every page's stages are timed. `engine` selects the
+    renderer (see `generate_page`). Given a `facts` dict, the `PageFacts`
+    of every page rendered are added to it by source path, for
+    `ContentIndex.store_facts`.
+
+    Returns the number of pages that failed to generate.
+    """
+    tasks, contexts = [], []
+    failures = 0
+    for from_path, dest_path in discover_pages(dir_path_content, dest_dir_path):
+        info = index.get(from_path) if index is not None else None
+        if info is not None:
+            draft, layout = info.draft, info.layout
+        else:
+            meta = read_front_matter(from_path)
+            draft, layout = meta.get("draft") is True, meta.get("layout")
+        if draft:
+            continue
+        try:
+            template = template_cache.resolve_layout(from_path, dir_path_content, template_path, layout)
+        except FileNotFoundError as e:
+            print(f"Error generating {from_path}: {e}")
+            failures += 1
+            continue
+        context = hash_text(template.digest, basepath)
+        if manifest is not None and not manifest.needs_build(from_path, dest_path, context):
+            continue
+        tasks.append((from_path, template, dest_path))
+        contexts.append(context)
+
+    results = generate_pages(tasks, basepath, jobs, profiler, engine, facts)
+
+    for (from_path, _, dest_path), context, ok in zip(tasks, contexts, results):
+        if not ok:
+            failures += 1
+        elif manifest is not None:
+            manifest.record(from_path, dest_path, context)
+    return failures
+
+
+def page_dest_path(content_path, dir_path_content, dest_dir_path) -> Path:
+    """Map a source under `dir_path_content` to its .html output under `dest_dir_path`."""
+    rel_path = os.path.relpath(content_path, dir_path_content)
+    return Path(os.path.join(dest_dir_path, rel_path)).with_suffix(".html")
+
+
+def discover_pages(dir_path_content, dest_dir_path) -> list[tuple[str, Path]]:
+    """Walk `dir_path_content` depth-first and pair each source with its output path."""
+    pages = []
     for filename in os.listdir(dir_path_content):
         from_path = os.path.join(dir_path_content, filename)
         dest_path = os.path.join(dest_dir_path, filename)
         if os.path.isfile(from_path):
-            dest_path = Path(dest_path).with_suffix(".html")
-            generate_page(from_path, template, dest_path, basepath)
+            pages.append((from_path, Path(dest_path).with_suffix(".html")))
         else:
-            # Create output directory for subdirectories
-            os.makedirs(dest_path, exist_ok=True)
-            generate_pages_recursive(from_path, template_path, dest_path, basepath)
+            pages.extend(discover_pages(from_path, dest_path))
+    return pages
 
 
-def generate_page(content_path, template, dest_path, basepath):
-    try:
-        # Read markdown content
-        with open(content_path, "r", encoding="utf-8") as f:
-            markdown_content = f.read()
-     
-        # Convert markdown to HTML
-        node = markdown_to_html_node(markdown_content)
-        html_content = node.to_html()
-        
-        # Extract title
-        title = extract_title(markdown_content)
-        
-        # Fill template
-        filled_template = (template
-            .replace("{{ Title }}", title)
-            .replace("{{ Content }}", html_content)
+def generate_pages(tasks, basepath, jobs=1, profiler=None, engine="tree", facts=None) -> list[bool]:
+    """
+    Run `generate_page` for every (source, template, destination) task, in order.
+
+    With `jobs > 1` the pages are fanned out over a process pool; each
+    worker reports its own errors just like the serial path does. Pages of
+    `PARALLEL_THRESHOLD` bytes or more are rendered here instead, with their
+    blocks fanned out over the same pool. When a `BuildProfiler` is given,
+    the stage spans recorded in the workers are sent back and merged into it;
+    so are the blocks each worker adds to its block cache, and its counters.
+    With a `facts` dict, each page's `PageFacts` is stored in it by source
+    path; a page that failed gets empty ones, its error being reported.
+    """
+    content_paths, templates, dest_paths = zip(*tasks) if tasks else ((), (), ())
+    page_facts = [PageFacts() if facts is not None else None for _ in content_paths]
+    huge = [i for i, path in enumerate(content_paths) if os.path.getsize(path) >= PARALLEL_THRESHOLD] if jobs > 1 else []
+    if jobs <= 1 or (len(tasks) < 2 and not huge):
+        results = list(map(generate_page, content_paths, templates, dest_paths, repeat(basepath), repeat(profiler),
+                           repeat(engine), repeat(None), page_facts))
+        record_facts(facts, content_paths, page_facts, results)
+        return results
+
+    huge_set = set(huge)
+    small = [i for i in range(len(tasks)) if i not in huge_set]
+    content_paths, templates, dest_paths = list(content_paths), list(templates), list(dest_paths)
+
+    def pick(items):
+        return [items[i] for i in small]
+
+    # Batch small pages together so the pool is not dominated by IPC overhead
+    chunksize = max(1, len(small) // (jobs * 4))
+    # Each worker warms its own block cache from what the last build
+    # persisted, and sends back what it adds so the parent can save it
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker,
+                             initargs=(block_cache.max_size, block_cache.path)) as executor:
+        # Every small page is queued up front; the huge ones run meanwhile
+        small_results = executor.map(
+            generate_page_in_worker, pick(content_paths), pick(templates), pick(dest_paths), repeat(basepath),
+            repeat(engine), repeat(profiler is not None), repeat(facts is not None),
+            chunksize=chunksize,
         )
-        
-        if basepath != "/":
-            filled_template = (filled_template
-                .replace('href="/', f'href="{basepath}')
-                .replace('src="/', f'src="{basepath}')
-                )
-        
+
+        results = [False] * len(tasks)
+        for i in huge:
+            results[i] = generate_page(content_paths[i], templates[i], dest_paths[i], basepath, profiler, engine,
+                                       executor, page_facts[i])
+        for i, (result, spans, cache_updates, worker_facts) in zip(small, small_results):
+            if profiler is not None:
+                profiler.extend(spans)
+            block_cache.merge(cache_updates)
+            results[i] = result
+            page_facts[i] = worker_facts
+    record_facts(facts, content_paths, page_facts, results)
+    return results
+
+
+def record_facts(facts, content_paths, page_facts, results):
+    if facts is None:
+        return
+    for content_path, collected, ok in zip(content_paths, page_facts, results):
+        facts[content_path] = collected if ok else PageFacts()
+
+
+def init_worker(max_size, path):
+    """
+    Pool initializer. A module-level function, so that under "spawn" the
+    worker configures its own global `block_cache`, not a pickled copy.
+    """
+    block_cache.configure(max_size, path, track=True)
+
+
+def generate_page_in_worker(content_path, template, dest_path, basepath, engine="tree", profile=False,
+                            collect=False):
+    """
+    Worker entry point: generate one page and return (ok, stage spans or
+    None, the block cache entries and counters to merge into the parent's,
+    its `PageFacts` or None).
+    """
+    profiler = BuildProfiler() if profile else None
+    facts = PageFacts() if collect else None
+    ok = generate_page(content_path, template, dest_path, basepath, profiler, engine, facts=facts)
+    if facts is not None:
+        facts.block = None  # Not worth sending back
+    return ok, profiler.spans if profiler is not None else None, block_cache.drain(), facts
+
+
+def generate_page(content_path, template, dest_path, basepath, profiler=None, engine="tree", executor=None,
+                  facts=None):
+    """
+    Render one markdown file into `dest_path`. `template` is a compiled
+    `Template` or plain template text. Returns False (after printing the
+    error) if the page could not be generated.
+
+    The "tree" engine builds an `HTMLNode` tree and streams it into the
+    template; the "fast" engine renders the markdown straight to a string
+    (see `fast_render`), with byte-identical output. Files of
+    `STREAMING_THRESHOLD` bytes or more are never held in memory whatever
+    the engine: see `generate_large_page`. Given a process pool `executor`,
+    files of `PARALLEL_THRESHOLD` bytes or more take that path too, with
+    their blocks rendered across the pool.
+
+    With a `BuildProfiler`, every stage is timed; the body is then buffered
+    so serialization, template fill and writing can be measured apart.
+    With a `PageFacts`, the page's links are collected as it is rendered.
+    """
+    stage = profiler.stage if profiler is not None else no_stage
+    try:
+        if isinstance(template, str):
+            template = compile_template(template)
+        template = template.for_basepath(basepath)
+        cache = block_cache if block_cache.enabled else None
+
         # Create output directory if it doesn't exist
         dest_dir_path = os.path.dirname(dest_path)
         if dest_dir_path != "":
             os.makedirs(dest_dir_path, exist_ok=True)
-        
-        # Write output file
-        with open(dest_path, "w", encoding="utf-8") as f:
-            f.write(filled_template)
+
+        size = os.path.getsize(content_path)
+        if size >= STREAMING_THRESHOLD or (executor is not None and size >= PARALLEL_THRESHOLD):
+            generate_large_page(content_path, template, dest_path, basepath, cache, stage, executor, engine, facts)
+            print(f"Generated: {content_path} -> {dest_path}")
+            return True
+
+        title, body = render_body(content_path, basepath, engine, stage, facts)
+
+        if profiler is None:
+            # Fill template, streaming the body in place of {{ Content }}
+            write_page(dest_path, lambda f: template.stream(f, {
+                "Title": title,
+                "Content": body if isinstance(body, str) else lambda out: write_html(body, out),
+            }))
+        else:
+            html_content = body
+            if not isinstance(body, str):
+                with stage(content_path, "serialize"):
+                    html_content = body.to_html()
+            with stage(content_path, "template"):
+                filled_template = template.render({"Title": title, "Content": html_content})
+            with stage(content_path, "write"):
+                write_page(dest_path, lambda f: f.write(filled_template))
             
         print(f"Generated: {content_path} -> {dest_path}")
         return True
@@ -64,8 +240,141 @@ def generate_page(content_path, template, dest_path, basepath):
         print(f"Error generating {content_path}: {e}")
         return False
 
-        
-        
+
+def render_page(content_path, template, basepath, engine="tree") -> str:
+    """Render one markdown file to the full page HTML without writing it anywhere."""
+    if isinstance(template, str):
+        template = compile_template(template)
+    title, body = render_body(content_path, basepath, engine)
+    return template.for_basepath(basepath).render({"Title": title, "Content": body_to_html(body)})
+
+
+def render_body(content_path, basepath, engine="tree", stage=no_stage, facts=None) -> tuple[str, object]:
+    """
+    Read one markdown file and render it in memory: returns (title, body),
+    what its template is filled with. The body is an HTML string with the
+    "fast" engine and an `HTMLNode` tree with "tree", so it can be streamed
+    (see `body_to_html`). Every page the build, the dev server or the feed
+    renders goes through here. Links are collected into `facts`, if given.
+    """
+    cache = block_cache if block_cache.enabled else None
+    with stage(content_path, "read"):
+        with open(content_path, "r", encoding="utf-8") as f:
+            text = f.read()
+        meta, markdown_content = split_front_matter(text)
+
+    with stage(content_path, "blocks"):
+        first_line = text.count("\n", 0, len(text) - len(markdown_content)) + 1
+        blocks = markdown_to_typed_blocks(markdown_content, first_line)
+    if engine == "fast":
+        with stage(content_path, "render"):
+            body = blocks_to_html(blocks, basepath, cache, facts)
+    else:
+        with stage(content_path, "inline"):
+            body = blocks_to_html_node(blocks, basepath, cache, facts)
+
+    with stage(content_path, "title"):
+        title = page_title(meta, markdown_content)
+    return title, body
+
+
+def body_to_html(body) -> str:
+    """The HTML of a body returned by `render_body`."""
+    return body if isinstance(body, str) else body.to_html()
+
+
+def generate_large_page(content_path, template, dest_path, basepath, cache=None, stage=no_stage, executor=None,
+                        engine="tree", facts=None):
+    """
+    Render a very large markdown file block by block: the title is found by
+    a prefix scan that stops at the first heading (or comes from the front
+    matter, which is skipped), then blocks are read
+    lazily and each one is written as soon as it is converted. Peak memory
+    is bounded by the largest single block, not the document.
+
+    With a process pool `executor`, runs of blocks are rendered across it
+    and written back in order (see `parallel_render`).
+    """
+    with stage(content_path, "title"):
+        with open(content_path, "r", encoding="utf-8") as f:
+            meta, _ = open_body(f)
+            title = meta["title"] if isinstance(meta.get("title"), str) else extract_title_from_lines(f)
+
+    def write_body(out):
+        with open(content_path, "r", encoding="utf-8") as f:
+            _, first_line = open_body(f)
+            if executor is None:
+                write_markdown_html(f, out, basepath, cache, facts, first_line)
+            else:
+                write_markdown_html_parallel(f, out, executor, basepath, engine, facts=facts, first_line=first_line)
+
+    try:
+        with stage(content_path, "stream"):
+            write_page(dest_path, lambda f: template.stream(f, {"Title": title, "Content": write_body}))
+    except Exception:
+        if executor is None:
+            raise
+        # Render serially so the reported error is the one a serial build gives
+        if facts is not None:
+            facts.reset()
+        generate_large_page(content_path, template, dest_path, basepath, cache, stage, facts=facts)
+
+
+def open_body(f) -> tuple[dict, int]:
+    """
+    Read the front matter of an open file and leave it positioned at the
+    markdown body. Returns (metadata, the line number the body starts on).
+    """
+    meta, consumed = parse_front_matter(f)
+    f.seek(0)
+    # Front matter is short: read it again to count its lines
+    first_line = f.read(consumed).count("\n") + 1
+    return meta, first_line
+
+
+def page_title(meta: dict, markdown: str) -> str:
+    """The `title:` from the front matter, or else the first "# " heading of the body."""
+    title = meta.get("title")
+    return title if isinstance(title, str) else extract_title(markdown)
+
+
+def write_page(dest_path, write) -> bool:
+    """
+    Call `write(f)` on a temporary file and move it over `dest_path`, so a
+    failed render never leaves a partial page behind.
+
+    If `dest_path` already holds exactly the same bytes it is left
+    untouched, keeping its mtime so deploys only upload what changed.
+    Returns True if the file was written.
+    """
+    tmp_path = f"{dest_path}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            write(f)
+        if os.path.exists(dest_path) and same_bytes(tmp_path, dest_path):
+            os.remove(tmp_path)
+            return False
+        os.replace(tmp_path, dest_path)
+        return True
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def same_bytes(path_a, path_b) -> bool:
+    """Return True if both files have identical contents."""
+    if os.path.getsize(path_a) != os.path.getsize(path_b):
+        return False
+    with open(path_a, "rb") as a, open(path_b, "rb") as b:
+        while True:
+            chunk = a.read(1 << 16)
+            if chunk != b.read(1 << 16):
+                return False
+            if not chunk:
+                return True
+
+
 def extract_title(markdown: str) -> str:
     """
     Extract title from markdown content.
@@ -79,7 +388,12 @@ def extract_title(markdown: str) -> str:
     Raises:
         ValueError: If no title is found
     """
-    lines = markdown.split("\n")
+    # Iterate lines lazily: the scan usually stops within the first few
+    return extract_title_from_lines(io.StringIO(markdown))
+
+
+def extract_title_from_lines(lines) -> str:
+    """Like `extract_title`, but stops reading `lines` (e.g. a file) at the title."""
     for line in lines:
         line = line.strip()
         if line.startswith("# "):
@@ -1,4 +1,10 @@
+import io
+
+
 class HTMLNode:
+    # Slotted: a large site creates millions of short-lived nodes
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
         self.value = value
@@ -18,8 +24,14 @@ class HTMLNode:
  
     
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag: str, value: str, props: dict = None):
-        super().__init__(tag, value, None, props)
+        # Assign directly: cheaper than going through HTMLNode.__init__
+        self.tag = tag
+        self.value = value
+        self.children = None
+        self.props = props
         
     def to_html(self) -> str:
         if self.value is None:
@@ -38,18 +50,60 @@ class LeafNode(HTMLNode):
  
     
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag: str, children: list[LeafNode], props=None):
-        super().__init__(tag, None, children, props)
+        self.tag = tag
+        self.value = None
+        self.children = children
+        self.props = props
     
     def to_html(self) -> str:
         """Create a html tree"""
-        if not self.tag:
-            raise ValueError("invalid HTML: no tag")
-        if not self.children:
-            raise ValueError("invalid HTML: no children")
-        
-        open_tag = f"<{self.tag}{self.props_to_html()}>"
-        close_tag = f"</{self.tag}>"
-        child_tag = ''.join([child.to_html() for child in self.children])
-        
-        return f"{open_tag}{child_tag}{close_tag}"
+        buffer = io.StringIO()
+        write_html(self, buffer)
+        return buffer.getvalue()
+
+
+class RawHTMLNode(HTMLNode):
+    """An already rendered HTML fragment, emitted verbatim."""
+    __slots__ = ()
+
+    def __init__(self, html: str):
+        self.tag = None
+        self.value = html
+        self.children = None
+        self.props = None
+
+    def to_html(self) -> str:
+        return self.value
+
+    def __repr__(self) -> str:
+        return f"RawHTMLNode({self.value})"
+
+
+def write_html(node: HTMLNode, sink):
+    """
+    Serialize `node` into `sink`, anything with a `write(str)` method such as
+    an open file or `io.StringIO`.
+
+    The tree is walked with an explicit stack, so nesting depth is not bound
+    by the recursion limit and no intermediate strings are built per level.
+    """
+    write = sink.write
+    stack = [node]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            # Pending close tag
+            write(item)
+        elif isinstance(item, ParentNode):
+            if not item.tag:
+                raise ValueError("invalid HTML: no tag")
+            if not item.children:
+                raise ValueError("invalid HTML: no children")
+            write(f"<{item.tag}{item.props_to_html()}>")
+            stack.append(f"</{item.tag}>")
+            stack.extend(reversed(item.children))
+        else:
+            write(item.to_html())
@@ -93,6 +93,19 @@ def split_nodes_link(old_nodes: list[TextNode]) -> list[TextNode]:
     return new_nodes
 
 
+# Same grammar as extract_markdown_image/extract_markdown_link; the link
+# lookbehind is checked by the scanner instead of the regex
+IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+LINK_PATTERN = re.compile(r"\[([^\[\]]*)\]\(([^\(\)]*)\)")
+
+# Delimiters in the order the multi-pass pipeline applies them
+INLINE_DELIMITERS = (
+    ("`", TextType.CODE),
+    ("**", TextType.BOLD),
+    ("_", TextType.ITALIC),
+)
+
+
 def extract_markdown_image(text: str) -> list[tuple]:
     return re.findall(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
     
@@ -102,6 +115,92 @@ def extract_markdown_link(text:str)-> list[tuple]:
 
 
 def text_to_textnodes(text: str) -> list[TextNode]:
+    """
+    Tokenize inline markdown in a single left-to-right scan.
+
+    Produces exactly the same nodes as `text_to_textnodes_multipass`: images
+    win over links, links never span an image, and the code/bold/italic
+    delimiters are resolved inside the plain-text runs between them. On
+    malformed input the multi-pass pipeline is re-run so the raised error
+    is identical too.
+    """
+    try:
+        return scan_inline(text, TextNode)
+    except SyntaxError:
+        return text_to_textnodes_multipass(text)
+
+
+def scan_inline(text: str, make_token=TextNode) -> list:
+    """
+    The scanner behind `text_to_textnodes`. Each token is built with
+    `make_token(text, text_type, url=None)`, so callers that only want HTML
+    can render tokens directly instead of creating `TextNode`s. Raises
+    SyntaxError on an unmatched delimiter.
+    """
+    nodes = []
+    pending = 0  # Start of the plain text not yet emitted
+    search = 0
+    while True:
+        i = text.find("[", search)
+        if i == -1:
+            break
+        if i > 0 and text[i - 1] == "!":
+            match = IMAGE_PATTERN.match(text, i - 1)
+            if match is None:
+                # A link can't start here either: "![" is never a link
+                search = i + 1
+                continue
+            start, node = i - 1, make_token(match[1], TextType.IMAGE, match[2])
+        else:
+            match = LINK_PATTERN.match(text, i)
+            if match is None or _contains_image(text, i + 1, match.end()):
+                search = i + 1
+                continue
+            start, node = i, make_token(match[1], TextType.LINK, match[2])
+
+        _split_delimiters(text[pending:start], nodes, make_token)
+        nodes.append(node)
+        pending = search = match.end()
+
+    _split_delimiters(text[pending:], nodes, make_token)
+    return nodes
+
+
+def _contains_image(text: str, start: int, end: int) -> bool:
+    """Return True if an image starts inside text[start:end]."""
+    i = text.find("![", start, end)
+    while i != -1:
+        if IMAGE_PATTERN.match(text, i):
+            return True
+        i = text.find("![", i + 1, end)
+    return False
+
+
+def _split_delimiters(text: str, nodes: list, make_token=TextNode, level: int = 0):
+    """Append the nodes for a run of text containing no images or links."""
+    if not text:
+        return
+    if level == len(INLINE_DELIMITERS):
+        nodes.append(make_token(text, TextType.TEXT))
+        return
+
+    delimiter, text_type = INLINE_DELIMITERS[level]
+    if delimiter not in text:
+        _split_delimiters(text, nodes, make_token, level + 1)
+        return
+
+    sections = text.split(delimiter)
+    if len(sections) % 2 == 0:
+        raise SyntaxError(f"Invalid markdown: opening delimiter '{delimiter}' without matching closing delimiter")
+    for i, section in enumerate(sections):
+        if i % 2 == 1:
+            nodes.append(make_token(section, text_type))
+        else:
+            _split_delimiters(section, nodes, make_token, level + 1)
+
+
+def text_to_textnodes_multipass(text: str) -> list[TextNode]:
+    """Reference five-pass pipeline, kept for error reporting and benchmarks."""
     # Start with a single node containing the entire text as plain text.
     nodes = [TextNode(text, TextType.TEXT)]
 
@@ -0,0 +1,96 @@
+import os
+import posixpath
+import re
+from collections import namedtuple
+from collections.abc import Iterable
+from urllib.parse import unquote, urlsplit
+from page_facts import LinkRef, collect_facts
+
+
+# "https:", "mailto:"... anything with a scheme leaves the site
+SCHEME_PATTERN = re.compile(r"^[A-Za-z][A-Za-z0-9+.-]*:")
+
+# A reference that does not resolve to anything the build outputs
+BrokenLink = namedtuple("BrokenLink", ["source", "line", "kind", "url"])
+
+
+class LinkReport:
+    def __init__(self):
+        self.checked = 0
+        self.broken = []
+
+    def __str__(self):
+        return f"Links: {self.checked} internal links checked, {len(self.broken)} broken"
+
+
+def extract_links(lines: Iterable[str], first_line: int = 1) -> list[LinkRef]:
+    """
+    Every LINK and IMAGE of a markdown document, found with the same inline
+    parser the renderer uses (code blocks are skipped), with the line each
+    one is written on. The build collects them while rendering instead.
+    """
+    return collect_facts(lines, first_line).links
+
+
+def is_internal(url: str) -> bool:
+    return bool(url) and not url.startswith(("#", "//")) and SCHEME_PATTERN.match(url) is None
+
+
+def resolve_target(url: str, page_output: str):
+    """
+    The output path (relative to the site root, "/"-separated) an internal
+    URL points at from the page written to `page_output`, or None if it
+    leaves the site. "/blog/tom" -> "blog/tom"; "../a.png" from
+    "blog/tom/index.html" -> "blog/a.png".
+    """
+    path = unquote(urlsplit(url).path)
+    if path.startswith("/"):
+        path = path[1:]
+    else:
+        path = posixpath.join(posixpath.dirname(page_output), path)
+    trailing_slash = path.endswith("/") or path == ""
+    path = posixpath.normpath(path) if path else "."
+    if path == ".." or path.startswith("../"):
+        return None
+    if path == ".":
+        path = ""
+    return path + "/" if trailing_slash and path else path
+
+
+def target_exists(target: str, outputs: set) -> bool:
+    """A target exists if it is an output, a directory with an index.html, or a page without its .html."""
+    if target == "" or target.endswith("/"):
+        return f"{target}index.html" in outputs
+    return target in outputs or f"{target}/index.html" in outputs or f"{target}.html" in outputs
+
+
+def output_paths(index, dir_path_static, dest_dir_path, extra_outputs=()) -> set:
+    """
+    The set of every path the build outputs, relative to the site root:
+    the published pages in `index`, the files under `dir_path_static`, and
+    `extra_outputs` (paths under `dest_dir_path`, such as listings).
+    """
+    outputs = {page.output for page in index.pages()}
+    for dir_path, _, filenames in os.walk(dir_path_static):
+        for filename in filenames:
+            rel_path = os.path.relpath(os.path.join(dir_path, filename), dir_path_static)
+            outputs.add(rel_path.replace(os.sep, "/"))
+    for path in extra_outputs:
+        outputs.add(os.path.relpath(path, dest_dir_path).replace(os.sep, "/"))
+    return outputs
+
+
+def check_links(index, outputs: set) -> LinkReport:
+    """
+    Validate every internal link and image of the published pages in one
+    pass over the references stored in `index`: no markdown is parsed here.
+    """
+    report = LinkReport()
+    for source, page_output, ref in index.links():
+        if not is_internal(ref.url):
+            continue
+        report.checked += 1
+        target = resolve_target(ref.url, page_output)
+        if target is None or not target_exists(target, outputs):
+            report.broken.append(BrokenLink(source, ref.line, ref.kind, ref.url))
+    return report
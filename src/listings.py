@@ -0,0 +1,188 @@
+import html
+import json
+import os
+import re
+from collections import namedtuple
+from build_manifest import hash_text, remove_empty_dirs
+from generate_content import write_page
+from html_node import LeafNode, ParentNode
+from state_file import load_state, save_state
+from templates import layouts_dir_for, template_cache
+from text_node import rewrite_url
+
+
+# Entries per listing page (--page-size)
+PAGE_SIZE = 10
+DATE_PATTERN = re.compile(r"^(\d{4})-(\d{2})")
+SLUG_PATTERN = re.compile(r"[^a-z0-9]+")
+
+# A generated listing: `dir` is its output directory relative to the site
+# root ("blog", "tags/tolkien", "archive/2024/05"), `pages` its members
+Listing = namedtuple("Listing", ["dir", "title", "pages"])
+
+
+class ListingSummary:
+    def __init__(self):
+        self.outputs = []
+        self.rendered = 0
+        self.unchanged = 0
+        self.removed = []
+
+    def __str__(self):
+        return (f"Listings: {self.rendered} rendered, {self.unchanged} unchanged, "
+                f"{len(self.removed)} removed")
+
+
+def slugify(text: str) -> str:
+    """A URL-safe directory name for a tag ("Middle Earth" -> "middle-earth")."""
+    return SLUG_PATTERN.sub("-", text.lower()).strip("-") or "-"
+
+
+def output_url(output: str, basepath: str = "/") -> str:
+    """The URL of an output relative to the site root ("blog/tom/index.html" -> "/blog/tom/")."""
+    if output == "index.html" or output.endswith("/index.html"):
+        output = output[:-len("index.html")]
+    return rewrite_url("/" + output, basepath)
+
+
+def group_listings(pages, section: str = "blog") -> dict[str, Listing]:
+    """
+    Sort `pages` (`PageInfo`s, newest first) into listings in a single pass:
+    the pages under `section/`, one listing per tag and one per month of
+    `date`. Members keep the order of `pages`.
+    """
+    listings = {}
+
+    def add(dir_path, title, page):
+        listing = listings.get(dir_path)
+        if listing is None:
+            listing = listings[dir_path] = Listing(dir_path, title, [])
+        listing.pages.append(page)
+
+    section_index = f"{section}/index.html"
+    for page in pages:
+        if page.output.startswith(f"{section}/") and page.output != section_index:
+            add(section, section.capitalize(), page)
+        for tag in page.tags:
+            add(f"tags/{slugify(tag)}", f"Tagged: {tag}", page)
+        match = DATE_PATTERN.match(page.date or "")
+        if match is not None:
+            add(f"archive/{match[1]}/{match[2]}", f"Archive: {match[1]}-{match[2]}", page)
+    return listings
+
+
+def paginate(listing: Listing, page_size: int = PAGE_SIZE):
+    """Yield (output, number, count, pages) for every page of a listing."""
+    count = max(1, -(-len(listing.pages) // page_size))
+    for number in range(1, count + 1):
+        yield (page_output(listing.dir, number), number, count,
+               listing.pages[(number - 1) * page_size:number * page_size])
+
+
+def page_output(dir_path: str, number: int) -> str:
+    """Page 1 is `<dir>/index.html`, page n is `<dir>/page/<n>/index.html`."""
+    if number == 1:
+        return f"{dir_path}/index.html"
+    return f"{dir_path}/page/{number}/index.html"
+
+
+def listing_to_html_node(listing: Listing, number: int, count: int, pages, basepath: str = "/") -> ParentNode:
+    items = []
+    for page in pages:
+        children = [LeafNode("a", html.escape(page.title or page.output, quote=False),
+                             {"href": output_url(page.output, basepath)})]
+        if page.date is not None:
+            children.append(LeafNode(None, " "))
+            children.append(LeafNode("time", html.escape(page.date), {"datetime": html.escape(page.date)}))
+        items.append(ParentNode("li", children))
+
+    children = [LeafNode("h1", html.escape(listing_title(listing, number), quote=False))]
+    if items:
+        children.append(ParentNode("ul", items))
+    if count > 1:
+        links = []
+        if number > 1:
+            links.append(LeafNode("a", "Newer", {
+                "href": output_url(page_output(listing.dir, number - 1), basepath), "rel": "prev"}))
+        if number < count:
+            links.append(LeafNode("a", "Older", {
+                "href": output_url(page_output(listing.dir, number + 1), basepath), "rel": "next"}))
+        children.append(ParentNode("nav", links))
+    return ParentNode("div", children)
+
+
+def listing_title(listing: Listing, number: int) -> str:
+    return listing.title if number == 1 else f"{listing.title} (page {number})"
+
+
+def listing_template(template_path: str):
+    """`layouts/listing.html` when it exists, the default template otherwise."""
+    layouts_dir = layouts_dir_for(template_path)
+    layout_path = os.path.join(layouts_dir, "listing.html")
+    if os.path.isfile(layout_path):
+        return template_cache.get(layout_path, os.path.join(layouts_dir, "partials"))
+    return template_cache.get(template_path)
+
+
+def iter_listing_pages(index, page_size: int = PAGE_SIZE, section: str = "blog"):
+    """
+    Yield (output, listing, number, count, pages) for every listing page of
+    the published pages in `index`, skipping outputs a page generated from
+    content/ already takes.
+    """
+    taken = {page.output for page in index.pages(include_drafts=True)}
+    for listing in group_listings(index.pages(), section).values():
+        for output, number, count, pages in paginate(listing, page_size):
+            if output not in taken:
+                yield output, listing, number, count, pages
+
+
+def render_listing(sink, template, listing: Listing, number: int, count: int, pages, basepath: str = "/"):
+    """Stream one listing page, filled into `template` (already bound to `basepath`), to `sink`."""
+    node = listing_to_html_node(listing, number, count, pages, basepath)
+    template.stream(sink, {
+        "Title": html.escape(listing_title(listing, number), quote=False),
+        "Content": node.to_html(),
+    })
+
+
+def generate_listings(index, template_path, dest_dir_path, basepath="/", page_size: int = PAGE_SIZE,
+                      state_path=None, section: str = "blog") -> ListingSummary:
+    """
+    Write the blog index, tag and monthly archive pages for the pages in a
+    `ContentIndex`, paginated `page_size` entries at a time. Drafts are left
+    out, and a listing never overwrites a page generated from content/.
+
+    Each listing page's digest covers its layout, basepath, position and
+    the title, date and URL of its members; it is kept in `state_path`, so
+    a page is re-rendered only when that changes. Listing pages that are
+    no longer produced are removed.
+    """
+    summary = ListingSummary()
+    state = load_state(state_path, {}) if state_path is not None else {}
+    digests = {}
+    template = listing_template(template_path).for_basepath(basepath)
+
+    for output, listing, number, count, pages in iter_listing_pages(index, page_size, section):
+        dest_path = os.path.join(dest_dir_path, *output.split("/"))
+        digest = hash_text(template.digest, basepath, json.dumps(
+            [listing.dir, listing.title, number, count, [(page.output, page.title, page.date) for page in pages]]
+        ))
+        digests[dest_path] = digest
+        summary.outputs.append(dest_path)
+        if state.get(dest_path) == digest and os.path.exists(dest_path):
+            summary.unchanged += 1
+            continue
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        write_page(dest_path, lambda f: render_listing(f, template, listing, number, count, pages, basepath))
+        summary.rendered += 1
+        print(f"Generated: listing {listing.dir} (page {number}) -> {dest_path}")
+
+    for dest_path in state:
+        if dest_path not in digests and os.path.exists(dest_path):
+            os.remove(dest_path)
+            remove_empty_dirs(os.path.dirname(dest_path), dest_dir_path)
+            summary.removed.append(dest_path)
+    if state_path is not None:
+        save_state(state_path, digests, indent=1, sort_keys=True)
+    return summary
@@ -1,29 +1,275 @@
+import argparse
 import os
+import signal
 import sys
-from shutil import rmtree
-from copy_static import copy_files_recursive
+from copy_static import LINK_MODES, load_synced, sync_static
 from generate_content import generate_pages_recursive
+from build_manifest import BuildManifest
+from watch import SiteWatcher
+from profiling import BuildProfiler
+from block_cache import block_cache
+from fast_render import ENGINES
+from compress import precompress
+from deploy_delta import compute_delta, remove_stale_outputs, save_delta, snapshot
+from build_daemon import BuildDaemon
+from dev_server import DevServer
+from content_index import ContentIndex
+from listings import PAGE_SIZE, generate_listings
+from feeds import generate_feeds
+from search_index import build_search_index
+from link_checker import check_links, output_paths
 
 
 dir_path_static = "./static"
 # dir_path_public = "./public"
 dir_path_docs = "./docs" # For github pages!!!
 dir_path_content = "./content"
+dir_path_cache = "./.ssg-cache"
 template_path = "./template.html"
+manifest_path = os.path.join(dir_path_cache, "manifest.json")
+static_state_path = os.path.join(dir_path_cache, "static.json")
+profile_path = os.path.join(dir_path_cache, "profile.json")
+trace_path = os.path.join(dir_path_cache, "trace.json")
+block_cache_path = os.path.join(dir_path_cache, "blocks.json")
+gzip_state_path = os.path.join(dir_path_cache, "gzip.json")
+delta_path = os.path.join(dir_path_cache, "delta.json")
+build_socket_path = os.path.join(dir_path_cache, "build.sock")
+content_index_path = os.path.join(dir_path_cache, "content.db")
+listings_state_path = os.path.join(dir_path_cache, "listings.json")
+search_state_path = os.path.join(dir_path_cache, "search.json")
 
-def main():
-    if len(sys.argv) == 2:
-        basepath = sys.argv[1]
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build the static site into ./docs")
+    parser.add_argument("basepath", nargs="?", default="/",
+                        help="URL prefix the site is served under (default: /)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only rebuild pages whose inputs changed since the last build")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="render pages across N worker processes (0: one per CPU)")
+    parser.add_argument("--link-mode", choices=LINK_MODES, default="copy",
+                        help="how changed static assets are placed in ./docs (default: copy)")
+    parser.add_argument("--checksum", action="store_true",
+                        help="compare static assets by content instead of size and mtime")
+    parser.add_argument("--watch", action="store_true",
+                        help="after building, poll the sources and rebuild what changes")
+    parser.add_argument("--only", action="append", metavar="PATH",
+                        help="rebuild only what this content, static or layout file affects (repeatable)")
+    parser.add_argument("--block-cache", type=int, default=0, metavar="N",
+                        help="cache the rendered HTML of up to N blocks shared across pages (0: off)")
+    parser.add_argument("--persist-block-cache", action="store_true",
+                        help=f"keep the block cache between builds in {block_cache_path}")
+    parser.add_argument("--engine", choices=ENGINES, default="tree",
+                        help="tree: build an HTMLNode tree per page; fast: render markdown straight to HTML "
+                             "(same output, default: tree)")
+    parser.add_argument("--gzip", action="store_true",
+                        help="write .gz sidecars for HTML, CSS and other text outputs, skipping unchanged files")
+    parser.add_argument("--site-url", metavar="URL",
+                        help="public origin of the site (https://example.com); writes sitemap.xml and feed.xml")
+    parser.add_argument("--search", action="store_true",
+                        help="write a prefix-sharded full-text search index to ./docs/search, updated incrementally")
+    parser.add_argument("--strict-links", action="store_true",
+                        help="fail the build when an internal link or image points at nothing the site outputs")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE, metavar="N",
+                        help=f"entries per page of the generated blog, tag and archive listings (default: {PAGE_SIZE})")
+    parser.add_argument("--profile", action="store_true",
+                        help=f"time every build stage per page; writes {profile_path} and a Chrome trace to {trace_path}")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["serve-build"]:
+        serve_build(argv[1:])
+        return
+    if argv[:1] == ["serve"]:
+        serve(argv[1:])
+        return
+    args = parse_args(argv)
+    manifest = build(args)
+    if args.watch:
+        def after_rebuild():
+            with ContentIndex(content_index_path) as index:
+                refresh_index(index)
+                index.store_facts(watcher.facts)
+                watcher.facts.clear()
+                generate_index_outputs(args, index)
+
+        watcher = SiteWatcher(dir_path_content, dir_path_static, template_path, dir_path_docs,
+                              args.basepath, manifest, args.link_mode, args.engine, after_rebuild)
+        watcher.run()
+
+
+def serve(argv):
+    """Run the development server, which renders pages on request."""
+    parser = argparse.ArgumentParser(prog="main.py serve",
+                                     description="Preview the site, rendering each page when it is requested")
+    parser.add_argument("basepath", nargs="?", default="/",
+                        help="URL prefix the site is served under (default: /)")
+    parser.add_argument("--port", type=int, default=8888)
+    parser.add_argument("--bind", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--engine", choices=ENGINES, default="fast", help="render engine (default: fast)")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE, metavar="N",
+                        help=f"entries per page of the blog, tag and archive listings (default: {PAGE_SIZE})")
+    args = parser.parse_args(argv)
+
+    server = DevServer((args.bind, args.port), dir_path_content, dir_path_static, template_path,
+                       args.basepath, args.engine, content_index_path, max(1, args.page_size))
+    with server:
+        print(f"Serving {dir_path_content} on http://{args.bind}:{args.port}{args.basepath} (Ctrl+C to stop)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("Dev server stopped")
+
+
+def serve_build(argv):
+    """Run the build daemon; `build_client.py` sends it build requests."""
+    parser = argparse.ArgumentParser(prog="main.py serve-build",
+                                     description="Keep the generator warm and build on request over a Unix socket")
+    parser.add_argument("--socket", default=build_socket_path, help=f"socket path (default: {build_socket_path})")
+    args = parser.parse_args(argv)
+
+    def run_build(build_argv):
+        build_args = parse_args(build_argv)
+        if build_args.watch:
+            print("--watch is not available through the daemon")
+            return 2
+        build(build_args)
+
+    # Stop cleanly (and remove the socket) on SIGTERM as well as Ctrl+C
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    with BuildDaemon(args.socket, run_build) as daemon:
+        print(f"Build daemon listening on {args.socket} (Ctrl+C to stop)", flush=True)
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            print("Build daemon stopped")
+
+
+def build_targets(args, paths) -> BuildManifest:
+    """
+    Rebuild only what `paths` affect, as the watcher would on a change, then
+    run the same index-driven stages and delta as a full build.
+    """
+    before = snapshot(dir_path_docs)
+    manifest = BuildManifest.load(manifest_path)
+    block_cache.configure(args.block_cache, block_cache_path if args.persist_block_cache else None)
+    watcher = SiteWatcher(dir_path_content, dir_path_static, template_path, dir_path_docs,
+                          args.basepath, manifest, args.link_mode, args.engine)
+    paths = [watcher.source_path(path) for path in paths]
+    changed = [path for path in paths if os.path.exists(path)]
+    removed = [path for path in paths if not os.path.exists(path)]
+    touched = watcher.rebuild(changed, removed)
+    print(f"Rebuilt {touched} output(s)")
+    with ContentIndex(content_index_path) as index:
+        refresh_index(index)
+        index.store_facts(watcher.facts)
+        _, links = generate_index_outputs(args, index)
+    if block_cache.enabled:
+        block_cache.save()
+    finish_build(args, before, links)
+    return manifest
+
+
+def refresh_index(index):
+    counts = index.refresh(dir_path_content)
+    print(f"Index: {counts['added']} added, {counts['updated']} updated, {counts['removed']} removed, "
+          f"{counts['unchanged']} unchanged")
+
+
+def generate_index_outputs(args, index):
+    """
+    The stages that read the content index once the pages are written:
+    listings, feeds, the search index and the link check. Returns (the
+    outputs they generated, the `LinkReport`).
+    """
+    # Pages the build rendered have had their facts stored already
+    index.parse_pending()
+    basepath = args.basepath
+    listings = generate_listings(index, template_path, dir_path_docs, basepath, max(1, args.page_size),
+                                 listings_state_path)
+    print(listings)
+    feeds = None
+    if args.site_url:
+        feeds = generate_feeds(index, dir_path_docs, dir_path_content, template_path, args.site_url, basepath,
+                               listings.outputs)
+        print(feeds)
+    search = None
+    if args.search:
+        search = build_search_index(index, dir_path_docs, basepath, search_state_path)
+        print(search)
+    generated = (listings.outputs + (feeds.outputs if feeds is not None else [])
+                 + (search.outputs if search is not None else []))
+    links = check_links(index, output_paths(index, dir_path_static, dir_path_docs, generated))
+    for broken in links.broken:
+        print(f"Broken {broken.kind}: {broken.source}:{broken.line}: {broken.url}")
+    print(links)
+    return generated, links
+
+
+def finish_build(args, before, links):
+    """Compress, record the deploy delta against `before`, and enforce --strict-links."""
+    if args.gzip:
+        print(precompress(dir_path_docs, gzip_state_path))
+
+    delta = compute_delta(before, snapshot(dir_path_docs), dir_path_docs, args.basepath)
+    save_delta(delta_path, delta)
+    print(f"Delta: {len(delta['added'])} added, {len(delta['changed'])} changed, "
+          f"{len(delta['deleted'])} deleted ({delta_path})")
+    if args.strict_links and links.broken:
+        print(f"Build failed: {len(links.broken)} broken link(s) (--strict-links)")
+        raise SystemExit(1)
+
+
+def build(args) -> BuildManifest:
+    if args.only:
+        return build_targets(args, args.only)
+    basepath = args.basepath
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+
+    # Outputs are only rewritten when their bytes change, so comparing
+    # stamps before and after tells the deploy exactly what to upload
+    before = snapshot(dir_path_docs)
+    if args.incremental:
+        manifest = BuildManifest.load(manifest_path)
     else:
-        basepath = "/"
+        # Full build: regenerate every page from a fresh manifest, then drop
+        # whatever this build did not produce
+        manifest = BuildManifest(manifest_path)
+
+    summary = sync_static(dir_path_static, dir_path_docs, args.link_mode, args.checksum, static_state_path)
+    print(summary)
+    block_cache.configure(args.block_cache, block_cache_path if args.persist_block_cache else None)
+    profiler = BuildProfiler() if args.profile else None
+    with ContentIndex(content_index_path) as index:
+        refresh_index(index)
+        facts = {}
+        failures = generate_pages_recursive(dir_path_content, template_path, dir_path_docs, basepath, manifest,
+                                            jobs, profiler, args.engine, index, facts)
+        index.store_facts(facts)
+        generated, links = generate_index_outputs(args, index)
+    if failures:
+        print(f"{failures} page(s) failed to generate")
+    if block_cache.enabled:
+        block_cache.save()
+        stats = block_cache.stats()
+        if stats["hits"] or stats["misses"]:
+            print(f"Block cache: {stats['hits']} hits, {stats['misses']} misses, {stats['size']} entries")
+    if profiler is not None:
+        profiler.write_reports(profile_path, trace_path)
+        print(f"Profile: {profile_path} (Chrome trace: {trace_path})")
 
-    # Limpiar directorio público antes de copiar (opcional)
-    if os.path.exists(dir_path_docs):
-        rmtree(dir_path_docs)
-    
-    copy_files_recursive(dir_path_static, dir_path_docs)
-    generate_pages_recursive(dir_path_content, template_path, dir_path_docs, basepath)
+    for output in manifest.prune(dir_path_docs):
+        print(f"Removed: {output}")
+    if not args.incremental:
+        keep = [entry["output"] for entry in manifest.entries.values()] + load_synced(static_state_path) + generated
+        for output in remove_stale_outputs(dir_path_docs, keep, keep_sidecars=args.gzip):
+            print(f"Removed: {output}")
+    manifest.save()
+    finish_build(args, before, links)
+    return manifest
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
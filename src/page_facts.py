@@ -0,0 +1,85 @@
+import re
+from collections import Counter, namedtuple
+from collections.abc import Iterable
+from block_markdown import Block, BlockType, block_to_textnodes, scan_blocks
+from text_node import TextType
+
+
+# One reference from a page: the markdown line it is on, "link" or "image", and the URL as written
+LinkRef = namedtuple("LinkRef", ["line", "kind", "url"])
+
+# Search terms are lowercased runs of letters and digits, at least this long
+MIN_TERM_LENGTH = 2
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class PageFacts:
+    """
+    What the content index keeps about a page body, collected from the
+    inline tokens the renderer produces so the markdown is parsed once: the
+    links and images, with the line each one is written on, and the
+    frequency of every search term in the text (link and image text
+    included, markup stripped).
+
+    The renderers call `begin_block` before parsing a block's inline text
+    and `add_token` for every token; `add_block` parses a block that was
+    not rendered (e.g. a block cache hit).
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Forget what was collected, before the page is rendered again."""
+        self.links = []
+        self.terms = Counter()
+        self.block = None
+        self.row = 0
+
+    def begin_block(self, block: Block):
+        self.block = block
+        self.row = 0
+        if block.type == BlockType.CODE:
+            # Never parsed inline: its text is one token
+            add_terms(self.terms, "\n".join(block.lines)[4:-3])
+
+    def add_token(self, text: str, text_type: TextType, url: str = None):
+        add_terms(self.terms, text)
+        if text_type not in (TextType.LINK, TextType.IMAGE):
+            return
+        # Blocks are joined before inline parsing: find the line that holds the URL
+        lines = self.block.lines
+        target = f"]({url})"
+        for offset in range(self.row, len(lines)):
+            if target in lines[offset]:
+                self.row = offset
+                break
+        kind = "image" if text_type == TextType.IMAGE else "link"
+        self.links.append(LinkRef(self.block.start + self.row, kind, url))
+
+    def add_block(self, block: Block):
+        self.begin_block(block)
+        if block.type == BlockType.CODE:
+            return
+        for node in block_to_textnodes(block):
+            self.add_token(node.text, node.text_type, node.url)
+
+    def extend(self, other: "PageFacts"):
+        """Append the facts another process collected for the following blocks."""
+        self.links.extend(other.links)
+        self.terms.update(other.terms)
+
+
+def add_terms(terms: Counter, text: str):
+    """Count the search terms of `text` into `terms`."""
+    for token in TOKEN_PATTERN.findall(text.casefold()):
+        if len(token) >= MIN_TERM_LENGTH:
+            terms[token] += 1
+
+
+def collect_facts(lines: Iterable[str], first_line: int = 1) -> PageFacts:
+    """The `PageFacts` of markdown that is not being rendered, parsed block by block."""
+    facts = PageFacts()
+    for block in scan_blocks(lines, first_line):
+        facts.add_block(block)
+    return facts
@@ -0,0 +1,112 @@
+"""
+Render the blocks of one huge markdown document across a process pool.
+
+Blocks are independent once their boundaries are known, so a document is cut
+into ranges of whole blocks that workers render concurrently; the fragments
+are written back in document order. Output is byte-identical to the serial
+`markdown_to_html_node(...).to_html()`.
+"""
+import io
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from block_cache import block_cache
+from block_markdown import Block, markdown_to_html_node, scan_blocks, typed_block_to_html_node
+from fast_render import block_to_html
+from page_facts import PageFacts
+
+# Markdown per task: large enough to amortize pickling, small enough to balance
+CHUNK_BYTES = 256 * 1024
+# Chunks in flight at once; bounds memory while the next ones are read
+MAX_PENDING = 16
+
+
+def iter_block_chunks(blocks: Iterable[Block], chunk_bytes: int = CHUNK_BYTES) -> Iterator[list[Block]]:
+    """Group consecutive blocks into runs of roughly `chunk_bytes` of markdown."""
+    chunk, size = [], 0
+    for block in blocks:
+        chunk.append(block)
+        size += sum(len(line) + 1 for line in block.lines)
+        if size >= chunk_bytes:
+            yield chunk
+            chunk, size = [], 0
+    if chunk:
+        yield chunk
+
+
+def render_block_chunk(blocks: list[Block], basepath: str = "/", engine: str = "tree", facts=None) -> str:
+    """Worker entry point: the concatenated HTML of a run of blocks."""
+    cache = block_cache if block_cache.enabled else None
+    parts = []
+    for block in blocks:
+        text = "\n".join(block.lines) if cache is not None else None
+        html = cache.get(text, basepath) if cache is not None else None
+        if html is None:
+            if engine == "fast":
+                html = block_to_html(block, basepath, facts)
+            else:
+                html = typed_block_to_html_node(block, basepath, facts).to_html()
+            if cache is not None:
+                cache.put(text, basepath, html)
+        elif facts is not None:
+            facts.add_block(block)
+        parts.append(html)
+    return "".join(parts)
+
+
+def render_block_chunk_in_worker(blocks: list[Block], basepath: str = "/", engine: str = "tree"):
+    """
+    Like `render_block_chunk`, plus the chunk's `PageFacts` and what the
+    worker's block cache `drain`s.
+    """
+    facts = PageFacts()
+    html = render_block_chunk(blocks, basepath, engine, facts)
+    facts.block = None  # Not worth sending back
+    return html, facts, block_cache.drain()
+
+
+def write_markdown_html_parallel(lines: Iterable[str], sink, executor, basepath: str = "/", engine: str = "tree",
+                                 chunk_bytes: int = CHUNK_BYTES, facts=None, first_line: int = 1):
+    """
+    Parallel counterpart of `write_markdown_html`: blocks are read lazily
+    from `lines`, rendered a chunk at a time on `executor`, and written to
+    `sink` in order. A failing block raises its error here; callers that
+    need the serial error message should re-render serially. What the
+    workers add to their block caches is merged into this process's, and
+    the links they collect into `facts`.
+    """
+    pending = deque()
+    empty = True
+    for chunk in iter_block_chunks(scan_blocks(lines, first_line), chunk_bytes):
+        if empty:
+            sink.write("<div>")
+            empty = False
+        pending.append(executor.submit(render_block_chunk_in_worker, chunk, basepath, engine))
+        if len(pending) >= MAX_PENDING:
+            sink.write(collect(pending.popleft(), facts))
+    while pending:
+        sink.write(collect(pending.popleft(), facts))
+    if empty:
+        raise ValueError("invalid HTML: no children")
+    sink.write("</div>")
+
+
+def collect(future, facts=None) -> str:
+    html, chunk_facts, cache_updates = future.result()
+    block_cache.merge(cache_updates)
+    if facts is not None:
+        facts.extend(chunk_facts)
+    return html
+
+
+def markdown_to_html_parallel(markdown: str, basepath: str = "/", jobs: int = None, engine: str = "tree",
+                              chunk_bytes: int = CHUNK_BYTES) -> str:
+    """Same as `markdown_to_html_node(markdown, basepath).to_html()`, rendered on `jobs` processes."""
+    sink = io.StringIO()
+    try:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            write_markdown_html_parallel(markdown.split("\n"), sink, executor, basepath, engine, chunk_bytes)
+    except Exception:
+        # Let the serial renderer raise exactly the error it would have
+        return markdown_to_html_node(markdown, basepath).to_html()
+    return sink.getvalue()
@@ -0,0 +1,120 @@
+import json
+import math
+import os
+import time
+from contextlib import contextmanager, nullcontext
+
+
+# Build stages in pipeline order, as reported by generate_page
+STAGES = ("read", "blocks", "inline", "render", "title", "serialize", "template", "write", "stream")
+
+
+class BuildProfiler:
+    """
+    Collects one span per page per stage. Spans are plain tuples of
+    (page, stage, start_ns, duration_ns, pid) so worker processes can send
+    theirs back to the parent with the page result.
+    """
+
+    def __init__(self):
+        self.spans = []
+        self.origin_ns = time.perf_counter_ns()
+
+    @contextmanager
+    def stage(self, page: str, name: str):
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.spans.append((str(page), name, start, time.perf_counter_ns() - start, os.getpid()))
+
+    def extend(self, spans):
+        self.spans.extend(spans)
+
+    def summary(self, slowest: int = 10) -> dict:
+        return summarize(self.spans, slowest)
+
+    def write_reports(self, summary_path: str, trace_path: str):
+        for path in (summary_path, trace_path):
+            dir_path = os.path.dirname(path)
+            if dir_path != "":
+                os.makedirs(dir_path, exist_ok=True)
+        with open(summary_path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=2)
+        write_chrome_trace(self.spans, trace_path, self.origin_ns)
+
+
+def no_stage(page: str, name: str):
+    """Stand-in for `BuildProfiler.stage` when profiling is off."""
+    return nullcontext()
+
+
+def percentile(sorted_values: list, pct: float):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(spans, slowest: int = 10) -> dict:
+    """Totals and p50/p95 per stage (in ms), plus the slowest pages."""
+    by_stage = {}
+    by_page = {}
+    for page, stage, _, duration, _ in spans:
+        by_stage.setdefault(stage, []).append(duration)
+        page_stages = by_page.setdefault(page, {})
+        page_stages[stage] = page_stages.get(stage, 0) + duration
+
+    def ms(ns):
+        return round(ns / 1e6, 3)
+
+    stages = {}
+    for stage in sorted(by_stage, key=lambda s: STAGES.index(s) if s in STAGES else len(STAGES)):
+        durations = sorted(by_stage[stage])
+        stages[stage] = {
+            "count": len(durations),
+            "total_ms": ms(sum(durations)),
+            "p50_ms": ms(percentile(durations, 50)),
+            "p95_ms": ms(percentile(durations, 95)),
+            "max_ms": ms(durations[-1]),
+        }
+
+    pages = sorted(by_page.items(), key=lambda item: sum(item[1].values()), reverse=True)
+    return {
+        "pages": len(by_page),
+        "total_ms": ms(sum(duration for _, _, _, duration, _ in spans)),
+        "stages": stages,
+        "slowest_pages": [
+            {
+                "page": page,
+                "total_ms": ms(sum(page_stages.values())),
+                "stages_ms": {stage: ms(duration) for stage, duration in page_stages.items()},
+            }
+            for page, page_stages in pages[:slowest]
+        ],
+    }
+
+
+def write_chrome_trace(spans, path: str, origin_ns: int = 0):
+    """
+    Write spans in the Chrome trace-event format (chrome://tracing, Perfetto).
+    Each worker process shows up as its own track.
+    """
+    events = []
+    for pid in sorted({span[4] for span in spans}):
+        events.append({"name": "process_name", "ph": "M", "pid": pid, "tid": pid,
+                       "args": {"name": f"build worker {pid}"}})
+    for page, stage, start, duration, pid in spans:
+        events.append({
+            "name": stage,
+            "cat": "build",
+            "ph": "X",
+            "ts": (start - origin_ns) / 1000,
+            "dur": duration / 1000,
+            "pid": pid,
+            "tid": pid,
+            "args": {"page": page},
+        })
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
@@ -0,0 +1,125 @@
+import json
+import os
+from collections import Counter
+from generate_content import write_page
+from listings import output_url
+from page_facts import add_terms
+from state_file import load_state, save_state
+
+
+# Shards are keyed by the first characters of their terms
+PREFIX_LENGTH = 2
+SEARCH_DIR = "search"
+DOCS_FILE = "docs.json"
+
+
+class SearchSummary:
+    def __init__(self):
+        self.outputs = []
+        self.pages = 0
+        self.tokenized = 0
+        self.shards_written = 0
+        self.shards_removed = 0
+
+    def __str__(self):
+        return (f"Search: {self.pages} pages ({self.tokenized} tokenized), "
+                f"{self.shards_written} of {len(self.outputs) - 1} shards written, {self.shards_removed} removed")
+
+
+def page_terms(index, page) -> Counter:
+    """
+    Term frequencies of an indexed page: its front matter title plus the
+    terms of its text the render collected (see `PageFacts`).
+    """
+    terms = index.terms(page.source)
+    if isinstance(page.meta.get("title"), str):
+        add_terms(terms, page.meta["title"])
+    return terms
+
+
+def shard_of(term: str, prefix_length: int = PREFIX_LENGTH) -> str:
+    return term[:prefix_length]
+
+
+def build_search_index(index, dest_dir_path, basepath="/", state_path=None,
+                       prefix_length: int = PREFIX_LENGTH) -> SearchSummary:
+    """
+    Write an inverted index of every published page to `search/` in
+    `dest_dir_path`: `docs.json` maps document ids to [URL, title], and
+    each `<prefix>.json` shard maps the terms starting with that prefix to
+    [[document id, term frequency], ...]. A browser fetches docs.json and
+    only the shard of the term being searched.
+
+    The terms of every page come from the content index, whose pages must
+    all have their facts (see `ContentIndex.parse_pending`). They are kept
+    in `state_path` with its content digest, so only pages whose markdown
+    changed are read again, and only the shards holding terms they gained
+    or lost are rewritten.
+    """
+    summary = SearchSummary()
+    state = load_state(state_path, {}) if state_path is not None else {}
+    search_dir = os.path.join(dest_dir_path, SEARCH_DIR)
+    docs_path = os.path.join(search_dir, DOCS_FILE)
+    if state.get("prefix_length") != prefix_length or not os.path.exists(docs_path):
+        state = {}  # Nothing to update in place: write every shard
+    known = state.get("pages", {})
+    next_id = state.get("next_id", 0)
+    digests = index.digests()
+
+    pages = {}
+    affected = set()
+    docs_changed = not known
+    for page in index.pages():
+        url = output_url(page.output, basepath)
+        title = page.title or page.output
+        entry = known.pop(page.source, None)
+        if entry is None or entry["digest"] != digests[page.source]:
+            terms = page_terms(index, page)
+            summary.tokenized += 1
+            old_terms = entry["terms"] if entry is not None else {}
+            affected.update(shard_of(term, prefix_length) for term in terms.keys() | old_terms.keys()
+                            if terms.get(term) != old_terms.get(term))
+            if entry is None:
+                entry = {"id": next_id}
+                next_id += 1
+            entry = dict(entry, digest=digests[page.source], terms=dict(terms))
+        if entry.get("url") != url or entry.get("title") != title:
+            entry = dict(entry, url=url, title=title)
+            docs_changed = True
+        pages[page.source] = entry
+
+    # Whatever is left was removed or turned into a draft
+    for entry in known.values():
+        affected.update(shard_of(term, prefix_length) for term in entry["terms"])
+        docs_changed = True
+
+    shards = {}
+    prefixes = set()
+    for entry in pages.values():
+        for term, count in entry["terms"].items():
+            prefix = shard_of(term, prefix_length)
+            prefixes.add(prefix)
+            if prefix in affected or not state:
+                shards.setdefault(prefix, {}).setdefault(term, []).append([entry["id"], count])
+
+    os.makedirs(search_dir, exist_ok=True)
+    for prefix in (affected | prefixes) if not state else affected:
+        shard_path = os.path.join(search_dir, f"{prefix}.json")
+        if prefix in shards:
+            postings = {term: sorted(docs) for term, docs in shards[prefix].items()}
+            write_page(shard_path, lambda f: json.dump(postings, f, sort_keys=True, separators=(",", ":")))
+            summary.shards_written += 1
+        elif os.path.exists(shard_path):
+            os.remove(shard_path)
+            summary.shards_removed += 1
+    if docs_changed:
+        docs = {"prefix_length": prefix_length,
+                "docs": {entry["id"]: [entry["url"], entry["title"]] for entry in pages.values()}}
+        write_page(docs_path, lambda f: json.dump(docs, f, sort_keys=True, separators=(",", ":")))
+
+    summary.pages = len(pages)
+    summary.outputs = [docs_path] + [os.path.join(search_dir, f"{prefix}.json") for prefix in sorted(prefixes)]
+    if state_path is not None:
+        save_state(state_path, {"prefix_length": prefix_length, "next_id": next_id, "pages": pages},
+                   indent=1, sort_keys=True)
+    return summary
@@ -0,0 +1,41 @@
+import os
+import tempfile
+import unittest
+
+
+class SiteTestCase(unittest.TestCase):
+    """
+    Base for tests that work on files: every test gets a fresh temporary
+    directory, `self.root`, removed afterwards. `self.content`,
+    `self.static`, `self.docs` and `self.template_path` are where a site
+    keeps those under it; nothing is created until it is written.
+
+    `path`, `write` and `read` take paths relative to `self.root`, with "/"
+    separators, or absolute ones.
+    """
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+        self.content = self.path("content")
+        self.static = self.path("static")
+        self.docs = self.path("docs")
+        self.template_path = self.path("template.html")
+
+    def path(self, *parts) -> str:
+        if os.path.isabs(parts[0]):
+            return os.path.join(*parts)
+        return os.path.join(self.root, *(name for part in parts for name in part.split("/")))
+
+    def write(self, path, text) -> str:
+        """Write `text` to `path`, creating its directories. Returns the full path."""
+        path = self.path(path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def read(self, *parts) -> str:
+        with open(self.path(*parts), "r", encoding="utf-8") as f:
+            return f.read()
@@ -0,0 +1,44 @@
+"""
+The JSON state a build keeps between runs: the manifest, the block cache,
+the digests of compressed files, listings and search pages, the static
+sync record and the deploy delta. It is read leniently and written
+atomically.
+"""
+import json
+import os
+
+
+def load_state(path, default=None):
+    """
+    The JSON value stored in `path`, or `default` if the file is missing,
+    corrupt or holds a different type of value than `default`, in which
+    case the caller rebuilds it.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return default
+    if default is not None and not isinstance(data, type(default)):
+        return default
+    return data
+
+
+def save_state(path, data, **dump_options):
+    """
+    Write `data` to `path` as JSON (`dump_options` go to `json.dump`).
+    The JSON goes to a temporary file that then replaces `path`, so an
+    interrupted build never leaves half a file behind.
+    """
+    dir_path = os.path.dirname(path)
+    if dir_path != "":
+        os.makedirs(dir_path, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, **dump_options)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
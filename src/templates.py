@@ -0,0 +1,191 @@
+import os
+import re
+from build_manifest import hash_text
+
+
+# {{ Name }} is a slot filled at render time, {{> name }} a partial inlined at compile time
+TAG_PATTERN = re.compile(r"\{\{\s*(>?)\s*([\w./-]+)\s*\}\}")
+# Root-relative URL attributes in template markup ("//host" is protocol-relative)
+URL_ATTRIBUTE_PATTERN = re.compile(r'\b(href|src)="/(?!/)')
+
+
+class Template:
+    """
+    A template compiled once into literal segments and named slots.
+
+    `literals` always has one more item than `slots`, so filling a page is a
+    single pass that interleaves them; the document is never re-scanned.
+    """
+
+    def __init__(self, literals: list[str], slots: list[tuple[str, str]], dependencies: dict = None):
+        self.literals = literals
+        self.slots = slots  # (name, original tag text)
+        self.dependencies = dependencies or {}  # path -> mtime_ns
+        self.digest = hash_text(*literals, *(name for name, _ in slots))
+        self.rebased = {}
+
+    def for_basepath(self, basepath: str) -> "Template":
+        """
+        Return this template with root-relative href/src attributes in its
+        markup prefixed with `basepath`. Slot values are never touched.
+        """
+        if basepath == "/":
+            return self
+        template = self.rebased.get(basepath)
+        if template is None:
+            def prefix(match):
+                return f'{match[1]}="{basepath}'
+
+            literals = [URL_ATTRIBUTE_PATTERN.sub(prefix, literal) for literal in self.literals]
+            template = Template(literals, self.slots, self.dependencies)
+            self.rebased[basepath] = template
+        return template
+
+    def render(self, values: dict) -> str:
+        """Fill the slots from `values`; unknown slots are left as written."""
+        parts = [self.literals[0]]
+        for (name, tag), literal in zip(self.slots, self.literals[1:]):
+            parts.append(values.get(name, tag))
+            parts.append(literal)
+        return "".join(parts)
+
+    def stream(self, sink, values: dict):
+        """
+        Write the filled template into `sink`. A value may be a callable,
+        in which case it is called with the sink to write the slot itself.
+        """
+        sink.write(self.literals[0])
+        for (name, tag), literal in zip(self.slots, self.literals[1:]):
+            value = values.get(name, tag)
+            if callable(value):
+                value(sink)
+            else:
+                sink.write(value)
+            sink.write(literal)
+
+    def extract(self, page: str, values: dict, name: str = "Content"):
+        """
+        Recover the value of slot `name` from a `page` this template rendered
+        with `values` for its other slots. Returns None if the slot is not
+        used exactly once or the page was not rendered that way.
+        """
+        positions = [i for i, (slot, _) in enumerate(self.slots) if slot == name]
+        if len(positions) != 1:
+            return None
+        i = positions[0]
+
+        def fill(slots, literals):
+            return "".join(values.get(slot, tag) + literal for (slot, tag), literal in zip(slots, literals))
+
+        prefix = self.literals[0] + fill(self.slots[:i], self.literals[1:i + 1])
+        suffix = self.literals[i + 1] + fill(self.slots[i + 1:], self.literals[i + 2:])
+        if len(page) < len(prefix) + len(suffix) or not page.startswith(prefix) or not page.endswith(suffix):
+            return None
+        return page[len(prefix):len(page) - len(suffix)]
+
+    def __repr__(self) -> str:
+        return f"Template(slots={[name for name, _ in self.slots]}, digest={self.digest[:12]})"
+
+
+def compile_template(text: str, partials_dir: str = None, dependencies: dict = None) -> Template:
+    """Compile template text, inlining {{> partial }} tags from `partials_dir`."""
+    if dependencies is None:
+        dependencies = {}
+    segments = _expand(text, partials_dir, dependencies, ())
+
+    # Merge adjacent literals so literals and slots strictly alternate
+    literals, slots = [""], []
+    for segment in segments:
+        if isinstance(segment, str):
+            literals[-1] += segment
+        else:
+            slots.append(segment)
+            literals.append("")
+    return Template(literals, slots, dependencies)
+
+
+def _expand(text, partials_dir, dependencies, stack) -> list:
+    segments = []
+    pos = 0
+    for match in TAG_PATTERN.finditer(text):
+        segments.append(text[pos:match.start()])
+        pos = match.end()
+        is_partial, name = match.groups()
+        if not is_partial:
+            segments.append((name, match.group(0)))
+            continue
+        if partials_dir is None:
+            raise ValueError(f"Partial '{name}' used but no partials directory is configured")
+        partial_path = os.path.join(partials_dir, f"{name}.html")
+        if partial_path in stack:
+            raise ValueError(f"Recursive partial: {' -> '.join(stack + (partial_path,))}")
+        dependencies[partial_path] = os.stat(partial_path).st_mtime_ns
+        with open(partial_path, "r", encoding="utf-8") as f:
+            segments.extend(_expand(f.read(), partials_dir, dependencies, stack + (partial_path,)))
+    segments.append(text[pos:])
+    return segments
+
+
+def layouts_dir_for(template_path: str) -> str:
+    """Layouts live in a `layouts/` directory next to the default template."""
+    return os.path.join(os.path.dirname(template_path), "layouts")
+
+
+class TemplateCache:
+    """
+    Compiled templates keyed by path. An entry is reused until the template
+    or one of the partials it inlines changes on disk.
+    """
+
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, template_path: str, partials_dir: str = None) -> Template:
+        template = self.entries.get(template_path)
+        if template is not None and self._is_current(template):
+            return template
+
+        dependencies = {template_path: os.stat(template_path).st_mtime_ns}
+        try:
+            with open(template_path, "r", encoding="utf-8") as f:
+                text = f.read()
+        except Exception as e:
+            raise IOError(f"Error reading template file: {e}")
+        if partials_dir is None:
+            partials_dir = os.path.join(layouts_dir_for(template_path), "partials")
+        template = compile_template(text, partials_dir, dependencies)
+        self.entries[template_path] = template
+        return template
+
+    def resolve_layout(self, content_path: str, dir_path_content: str, template_path: str,
+                       layout: str = None) -> Template:
+        """
+        Pick the layout for a page: `layouts/<layout>.html` when the page names
+        one in its front matter (FileNotFoundError if it does not exist),
+        else `layouts/<section>.html` for pages under `content/<section>/`
+        when it exists, the default template otherwise.
+        """
+        layouts_dir = layouts_dir_for(template_path)
+        if layout is not None:
+            layout_path = os.path.join(layouts_dir, f"{layout}.html")
+            if not os.path.isfile(layout_path):
+                raise FileNotFoundError(f"Layout not found: {layout_path}")
+            return self.get(layout_path, os.path.join(layouts_dir, "partials"))
+        rel_path = os.path.relpath(content_path, dir_path_content)
+        section = rel_path.split(os.sep, 1)[0] if os.sep in rel_path else None
+        if section is not None:
+            layout_path = os.path.join(layouts_dir, f"{section}.html")
+            if os.path.isfile(layout_path):
+                return self.get(layout_path, os.path.join(layouts_dir, "partials"))
+        return self.get(template_path)
+
+    @staticmethod
+    def _is_current(template: Template) -> bool:
+        try:
+            return all(os.stat(path).st_mtime_ns == mtime for path, mtime in template.dependencies.items())
+        except FileNotFoundError:
+            return False
+
+
+# Shared by every build in this process (watch mode, repeated builds)
+template_cache = TemplateCache()
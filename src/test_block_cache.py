@@ -0,0 +1,94 @@
+import json
+import unittest
+from block_cache import PARSER_VERSION, BlockCache
+from block_markdown import markdown_to_html_node
+from site_test_case import SiteTestCase
+
+
+class TestBlockCache(unittest.TestCase):
+    def test_lru_eviction(self):
+        cache = BlockCache(max_size=2)
+        cache.put("a", "/", "<p>a</p>")
+        cache.put("b", "/", "<p>b</p>")
+        cache.get("a", "/")  # a is now most recently used
+        cache.put("c", "/", "<p>c</p>")
+        self.assertIsNone(cache.get("b", "/"))
+        self.assertEqual(cache.get("a", "/"), "<p>a</p>")
+        self.assertEqual(cache.get("c", "/"), "<p>c</p>")
+
+    def test_counters(self):
+        cache = BlockCache(max_size=10)
+        self.assertIsNone(cache.get("a", "/"))
+        cache.put("a", "/", "<p>a</p>")
+        cache.get("a", "/")
+        cache.get("a", "/SSG/")  # Different basepath, different key
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["size"]), (1, 2, 1))
+
+    def test_drain_and_merge(self):
+        worker = BlockCache()
+        worker.configure(10, track=True)
+        worker.get("a", "/")
+        worker.put("a", "/", "<p>a</p>")
+        worker.get("a", "/")
+        updates = worker.drain()
+        self.assertEqual(updates, ([("/", "a", "<p>a</p>")], 1, 1))
+        self.assertEqual(worker.drain(), ([], 0, 0))
+        self.assertEqual(worker.get("a", "/"), "<p>a</p>")  # Drained entries stay cached
+
+        parent = BlockCache(max_size=10)
+        parent.merge(updates)
+        self.assertEqual((parent.hits, parent.misses), (1, 1))
+        self.assertEqual(parent.entries[(1, "/", "a")], "<p>a</p>")
+        # An untracked cache has nothing to report
+        self.assertEqual(parent.drain(), ([], 0, 0))
+
+    def test_same_html_with_cache(self):
+        md = """# Title
+
+Shared **footer** with a [link](/about)
+
+- one
+- two
+
+Shared **footer** with a [link](/about)
+"""
+        cache = BlockCache(max_size=10)
+        expected = markdown_to_html_node(md, "/SSG/").to_html()
+        self.assertEqual(markdown_to_html_node(md, "/SSG/", cache).to_html(), expected)
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(markdown_to_html_node(md, "/SSG/", cache).to_html(), expected)
+        self.assertEqual(cache.misses, 3)
+
+
+class TestPersistedBlockCache(SiteTestCase):
+    def test_persist_round_trip(self):
+        path = self.path("blocks.json")
+        cache = BlockCache(max_size=10, path=path)
+        cache.put("a", "/", "<p>a</p>")
+        cache.save()
+
+        warm = BlockCache()
+        warm.configure(10, path)
+        self.assertEqual(warm.get("a", "/"), "<p>a</p>")
+
+    def test_other_parser_version_ignored(self):
+        path = self.write("blocks.json", json.dumps({"version": -1, "entries": [["/", "a", "stale"]]}))
+        cache = BlockCache()
+        cache.configure(10, path)
+        self.assertIsNone(cache.get("a", "/"))
+
+    def test_malformed_file_starts_cold(self):
+        path = self.path("blocks.json")
+        for data in ([["/", "a", "<p>a</p>"]], {"version": PARSER_VERSION},
+                     {"version": PARSER_VERSION, "entries": {"a": "<p>a</p>"}},
+                     {"version": PARSER_VERSION, "entries": [["/", "a"]]},
+                     {"version": PARSER_VERSION, "entries": [["/", "a", "<p>a</p>"], ["/", "b", None]]}):
+            self.write(path, json.dumps(data))
+            cache = BlockCache()
+            cache.configure(10, path)
+            self.assertIsNone(cache.get("a", "/"), data)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,16 @@
+import io
+import os
+import tempfile
 import unittest
 from html_node import HTMLNode, ParentNode
+from fast_render import markdown_to_html
 from block_markdown import (
     markdown_to_blocks, 
+    iter_blocks,
+    scan_blocks,
+    block_to_textnodes,
+    Block,
+    write_markdown_html,
     BlockType, 
     block_to_block_type,
     markdown_to_html_node, 
@@ -249,6 +258,13 @@ class TestBlockTypeDetection(unittest.TestCase):
 
 class TestMarkdownToHTML(unittest.TestCase):
 
+    def assertRendersAs(self, md, expected, basepath="/"):
+        """Golden output check, run against every render engine."""
+        with self.subTest(engine="tree"):
+            self.assertEqual(markdown_to_html_node(md, basepath).to_html(), expected)
+        with self.subTest(engine="fast"):
+            self.assertEqual(markdown_to_html(md, basepath), expected)
+
     def test_markdown_to_html_node(self):
         markdown = "# Heading\n\nSome paragraph\n\n- List item"
         html_node = markdown_to_html_node(markdown)
@@ -353,10 +369,8 @@ tag here
 
 """
 
-        node = markdown_to_html_node(md)
-        html = node.to_html()
-        self.assertEqual(
-            html,
+        self.assertRendersAs(
+            md,
             "<div><p>This is <b>bolded</b> paragraph text in a p tag here</p></div>",
         )
 
@@ -370,10 +384,8 @@ This is another paragraph with _italic_ text and `code` here
 
 """
 
-        node = markdown_to_html_node(md)
-        html = node.to_html()
-        self.assertEqual(
-            html,
+        self.assertRendersAs(
+            md,
             "<div><p>This is <b>bolded</b> paragraph text in a p tag here</p><p>This is another paragraph with <i>italic</i> text and <code>code</code> here</p></div>",
         )
 
@@ -389,10 +401,8 @@ This is another paragraph with _italic_ text and `code` here
 
 """
 
-        node = markdown_to_html_node(md)
-        html = node.to_html()
-        self.assertEqual(
-            html,
+        self.assertRendersAs(
+            md,
             "<div><ul><li>This is a list</li><li>with items</li><li>and <i>more</i> items</li></ul><ol><li>This is an <code>ordered</code> list</li><li>with items</li><li>and more items</li></ol></div>",
         )
 
@@ -405,10 +415,8 @@ this is paragraph text
 ## this is an h2
 """
 
-        node = markdown_to_html_node(md)
-        html = node.to_html()
-        self.assertEqual(
-            html,
+        self.assertRendersAs(
+            md,
             "<div><h1>this is an h1</h1><p>this is paragraph text</p><h2>this is an h2</h2></div>",
         )
 
@@ -421,10 +429,8 @@ this is paragraph text
 
 """
 
-        node = markdown_to_html_node(md)
-        html = node.to_html()
-        self.assertEqual(
-            html,
+        self.assertRendersAs(
+            md,
             "<div><blockquote>This is a blockquote block</blockquote><p>this is paragraph text</p></div>",
         )
 
@@ -436,13 +442,93 @@ the **same** even with inline stuff
 ```
 """
 
-        node = markdown_to_html_node(md)
-        html = node.to_html()
-        self.assertEqual(
-            html,
+        self.assertRendersAs(
+            md,
             "<div><pre><code>This is text that _should_ remain\nthe **same** even with inline stuff\n</code></pre></div>",
         )
 
+    def test_basepath_rewrites_urls_only(self):
+        md = """[home](/) and ![img](/images/a.png) and [ext](https://boot.dev)
+
+```
+<a href="/not-a-link">
+```
+"""
+
+        self.assertRendersAs(
+            md,
+            '<div><p><a href="/SSG/">home</a> and <img src="/SSG/images/a.png" alt="img"></img> '
+            'and <a href="https://boot.dev">ext</a></p>'
+            '<pre><code><a href="/not-a-link">\n</code></pre></div>',
+            basepath="/SSG/",
+        )
+
+    def test_write_markdown_html_matches_tree(self):
+        md = """# Title
+
+Paragraph with **bold** and a [link](/about)
+
+```
+code
+
+with a blank line
+```
+
+> quote
+> more
+"""
+        sink = io.StringIO()
+        write_markdown_html(io.StringIO(md), sink, "/SSG/")
+        self.assertEqual(sink.getvalue(), markdown_to_html_node(md, "/SSG/").to_html())
+
+    def test_streamed_file_matches_string(self):
+        documents = [
+            "# Title\n\nParagraph\n",
+            "# Title\n\n```inline```\n",
+            "# Title\n\n```\nclosed\n```",
+            "# Title\n\n> quote\n\n\n",
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            for md in documents:
+                path = os.path.join(tmp, "page.md")
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(md)
+                sink = io.StringIO()
+                with open(path, "r", encoding="utf-8") as f:
+                    write_markdown_html(f, sink)
+                self.assertEqual(sink.getvalue(), markdown_to_html_node(md).to_html(), md)
+                self.assertEqual(list(iter_blocks(io.StringIO(md))), markdown_to_blocks(md), md)
+        # An unclosed fence fails the same way whichever path reads it
+        md = "# Title\n\n```\nunclosed\n"
+        with self.assertRaises(SyntaxError):
+            markdown_to_html_node(md)
+        with self.assertRaises(SyntaxError):
+            write_markdown_html(io.StringIO(md), io.StringIO())
+
+    def test_iter_blocks_from_file_lines(self):
+        md = "# Title\n\n\n\n- one\n- two\n\n  para  \n"
+        self.assertEqual(list(iter_blocks(io.StringIO(md))), markdown_to_blocks(md))
+
+    def test_scan_blocks_keeps_lines(self):
+        md = "# Title\n\n- one\n- two\n\n```\ncode\n\nmore\n```\n\n1. first\n2. second\n\n> quote\n>no"
+        self.assertEqual(
+            list(scan_blocks(md.split("\n"))),
+            [
+                Block(BlockType.HEADING, ["# Title"], 1),
+                Block(BlockType.UNORDERED_LIST, ["- one", "- two"], 3),
+                Block(BlockType.CODE, ["```", "code", "", "more", "```"], 6),
+                Block(BlockType.ORDERED_LIST, ["1. first", "2. second"], 12),
+                Block(BlockType.QUOTE, ["> quote", ">no"], 15),
+            ],
+        )
+        # Numbering can start after a front matter
+        self.assertEqual([block.start for block in scan_blocks(md.split("\n"), 5)], [5, 7, 10, 16, 19])
+
+    def test_block_to_textnodes_strips_markup(self):
+        md = "## A **bold** title\n\n- [one](/a)\n- two\n\n```\nx = 1\n```\n\n1. first\n\n> quote\n> more"
+        texts = [[node.text for node in block_to_textnodes(block)] for block in scan_blocks(md.split("\n"))]
+        self.assertEqual(texts, [["A ", "bold", " title"], ["one", "two"], ["x = 1\n"], ["first"], ["quote more"]])
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,70 @@
+import contextlib
+import io
+import os
+import threading
+import unittest
+from build_daemon import BuildDaemon
+import build_client
+from site_test_case import SiteTestCase
+
+
+class TestBuildDaemon(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.socket_path = self.path("build.sock")
+        self.builds = []
+        self.daemon = BuildDaemon(self.socket_path, self.run_build)
+        self.thread = threading.Thread(target=self.daemon.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.daemon.shutdown()
+        self.daemon.server_close()
+
+    def run_build(self, argv):
+        self.builds.append(argv)
+        if argv == ["--fail"]:
+            raise RuntimeError("boom")
+        print(f"built {' '.join(argv)}")
+
+    def request(self, *argv):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            status = build_client.main(["--socket", self.socket_path, *argv])
+        return status, output.getvalue()
+
+    def test_forwards_arguments_and_output(self):
+        status, output = self.request("/SSG/", "--only", "content/index.md")
+        self.assertEqual(status, 0)
+        self.assertIn("built /SSG/ --only content/index.md", output)
+        self.assertEqual(self.builds, [["/SSG/", "--only", "content/index.md"]])
+
+    def test_socket_option_anywhere_in_arguments(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            status = build_client.main(["/SSG/", "--socket", self.socket_path, "-j", "2"])
+        self.assertEqual(status, 0)
+        self.assertEqual(self.builds, [["/SSG/", "-j", "2"]])
+
+    def test_socket_without_path_is_a_usage_error(self):
+        with contextlib.redirect_stderr(io.StringIO()) as errors, self.assertRaises(SystemExit) as raised:
+            build_client.main(["/SSG/", "--socket"])
+        self.assertEqual(raised.exception.code, 2)
+        self.assertIn("--socket: expected one argument", errors.getvalue())
+        self.assertEqual(self.builds, [])
+
+    def test_build_errors_are_reported(self):
+        status, output = self.request("--fail")
+        self.assertEqual(status, 1)
+        self.assertIn("RuntimeError: boom", output)
+        # The daemon keeps serving after a failed build
+        self.assertEqual(self.request()[0], 0)
+
+    def test_socket_removed_on_close(self):
+        self.daemon.shutdown()
+        self.daemon.server_close()
+        self.assertFalse(os.path.exists(self.socket_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
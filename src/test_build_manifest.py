@@ -0,0 +1,104 @@
+import os
+import unittest
+from build_manifest import BuildManifest, file_digest, hash_text, remove_empty_dirs
+from site_test_case import SiteTestCase
+
+
+class TestBuildManifest(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.manifest_path = self.path("cache/manifest.json")
+        self.source = self.write("content/blog/post.md", "# Post\n")
+        self.output = self.write("docs/blog/post.html", "<h1>Post</h1>")
+        self.context = hash_text("template digest", "/")
+
+    def recorded(self) -> BuildManifest:
+        manifest = BuildManifest(self.manifest_path)
+        manifest.record(self.source, self.output, self.context)
+        manifest.save()
+        return BuildManifest.load(self.manifest_path)
+
+    def test_hash_text_separates_parts(self):
+        self.assertNotEqual(hash_text("ab", "c"), hash_text("a", "bc"))
+        self.assertEqual(hash_text("a", "b"), hash_text("a", "b"))
+
+    def test_unknown_source_needs_build(self):
+        manifest = BuildManifest(self.manifest_path)
+        self.assertTrue(manifest.needs_build(self.source, self.output, self.context))
+
+    def test_unchanged_source_is_skipped(self):
+        manifest = self.recorded()
+        self.assertFalse(manifest.needs_build(self.source, self.output, self.context))
+        self.assertEqual(manifest.entries[self.source]["digest"], file_digest(self.source))
+
+    def test_touched_but_identical_source_is_skipped(self):
+        manifest = self.recorded()
+        os.utime(self.source, ns=(0, 0))
+        self.assertFalse(manifest.needs_build(self.source, self.output, self.context))
+        # The new stamp is remembered, so the next check does not hash again
+        self.assertEqual(manifest.entries[self.source]["mtime"], 0)
+
+    def test_modified_source_needs_build(self):
+        manifest = self.recorded()
+        self.write(self.source, "# Post, edited\n")
+        self.assertTrue(manifest.needs_build(self.source, self.output, self.context))
+
+    def test_context_change_needs_build(self):
+        manifest = self.recorded()
+        self.assertTrue(manifest.needs_build(self.source, self.output, hash_text("new template digest", "/")))
+        self.assertTrue(manifest.needs_build(self.source, self.output, hash_text("template digest", "/SSG/")))
+
+    def test_missing_output_needs_build(self):
+        manifest = self.recorded()
+        os.remove(self.output)
+        self.assertTrue(manifest.needs_build(self.source, self.output, self.context))
+
+    def test_corrupt_manifest_rebuilds_everything(self):
+        os.makedirs(os.path.dirname(self.manifest_path))
+        self.write(self.manifest_path, "{not json")
+        manifest = BuildManifest.load(self.manifest_path)
+        self.assertEqual(manifest.entries, {})
+        self.assertTrue(manifest.needs_build(self.source, self.output, self.context))
+
+    def test_forget(self):
+        manifest = self.recorded()
+        manifest.forget(self.source)
+        manifest.forget(self.source)  # Forgetting twice is harmless
+        self.assertTrue(manifest.needs_build(self.source, self.output, self.context))
+
+    def test_prune_deleted_source(self):
+        manifest = self.recorded()
+        os.remove(self.source)
+        docs = self.docs
+        # Nothing was seen in this build: the entry and its output go
+        self.assertEqual(manifest.prune(docs), [self.output])
+        self.assertEqual(manifest.entries, {})
+        self.assertFalse(os.path.exists(os.path.dirname(self.output)))
+        self.assertTrue(os.path.isdir(docs))
+
+    def test_prune_keeps_seen_sources(self):
+        manifest = self.recorded()
+        manifest.needs_build(self.source, self.output, self.context)
+        self.assertEqual(manifest.prune(self.docs), [])
+        self.assertIn(self.source, manifest.entries)
+        self.assertTrue(os.path.exists(self.output))
+
+    def test_remove_empty_dirs_stops_at_root_and_non_empty(self):
+        root = self.docs
+        deep = os.path.join(root, "a", "b", "c")
+        os.makedirs(deep)
+        self.write(os.path.join(root, "a", "keep.html"), "")
+        remove_empty_dirs(deep, root)
+        self.assertFalse(os.path.exists(os.path.join(root, "a", "b")))
+        self.assertTrue(os.path.isdir(os.path.join(root, "a")))
+
+        os.remove(os.path.join(root, "a", "keep.html"))
+        os.remove(self.output)
+        remove_empty_dirs(os.path.join(root, "a"), root)
+        remove_empty_dirs(os.path.dirname(self.output), root)
+        self.assertEqual(os.listdir(root), [])
+        self.assertTrue(os.path.isdir(root))
+
+
+if __name__ == "__main__":
+    unittest.main()
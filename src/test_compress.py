@@ -0,0 +1,57 @@
+import gzip
+import os
+import unittest
+from compress import precompress
+from site_test_case import SiteTestCase
+
+
+class TestPrecompress(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.state = self.path("gzip.json")
+        self.write("docs/index.html", "<p>hello</p>" * 200)
+        self.write("docs/index.css", "body { margin: 0; }\n" * 100)
+        self.write("docs/images/tolkien.png", "\x89PNG" * 200)
+
+    def test_writes_sidecars_for_text_only(self):
+        summary = precompress(self.docs, self.state)
+        self.assertEqual(summary.compressed, 2)
+        self.assertLess(summary.bytes_out, summary.bytes_in)
+        with gzip.open(os.path.join(self.docs, "index.html.gz"), "rt") as f:
+            self.assertEqual(f.read(), "<p>hello</p>" * 200)
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "images", "tolkien.png.gz")))
+
+    def test_skips_unchanged_and_removes_orphans(self):
+        precompress(self.docs, self.state)
+        self.write("docs/index.html", "<p>changed</p>" * 200)
+        os.remove(os.path.join(self.docs, "index.css"))
+        summary = precompress(self.docs, self.state)
+        self.assertEqual((summary.compressed, summary.unchanged, summary.removed), (1, 0, 1))
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "index.css.gz")))
+        self.assertEqual(precompress(self.docs, self.state).unchanged, 1)
+
+    def test_incompressible_file_is_not_retried(self):
+        self.write("docs/tiny.txt", "a")
+        summary = precompress(self.docs, self.state)
+        self.assertEqual((summary.compressed, summary.skipped), (2, 1))
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "tiny.txt.gz")))
+        summary = precompress(self.docs, self.state)
+        self.assertEqual((summary.compressed, summary.skipped, summary.unchanged), (0, 0, 3))
+
+        self.write("docs/tiny.txt", "b" * 1000)
+        summary = precompress(self.docs, self.state)
+        self.assertEqual((summary.compressed, summary.unchanged), (1, 2))
+        self.assertTrue(os.path.exists(os.path.join(self.docs, "tiny.txt.gz")))
+
+    def test_sidecars_are_reproducible(self):
+        precompress(self.docs)
+        with open(os.path.join(self.docs, "index.html.gz"), "rb") as f:
+            first = f.read()
+        os.remove(os.path.join(self.docs, "index.html.gz"))
+        precompress(self.docs)
+        with open(os.path.join(self.docs, "index.html.gz"), "rb") as f:
+            self.assertEqual(f.read(), first)
+
+
+if __name__ == "__main__":
+    unittest.main()
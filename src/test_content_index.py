@@ -0,0 +1,72 @@
+import contextlib
+import io
+import os
+import time
+import unittest
+from content_index import ContentIndex
+from page_facts import LinkRef, PageFacts
+from site_test_case import SiteTestCase
+
+
+class TestContentIndex(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db_path = self.path("cache/content.db")
+        self.write("content/index.md", "# Home\n")
+        self.write("content/blog/tom.md",
+                   "---\ntitle: Tom\ndate: 2024-05-01\ntags: [tolkien, essays]\n---\n# Ignored\n")
+        self.write("content/blog/glorfindel.md", "---\ndate: 2024-06-01\ntags:\n  - tolkien\n---\n# Glorfindel\n")
+        self.write("content/blog/wip.md", "---\ndraft: true\ntags: [tolkien]\n---\n# WIP\n")
+
+    def test_queries(self):
+        with ContentIndex(self.db_path) as index:
+            self.assertEqual(index.refresh(self.content), {"added": 4, "updated": 0, "unchanged": 0, "removed": 0})
+            pages = index.pages()
+            self.assertEqual([page.title for page in pages], ["Glorfindel", "Tom", "Home"])
+            self.assertEqual(pages[1].output, "blog/tom.html")
+            self.assertEqual(pages[1].tags, ["essays", "tolkien"])
+            self.assertEqual([page.title for page in index.pages(tag="essays")], ["Tom"])
+            self.assertEqual(len(index.pages(tag="tolkien", include_drafts=True)), 3)
+            self.assertEqual(index.tags(), {"essays": 1, "tolkien": 2})
+            self.assertTrue(index.get(self.path("content/blog/wip.md")).draft)
+            self.assertIsNone(index.get(self.path("content/missing.md")))
+
+    def test_refresh_only_reparses_changes(self):
+        with ContentIndex(self.db_path) as index:
+            index.refresh(self.content)
+        time.sleep(0.01)
+        os.utime(self.path("content/index.md"))  # Touched, same content
+        self.write("content/blog/tom.md", "---\ntitle: Tom, revised\n---\n")
+        os.remove(self.path("content/blog/wip.md"))
+        with ContentIndex(self.db_path) as index:
+            self.assertEqual(index.refresh(self.content), {"added": 0, "updated": 1, "unchanged": 2, "removed": 1})
+            tom = index.get(self.path("content/blog/tom.md"))
+            self.assertEqual((tom.title, tom.date, tom.tags), ("Tom, revised", None, []))
+            self.assertEqual(index.tags(include_drafts=True), {"tolkien": 1})
+
+    def test_links_from_render_or_pending_parse(self):
+        self.write("content/index.md", "# Home\n\n[Tom](/blog/tom/)\n")
+        self.write("content/blog/broken.md", "# Broken\n\nunclosed **bold [x](/x)\n")
+        rendered = PageFacts()
+        rendered.links.append(LinkRef(3, "link", "/rendered/"))
+        with ContentIndex(self.db_path) as index:
+            index.refresh(self.content)
+            index.store_facts({self.path("content/index.md"): rendered, self.path("content/missing.md"): rendered})
+            with contextlib.redirect_stdout(io.StringIO()) as out:
+                # Only the pages no render provided facts for
+                self.assertEqual(index.parse_pending(), 4)
+            self.assertIn("broken.md", out.getvalue())
+            self.assertEqual([(os.path.relpath(source, self.content), ref) for source, _, ref in index.links()],
+                             [("index.md", LinkRef(3, "link", "/rendered/"))])
+            self.assertEqual(index.parse_pending(), 0)
+
+        self.write("content/index.md", "# Home\n\n\n[Tom](/blog/tom/)\n")
+        with ContentIndex(self.db_path) as index:
+            index.refresh(self.content)
+            self.assertEqual(list(index.links()), [])
+            self.assertEqual(index.parse_pending(), 1)
+            self.assertEqual([ref for _, _, ref in index.links()], [LinkRef(4, "link", "/blog/tom/")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import os
+import unittest
+from unittest import mock
+from copy_static import files_match, load_synced, sync_file, sync_static
+from site_test_case import SiteTestCase
+
+
+class TestCopyStatic(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.dest = self.docs
+        self.state_path = self.path("cache/static.json")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.write(os.path.join(self.static, "images", "logo.png"), "png")
+
+    def sync(self, **kwargs):
+        return sync_static(self.static, self.dest, state_path=self.state_path, **kwargs)
+
+    def test_sync_static_copies_then_skips(self):
+        summary = self.sync()
+        self.assertEqual((summary.copied, summary.unchanged, summary.removed), (2, 0, 0))
+        self.assertEqual(summary.bytes, len("body {}") + len("png"))
+        self.assertEqual(self.read(os.path.join(self.dest, "images", "logo.png")), "png")
+        self.assertEqual(sorted(load_synced(self.state_path)),
+                         [os.path.join(self.dest, "images", "logo.png"), os.path.join(self.dest, "index.css")])
+
+        summary = self.sync()
+        self.assertEqual((summary.copied, summary.unchanged, summary.bytes), (0, 2, 0))
+
+    def test_sync_static_removes_deleted_assets(self):
+        self.sync()
+        # A generated page next to the assets is not ours to remove
+        self.write(os.path.join(self.dest, "index.html"), "<p>page</p>")
+        os.remove(os.path.join(self.static, "images", "logo.png"))
+        summary = self.sync()
+        self.assertEqual(summary.removed, 1)
+        self.assertEqual(summary.paths["removed"], [os.path.join(self.dest, "images", "logo.png")])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "images")))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.html")))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.css")))
+
+    def test_unknown_link_mode(self):
+        with self.assertRaises(ValueError):
+            self.sync(link_mode="symlink")
+
+    def test_files_match_by_stamp_or_checksum(self):
+        from_path = os.path.join(self.static, "index.css")
+        dest_path = os.path.join(self.root, "copy.css")
+        self.assertEqual(sync_file(from_path, dest_path), "copied")
+        self.assertTrue(files_match(from_path, dest_path))
+        self.assertEqual(sync_file(from_path, dest_path), "unchanged")
+
+        # Same size and content, different mtime: only --checksum sees them as equal
+        os.utime(dest_path, ns=(0, 0))
+        self.assertFalse(files_match(from_path, dest_path))
+        self.assertTrue(files_match(from_path, dest_path, checksum=True))
+        self.assertEqual(sync_file(from_path, dest_path, checksum=True), "unchanged")
+
+        # Same size and mtime, different content: only --checksum notices
+        stat = os.stat(dest_path)
+        self.write(dest_path, "body []")
+        os.utime(dest_path, ns=(stat.st_atime_ns, os.stat(from_path).st_mtime_ns))
+        self.assertTrue(files_match(from_path, dest_path))
+        self.assertFalse(files_match(from_path, dest_path, checksum=True))
+        self.assertEqual(sync_file(from_path, dest_path, checksum=True), "copied")
+        self.assertEqual(self.read(dest_path), "body {}")
+
+        self.write(dest_path, "longer body {}")
+        self.assertFalse(files_match(from_path, dest_path, checksum=True))
+
+    def test_hardlink(self):
+        from_path = os.path.join(self.static, "index.css")
+        dest_path = os.path.join(self.root, "linked.css")
+        self.assertEqual(sync_file(from_path, dest_path, "hardlink"), "linked")
+        self.assertTrue(os.path.samefile(from_path, dest_path))
+        self.assertTrue(files_match(from_path, dest_path))
+        self.assertEqual(sync_file(from_path, dest_path, "hardlink"), "unchanged")
+
+    def test_link_modes_fall_back_to_copy(self):
+        from_path = os.path.join(self.static, "index.css")
+        for link_mode, target in (("hardlink", "os.link"), ("reflink", "copy_static.reflink")):
+            with self.subTest(link_mode=link_mode):
+                dest_path = os.path.join(self.root, f"{link_mode}.css")
+                with mock.patch(target, side_effect=OSError("cross-device link")):
+                    self.assertEqual(sync_file(from_path, dest_path, link_mode), "copied")
+                self.assertFalse(os.path.samefile(from_path, dest_path))
+                self.assertEqual(self.read(dest_path), "body {}")
+                self.assertFalse(os.path.exists(f"{dest_path}.tmp"))
+
+    def test_reflink_result_matches_source(self):
+        from_path = os.path.join(self.static, "index.css")
+        dest_path = os.path.join(self.root, "clone.css")
+        # "linked" where the filesystem clones extents, "copied" elsewhere
+        self.assertIn(sync_file(from_path, dest_path, "reflink"), ("linked", "copied"))
+        self.assertEqual(self.read(dest_path), "body {}")
+        self.assertTrue(files_match(from_path, dest_path))
+
+    def test_relink_does_not_write_through_hardlink(self):
+        from_path = os.path.join(self.static, "index.css")
+        dest_path = os.path.join(self.root, "linked.css")
+        sync_file(from_path, dest_path, "hardlink")
+        other_path = os.path.join(self.root, "other.css")
+        self.write(other_path, "p {}")
+        self.assertEqual(sync_file(other_path, dest_path), "copied")
+        self.assertEqual(self.read(from_path), "body {}")
+        self.assertEqual(self.read(dest_path), "p {}")
+
+
+if __name__ == "__main__":
+    unittest.main()
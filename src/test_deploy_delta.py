@@ -0,0 +1,53 @@
+import os
+import time
+import unittest
+from deploy_delta import compute_delta, remove_stale_outputs, snapshot
+from generate_content import write_page
+from site_test_case import SiteTestCase
+
+
+class TestDeployDelta(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        os.makedirs(self.path("docs/blog/old"))
+        os.makedirs(self.path("docs/blog/tom"))
+        for rel_path in ("index.html", "index.css", "blog/old/index.html", "blog/tom/index.html"):
+            self.publish(rel_path, rel_path)
+
+    def publish(self, rel_path, text):
+        return write_page(self.path("docs", rel_path), lambda f: f.write(text))
+
+    def test_unchanged_page_is_not_rewritten(self):
+        mtime = os.stat(self.path("docs/index.html")).st_mtime_ns
+        time.sleep(0.01)
+        self.assertFalse(self.publish("index.html", "index.html"))
+        self.assertEqual(os.stat(self.path("docs/index.html")).st_mtime_ns, mtime)
+        self.assertTrue(self.publish("index.html", "new"))
+        self.assertFalse(os.path.exists(self.path("docs/index.html") + ".tmp"))
+
+    def test_delta_lists_urls(self):
+        before = snapshot(self.docs)
+        time.sleep(0.01)
+        self.publish("index.html", "index.html")  # Same bytes: not a change
+        self.publish("blog/tom/index.html", "changed")
+        self.publish("blog/new.html", "new")
+        os.remove(self.path("docs/index.css"))
+        delta = compute_delta(before, snapshot(self.docs), self.docs, "/SSG/")
+        self.assertEqual(delta["added"], ["/SSG/blog/new.html"])
+        self.assertEqual(delta["changed"], ["/SSG/blog/tom/index.html"])
+        self.assertEqual(delta["deleted"], ["/SSG/index.css"])
+        self.assertIn("/SSG/blog/tom/", delta["invalidate"])
+
+    def test_remove_stale_outputs(self):
+        with open(self.path("docs/index.html") + ".gz", "wb"):
+            pass
+        keep = [self.path("docs/index.html"), self.path("docs/blog/tom/index.html")]
+        removed = remove_stale_outputs(self.docs, keep, keep_sidecars=True)
+        self.assertEqual(sorted(removed),
+                         sorted(os.path.normpath(self.path("docs", p)) for p in ("index.css", "blog/old/index.html")))
+        self.assertFalse(os.path.exists(self.path("docs/blog/old")))
+        self.assertTrue(os.path.exists(self.path("docs/index.html") + ".gz"))
+
+
+if __name__ == "__main__":
+    unittest.main()
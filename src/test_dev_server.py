@@ -0,0 +1,122 @@
+import contextlib
+import io
+import os
+import threading
+import unittest
+from http.client import HTTPConnection
+from unittest import mock
+import dev_server
+from dev_server import DevRequestHandler, DevServer
+from content_index import ContentIndex
+from generate_content import generate_page
+from listings import generate_listings
+from site_test_case import SiteTestCase
+
+
+class TestDevServer(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.template = self.template_path
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n[Tom](/blog/tom/)")
+        self.write(os.path.join(self.content, "blog", "tom", "index.md"), "# Tom\n\nOld _Tom_")
+        self.write(os.path.join(self.static, "index.css"), "body { margin: 0; }")
+        self.write(self.template, '<title>{{ Title }}</title><link href="/index.css">{{ Content }}')
+
+        # Keep the request log out of the test output
+        quiet = mock.patch.object(DevRequestHandler, "log_message")
+        quiet.start()
+        self.addCleanup(quiet.stop)
+        self.server = DevServer(("127.0.0.1", 0), self.content, self.static, self.template, "/SSG/")
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def get(self, path, headers=None):
+        connection = HTTPConnection(*self.server.server_address)
+        connection.request("GET", path, headers=headers or {})
+        response = connection.getresponse()
+        body = response.read()
+        connection.close()
+        return response, body
+
+    def test_page_matches_build_output(self):
+        response, body = self.get("/SSG/blog/tom/")
+        self.assertEqual(response.status, 200)
+        dest_path = os.path.join(self.root, "tom.html")
+        with open(self.template) as f, contextlib.redirect_stdout(io.StringIO()):
+            generate_page(os.path.join(self.content, "blog", "tom", "index.md"), f.read(), dest_path, "/SSG/")
+        with open(dest_path, "rb") as f:
+            self.assertEqual(body, f.read())
+
+    def test_etag_and_invalidation(self):
+        response, _ = self.get("/SSG/")
+        etag = response.getheader("ETag")
+        response, body = self.get("/SSG/", {"If-None-Match": etag})
+        self.assertEqual((response.status, body), (304, b""))
+        self.assertEqual(self.server.pages.renders, 1)
+
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nEdited")
+        os.utime(os.path.join(self.content, "index.md"), ns=(1, 1))
+        response, body = self.get("/SSG/", {"If-None-Match": etag})
+        self.assertEqual(response.status, 200)
+        self.assertIn(b"Edited", body)
+
+    def test_slow_render_does_not_block_other_pages(self):
+        home = os.path.join(self.content, "index.md")
+        started, release = threading.Event(), threading.Event()
+        real_render_page = dev_server.render_page
+
+        def slow_render_page(content_path, *args):
+            if content_path == home:
+                started.set()
+                release.wait(5)
+            return real_render_page(content_path, *args)
+
+        with mock.patch.object(dev_server, "render_page", slow_render_page):
+            slow = threading.Thread(target=self.server.render, args=(home,))
+            slow.start()
+            self.assertTrue(started.wait(5))
+            fast = threading.Thread(target=self.server.render,
+                                    args=(os.path.join(self.content, "blog", "tom", "index.md"),))
+            fast.start()
+            fast.join(2)
+            # Tom's page was rendered while the home page was still rendering
+            self.assertFalse(fast.is_alive())
+            release.set()
+            slow.join()
+        self.assertEqual(self.server.pages.renders, 2)
+
+    def test_listing_matches_build_output(self):
+        response, body = self.get("/SSG/blog/")
+        self.assertEqual(response.status, 200)
+        self.assertIn(b'<a href="/SSG/blog/tom/">Tom</a>', body)
+        dest = os.path.join(self.root, "docs")
+        with ContentIndex() as index, contextlib.redirect_stdout(io.StringIO()):
+            index.refresh(self.content)
+            generate_listings(index, self.template, dest, "/SSG/")
+        with open(os.path.join(dest, "blog", "index.html"), "rb") as f:
+            self.assertEqual(body, f.read())
+
+        # New pages show up on the next request
+        self.write(os.path.join(self.content, "blog", "bombadil.md"), "---\ntags: [songs]\n---\n# Bombadil\n")
+        response, body = self.get("/SSG/blog/")
+        self.assertIn(b'<a href="/SSG/blog/bombadil.html">Bombadil</a>', body)
+        response, _ = self.get("/SSG/tags/songs")
+        self.assertEqual((response.status, response.getheader("Location")), (301, "/SSG/tags/songs/"))
+        self.assertEqual(self.get("/SSG/tags/songs/")[0].status, 200)
+        self.assertEqual(self.get("/SSG/tags/other/")[0].status, 404)
+
+    def test_routing(self):
+        response, _ = self.get("/SSG/blog/tom")
+        self.assertEqual((response.status, response.getheader("Location")), (301, "/SSG/blog/tom/"))
+        response, body = self.get("/SSG/index.css")
+        self.assertEqual((response.status, body), (200, b"body { margin: 0; }"))
+        self.assertEqual(self.get("/SSG/missing/")[0].status, 404)
+        self.assertEqual(self.get("/SSG/../template.html")[0].status, 404)
+        self.assertEqual(self.get("/other/")[0].status, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+from block_cache import BlockCache
+from block_markdown import markdown_to_html_node
+from fast_render import markdown_to_html, inline_to_html
+from inline_markdown import text_to_textnodes
+from text_node import text_node_to_html_node
+
+
+class TestFastRender(unittest.TestCase):
+    def test_inline_matches_nodes(self):
+        text = "**bold** _it_ `code` [a](/x) ![img](/i.png) ``"
+        expected = "".join(text_node_to_html_node(node, "/SSG/").to_html() for node in text_to_textnodes(text))
+        self.assertEqual(inline_to_html(text, "/SSG/"), expected)
+
+    def test_same_errors_as_tree(self):
+        for md in ["- item\n-", "Unclosed **bold", "", "- item\n-\n\nUnclosed **bold"]:
+            with self.subTest(md=md):
+                with self.assertRaises(Exception) as tree:
+                    markdown_to_html_node(md).to_html()
+                with self.assertRaises(Exception) as fast:
+                    markdown_to_html(md)
+                self.assertEqual(type(fast.exception), type(tree.exception))
+                self.assertEqual(str(fast.exception), str(tree.exception))
+
+    def test_shares_block_cache_with_tree(self):
+        md = "# Title\n\nShared [footer](/about)\n\n```\ncode\n```"
+        cache = BlockCache(max_size=10)
+        expected = markdown_to_html_node(md, "/SSG/", cache).to_html()
+        self.assertEqual(markdown_to_html(md, "/SSG/", cache), expected)
+        self.assertEqual(cache.hits, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import contextlib
+import io
+import os
+import unittest
+from xml.etree import ElementTree
+from content_index import ContentIndex
+from feeds import ATOM_NAMESPACE, SITEMAP_NAMESPACE, generate_feeds, remove_stale_sitemaps, write_sitemaps
+from generate_content import generate_pages_recursive
+from site_test_case import SiteTestCase
+
+
+def atom(tag):
+    return f"{{{ATOM_NAMESPACE}}}{tag}"
+
+
+class TestSitemaps(SiteTestCase):
+    def locs(self, path, tag):
+        root = ElementTree.parse(path).getroot()
+        return [loc.text for loc in root.iter(f"{{{SITEMAP_NAMESPACE}}}{tag}")]
+
+    def test_single_file(self):
+        outputs = [("index.html", 0), ("blog/tom/index.html", 0), ("a&b.html", 0)]
+        paths, count = write_sitemaps(iter(outputs), self.root, "https://example.com/", "/SSG/")
+        self.assertEqual((len(paths), count), (1, 3))
+        self.assertEqual(self.locs(paths[0], "loc"), [
+            "https://example.com/SSG/",
+            "https://example.com/SSG/blog/tom/",
+            "https://example.com/SSG/a&b.html",
+        ])
+
+    def test_split_into_index(self):
+        outputs = ((f"{i}.html", 0) for i in range(5))
+        paths, count = write_sitemaps(outputs, self.root, "https://example.com", max_urls=2)
+        self.assertEqual(count, 5)
+        self.assertEqual([os.path.basename(path) for path in paths],
+                         ["sitemap.xml", "sitemap-1.xml", "sitemap-2.xml", "sitemap-3.xml"])
+        self.assertEqual(self.locs(paths[0], "loc"), [f"https://example.com/sitemap-{i}.xml" for i in (1, 2, 3)])
+        self.assertEqual(self.locs(paths[3], "loc"), ["https://example.com/4.html"])
+
+    def test_stale_parts_removed(self):
+        outputs = [(f"{i}.html", 0) for i in range(5)]
+        write_sitemaps(outputs, self.root, "https://example.com", max_urls=2)
+        paths, _ = write_sitemaps(outputs[:3], self.root, "https://example.com", max_urls=2)
+        removed = remove_stale_sitemaps(self.root, paths)
+        self.assertEqual(removed, [os.path.join(self.root, "sitemap-3.xml")])
+        self.assertEqual(sorted(os.listdir(self.root)), ["sitemap-1.xml", "sitemap-2.xml", "sitemap.xml"])
+        paths, _ = write_sitemaps(outputs[:1], self.root, "https://example.com", max_urls=2)
+        self.assertEqual(len(remove_stale_sitemaps(self.root, paths)), 2)
+        self.assertEqual(os.listdir(self.root), ["sitemap.xml"])
+
+    def test_exact_limit_needs_no_index(self):
+        paths, count = write_sitemaps(((f"{i}.html", 0) for i in range(2)), self.root, "https://e.com",
+                                      max_urls=2)
+        self.assertEqual((len(paths), count), (1, 2))
+
+
+class TestFeed(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write("template.html", '<title>{{ Title }}</title><a href="/">home</a><main>{{ Content }}</main>')
+        self.write("content/index.md", "# Home\n")
+        self.write("content/blog/old.md", "---\ndate: 2024-01-01\n---\n# Old\n\n[link](/blog/new.html)\n")
+        self.write("content/blog/new.md", "---\ndate: 2024-02-01\ntitle: New & shiny\ntags: [a]\n---\n# New\n")
+
+    def test_entries_reuse_rendered_bodies(self):
+        with ContentIndex() as index:
+            index.refresh(self.content)
+            generate_pages_recursive(self.content, self.template_path, self.docs, "/SSG/", index=index)
+            summary = generate_feeds(index, self.docs, self.content, self.template_path, "https://example.com",
+                                     "/SSG/")
+        self.assertEqual((summary.urls, summary.sitemaps, summary.entries), (3, 1, 2))
+
+        feed = ElementTree.parse(os.path.join(self.docs, "feed.xml")).getroot()
+        entries = feed.findall(atom("entry"))
+        self.assertEqual([entry.find(atom("title")).text for entry in entries], ["New & shiny", "Old"])
+        self.assertEqual(feed.find(atom("updated")).text, "2024-02-01T00:00:00Z")
+        self.assertEqual(entries[1].find(atom("content")).text,
+                         '<div><h1>Old</h1><p><a href="/SSG/blog/new.html">link</a></p></div>')
+        self.assertEqual(entries[0].find(atom("category")).get("term"), "a")
+        self.assertEqual((summary.rendered, summary.missing), (0, 0))
+
+    def test_unmatched_output_body_is_rendered_again(self):
+        with ContentIndex() as index, contextlib.redirect_stdout(io.StringIO()) as out:
+            index.refresh(self.content)
+            generate_pages_recursive(self.content, self.template_path, self.docs, "/SSG/", index=index)
+            # As if written by an older build with another layout
+            self.write("docs/blog/old.html", "<p>stale</p>")
+            summary = generate_feeds(index, self.docs, self.content, self.template_path, "https://example.com",
+                                     "/SSG/")
+        self.assertEqual((summary.entries, summary.rendered, summary.missing), (2, 1, 0))
+        self.assertIn("old.html does not match its layout", out.getvalue())
+        entries = ElementTree.parse(os.path.join(self.docs, "feed.xml")).getroot().findall(atom("entry"))
+        self.assertEqual(entries[1].find(atom("content")).text,
+                         '<div><h1>Old</h1><p><a href="/SSG/blog/new.html">link</a></p></div>')
+
+
+if __name__ == "__main__":
+    unittest.main()
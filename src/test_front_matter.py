@@ -0,0 +1,85 @@
+import io
+import os
+import unittest
+import generate_content
+from front_matter import parse_front_matter, split_front_matter
+from generate_content import generate_page, generate_pages_recursive
+from site_test_case import SiteTestCase
+
+
+class TestFrontMatter(unittest.TestCase):
+    def test_parse(self):
+        meta, body = split_front_matter(
+            "---\n"
+            "title: Why Tom Bombadil Was a Mistake\n"
+            "date: 2024-05-01\n"
+            "# A comment\n"
+            "tags: [tolkien, essays]\n"
+            "draft: false\n"
+            "weight: 3\n"
+            "quoted: \"yes: really\"\n"
+            "authors:\n"
+            "  - Ada\n"
+            "  - Grace\n"
+            "---\n"
+            "# Tom\n"
+        )
+        self.assertEqual(meta, {
+            "title": "Why Tom Bombadil Was a Mistake",
+            "date": "2024-05-01",
+            "tags": ["tolkien", "essays"],
+            "draft": False,
+            "weight": 3,
+            "quoted": "yes: really",
+            "authors": ["Ada", "Grace"],
+        })
+        self.assertEqual(body, "# Tom\n")
+
+    def test_no_front_matter(self):
+        for markdown in ("# Tom\n\n---\n", "---\nnot: closed\n", "---\nJust a paragraph\n---\n", ""):
+            self.assertEqual(split_front_matter(markdown), ({}, markdown))
+
+    def test_stops_at_closing_fence(self):
+        stream = io.StringIO("---\ntitle: A\n---\n# A\nrest\n")
+        self.assertEqual(parse_front_matter(stream), ({"title": "A"}, 17))
+        self.assertEqual(stream.read(), "# A\nrest\n")
+
+
+class TestFrontMatterPages(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        self.write("layouts/plain.html", "{{ Content }}")
+
+    def test_title_and_body(self):
+        self.write("content/a.md", "---\ntitle: From Meta\n---\n# Heading\n")
+        self.write("content/b.md", "---\ntags: [x]\n---\n# Heading\n")
+        self.assertEqual(generate_pages_recursive(self.content, self.template_path, self.docs, "/"), 0)
+        self.assertEqual(self.read("docs/a.html"), "<title>From Meta</title><div><h1>Heading</h1></div>")
+        self.assertEqual(self.read("docs/b.html"), "<title>Heading</title><div><h1>Heading</h1></div>")
+
+    def test_draft_and_layout(self):
+        self.write("content/draft.md", "---\ndraft: true\n---\n# Draft\n")
+        self.write("content/plain.md", "---\nlayout: plain\n---\n# Plain\n")
+        self.write("content/missing.md", "---\nlayout: nope\n---\n# Missing\n")
+        self.assertEqual(generate_pages_recursive(self.content, self.template_path, self.docs, "/"), 1)
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "draft.html")))
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "missing.html")))
+        self.assertEqual(self.read("docs/plain.html"), "<div><h1>Plain</h1></div>")
+
+    def test_large_page(self):
+        self.write("content/big.md", "---\ntitle: Big\n---\n" + "para\n\n" * 10)
+        dest_path = os.path.join(self.docs, "big.html")
+        os.makedirs(self.docs)
+        threshold = generate_content.STREAMING_THRESHOLD
+        generate_content.STREAMING_THRESHOLD = 1
+        try:
+            self.assertTrue(generate_page(os.path.join(self.content, "big.md"), "{{ Title }}{{ Content }}",
+                                          dest_path, "/"))
+        finally:
+            generate_content.STREAMING_THRESHOLD = threshold
+        self.assertEqual(self.read("docs/big.html"), "Big<div>" + "<p>para</p>" * 10 + "</div>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import functools
+import multiprocessing
+import os
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from unittest import mock
+import generate_content
+from block_cache import block_cache
+from front_matter import split_front_matter
+from generate_content import generate_pages_recursive
+from page_facts import collect_facts
+from site_test_case import SiteTestCase
+
+
+class TestParallelBuild(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write("template.html", "<title>{{ Title }}</title><article>{{ Content }}</article>")
+
+    def build(self, name, jobs, engine="tree", facts=None):
+        dest = os.path.join(self.root, name)
+        failures = generate_pages_recursive(self.content, self.template_path, dest, "/SSG/", jobs=jobs,
+                                            engine=engine, facts=facts)
+        outputs = {}
+        for dir_path, _, filenames in os.walk(dest):
+            for filename in filenames:
+                path = os.path.join(dir_path, filename)
+                with open(path, "rb") as f:
+                    outputs[os.path.relpath(path, dest)] = f.read()
+        return failures, outputs
+
+    def test_pool_matches_serial_and_counts_failures(self):
+        for i in range(12):
+            self.write(f"content/blog/post{i}.md",
+                       f"# Post {i}\n\nSee [the blog](/blog/) and ![img](/images/{i}.png)\n")
+        self.write("content/index.md", "# Home\n\n> quoted\n")
+        # No title: fails in its worker, the rest of the pool carries on
+        self.write("content/blog/broken.md", "Just a paragraph\n")
+        serial = self.build("serial", 1)
+        parallel = self.build("parallel", 3)
+        self.assertEqual(serial[0], 1)
+        self.assertEqual(serial, parallel)
+        self.assertEqual(len(parallel[1]), 13)
+        self.assertNotIn(os.path.join("blog", "broken.html"), parallel[1])
+
+    def test_pool_merges_block_cache(self):
+        footer = "Shared **footer** with a [link](/)"
+        for i in range(8):
+            self.write(f"content/blog/post{i}.md", f"# Post {i}\n\n{footer}\n")
+        self.addCleanup(block_cache.configure, 0)
+        for method in ("fork", "spawn"):
+            with self.subTest(start_method=method):
+                block_cache.configure(0)  # Start cold
+                block_cache.configure(100)
+                # "spawn" (macOS, Windows) pickles the initializer instead of inheriting it
+                pool = functools.partial(ProcessPoolExecutor, mp_context=multiprocessing.get_context(method))
+                with mock.patch.object(generate_content, "ProcessPoolExecutor", pool):
+                    self.build(method, 2)
+                stats = block_cache.stats()
+                # Every page looks up its heading and the footer
+                self.assertEqual(stats["hits"] + stats["misses"], 16)
+                self.assertEqual(stats["size"], 9)
+                self.assertIsNotNone(block_cache.get(footer, "/SSG/"))
+
+    def test_huge_page_matches_serial(self):
+        block = "Some **bold** text and a [link](/blog/)\n\n- item one\n- item two\n\n"
+        # Ends inside an odd number of fences, right after a newline
+        self.write("content/big.md", "# Big\n\n" + block * 2000 + "```inline```\n")
+        self.write("content/small.md", "# Small\n")
+        self.assertGreater(os.path.getsize(self.path("content/big.md")), 64 * 1024)
+        with mock.patch.object(generate_content, "PARALLEL_THRESHOLD", 64 * 1024):
+            serial = self.build("serial", 1)
+            parallel = self.build("parallel", 2)
+        self.assertEqual(serial[0], 0)
+        self.assertEqual(serial, parallel)
+
+    def test_render_collects_links(self):
+        self.write("content/blog/tom.md",
+                   "---\ntitle: Tom\n---\n# Tom\n\nSee [the\nblog](/blog/) and\n![img](/a.png)\n\n"
+                   "- [one](/1)\n- [two](/2)\n\n```\n[code](/no)\n```\n")
+        self.write("content/big.md", "# Big\n\n" + "A [link](/blog/)\n\n" * 5000)
+        self.write("content/blog/broken.md", "[No title](/x)\n")
+        expected = {}
+        for rel_path in ("blog/tom.md", "big.md"):
+            path = self.path("content", rel_path)
+            text = self.read(path)
+            _, body = split_front_matter(text)
+            facts = collect_facts(body.split("\n"), text.count("\n", 0, len(text) - len(body)) + 1)
+            expected[path] = (facts.links, facts.terms)
+        self.assertEqual(expected[self.path("content/blog/tom.md")][0][:2],
+                         [(7, "link", "/blog/"), (8, "image", "/a.png")])
+        self.addCleanup(block_cache.configure, 0)
+        with mock.patch.object(generate_content, "PARALLEL_THRESHOLD", 64 * 1024):
+            for engine in ("tree", "fast"):
+                for jobs, cache_size in ((1, 0), (1, 100), (2, 0)):
+                    with self.subTest(engine=engine, jobs=jobs, cache_size=cache_size):
+                        block_cache.configure(cache_size)
+                        facts = {}
+                        # The second build hits the block cache when it is on
+                        for run in range(2):
+                            facts.clear()
+                            self.build(f"{engine}{jobs}{cache_size}{run}", jobs, engine, facts)
+                        self.assertEqual({path: (page.links, page.terms) for path, page in facts.items() if page.links},
+                                         expected)
+                        self.assertIn(self.path("content/blog/broken.md"), facts)
+
+
+if __name__ == "__main__":
+    unittest.main()
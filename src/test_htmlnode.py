@@ -1,5 +1,8 @@
+import io
+import pickle
+import sys
 import unittest
-from html_node import HTMLNode, LeafNode, ParentNode
+from html_node import HTMLNode, LeafNode, ParentNode, write_html
 
 
 class TestHTMLNode(unittest.TestCase):
@@ -101,6 +104,53 @@ class TestHTMLNode(unittest.TestCase):
             "<h2><b>Bold text</b>Normal text<i>italic text</i>Normal text</h2>",
         )
 
+    def test_slotted_nodes(self):
+        leaf = LeafNode("b", "Bold", {"class": "x"})
+        parent = ParentNode("p", [leaf])
+        self.assertFalse(hasattr(leaf, "__dict__"))
+        self.assertFalse(hasattr(parent, "__dict__"))
+        self.assertIsNone(leaf.children)
+        self.assertIsNone(parent.value)
+        with self.assertRaises(AttributeError):
+            leaf.extra = 1
+
+    def test_pickle_round_trip(self):
+        node = ParentNode("p", [LeafNode("a", "link", {"href": "/"}), LeafNode(None, "text")])
+        self.assertEqual(pickle.loads(pickle.dumps(node)).to_html(), node.to_html())
+
+
+class TestWriteHTML(unittest.TestCase):
+    def test_matches_to_html(self):
+        node = ParentNode(
+            "div",
+            [
+                ParentNode("p", [LeafNode("b", "Bold"), LeafNode(None, " text")]),
+                LeafNode("a", "link", {"href": "/blog"}),
+            ],
+            {"class": "post"},
+        )
+        sink = io.StringIO()
+        write_html(node, sink)
+        self.assertEqual(
+            sink.getvalue(),
+            '<div class="post"><p><b>Bold</b> text</p><a href="/blog">link</a></div>',
+        )
+        self.assertEqual(sink.getvalue(), node.to_html())
+
+    def test_deep_tree_beyond_recursion_limit(self):
+        depth = sys.getrecursionlimit() + 100
+        node = LeafNode(None, "deep")
+        for _ in range(depth):
+            node = ParentNode("blockquote", [node])
+        html = node.to_html()
+        self.assertTrue(html.startswith("<blockquote>" * depth + "deep"))
+        self.assertTrue(html.endswith("</blockquote>" * depth))
+
+    def test_invalid_child_raises(self):
+        node = ParentNode("div", [ParentNode("p", [])])
+        with self.assertRaises(ValueError):
+            write_html(node, io.StringIO())
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -1,6 +1,6 @@
 import unittest
 from text_node import TextNode, TextType
-from inline_markdown import split_nodes_delimiter, extract_markdown_image, extract_markdown_link, split_nodes_image, split_nodes_link, text_to_textnodes
+from inline_markdown import split_nodes_delimiter, extract_markdown_image, extract_markdown_link, split_nodes_image, split_nodes_link, text_to_textnodes, text_to_textnodes_multipass
 
 
 class TestTextNodeSplitting(unittest.TestCase):
@@ -519,7 +519,50 @@ class TestTextToTextNodes(unittest.TestCase):
         
         with self.assertRaises(SyntaxError):
             text_to_textnodes("This has `unbalanced code")
-        
+
+
+class TestSinglePassMatchesMultipass(unittest.TestCase):
+    CASES = [
+        "",
+        "plain text only",
+        "This is **text** with an _italic_ word and a `code block` and an "
+        "![obi wan image](https://i.imgur.com/fJRm4Vk.jpeg) and a [link](https://boot.dev)",
+        "![a](1)![b](2)[c](3)[d](4)",
+        "!![a](b) and ![x](y",
+        "[outer](x![inner)](img)",
+        "[a](x[y](z)",
+        "**bold [link](u) more** text",
+        "`code with [link](u)` after",
+        "****",
+        "a __ b `` c",
+        "[unclosed](link and ![unclosed](img",
+    ]
+
+    def test_same_nodes(self):
+        for text in self.CASES:
+            with self.subTest(text=text):
+                try:
+                    expected = text_to_textnodes_multipass(text)
+                except SyntaxError as e:
+                    with self.assertRaises(SyntaxError) as cm:
+                        text_to_textnodes(text)
+                    self.assertEqual(str(cm.exception), str(e))
+                    continue
+                self.assertEqual(text_to_textnodes(text), expected)
+
+    def test_error_reports_first_failing_pass(self):
+        # Bold is unbalanced in the first run, code in the second: the
+        # multi-pass pipeline reports the code delimiter first
+        with self.assertRaises(SyntaxError) as cm:
+            text_to_textnodes("**a [l](u) `b")
+        self.assertIn("'`'", str(cm.exception))
+
+    def test_link_dense_paragraph(self):
+        text = " ".join(f"see [link {i}](/page/{i}) and **b{i}**" for i in range(500))
+        nodes = text_to_textnodes(text)
+        self.assertEqual(nodes, text_to_textnodes_multipass(text))
+        self.assertEqual(sum(n.text_type == TextType.LINK for n in nodes), 500)
+
     
   
 # Run the tests
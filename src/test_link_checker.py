@@ -0,0 +1,79 @@
+import os
+import unittest
+from content_index import ContentIndex
+from link_checker import (
+    LinkRef,
+    check_links,
+    extract_links,
+    is_internal,
+    output_paths,
+    resolve_target,
+    target_exists,
+)
+from site_test_case import SiteTestCase
+
+
+class TestExtractLinks(unittest.TestCase):
+    def test_lines(self):
+        md = (
+            "# [Title](/a)\n"
+            "\n"
+            "Some text\n"
+            "and a [link](/b) with `code`\n"
+            "\n"
+            "```\n"
+            "[in code](/not)\n"
+            "```\n"
+            "\n"
+            "- one\n"
+            "- ![img](/c.png)\n"
+        )
+        self.assertEqual(extract_links(md.split("\n"), first_line=5), [
+            LinkRef(5, "link", "/a"),
+            LinkRef(8, "link", "/b"),
+            LinkRef(15, "image", "/c.png"),
+        ])
+
+    def test_resolve(self):
+        self.assertEqual(resolve_target("/blog/tom", "index.html"), "blog/tom")
+        self.assertEqual(resolve_target("/", "blog/tom/index.html"), "")
+        self.assertEqual(resolve_target("../a.png?v=1#top", "blog/tom/index.html"), "blog/a.png")
+        self.assertEqual(resolve_target("/blog/", "index.html"), "blog/")
+        self.assertEqual(resolve_target("/my%20file.txt", "index.html"), "my file.txt")
+        self.assertIsNone(resolve_target("../../x", "blog/index.html"))
+        self.assertFalse(is_internal("https://example.com"))
+        self.assertFalse(is_internal("mailto:a@b.c"))
+        self.assertFalse(is_internal("#top"))
+        self.assertTrue(is_internal("tom.html"))
+
+    def test_target_exists(self):
+        outputs = {"index.html", "blog/tom/index.html", "about.html", "images/a.png"}
+        for target in ("", "blog/tom", "blog/tom/", "about", "about.html", "images/a.png"):
+            self.assertTrue(target_exists(target, outputs), target)
+        for target in ("blog/", "images/b.png", "blog"):
+            self.assertFalse(target_exists(target, outputs), target)
+
+
+class TestCheckLinks(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write("static/images/tom.png", "")
+        self.write("content/index.md", "# Home\n\n[Tom](/blog/tom) [Draft](/blog/draft)\n\n![Tom](/images/tom.png)\n")
+        self.write("content/blog/tom/index.md",
+                   "---\ndate: 2024-01-01\n---\n# Tom\n\n[Home](../../)\n\n![Gone](/images/gone.png)\n")
+        self.write("content/blog/draft.md", "---\ndraft: true\n---\n# Draft\n\n[Broken but unpublished](/nope)\n")
+
+    def test_report(self):
+        with ContentIndex() as index:
+            index.refresh(self.content)
+            index.parse_pending()
+            report = check_links(index, output_paths(index, self.static, self.docs))
+        self.assertEqual(report.checked, 5)
+        self.assertEqual([(os.path.relpath(b.source, self.content), b.line, b.kind, b.url) for b in report.broken], [
+            (os.path.join("blog", "tom", "index.md"), 8, "image", "/images/gone.png"),
+            ("index.md", 3, "link", "/blog/draft"),
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
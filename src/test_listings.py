@@ -0,0 +1,85 @@
+import os
+import unittest
+from content_index import ContentIndex, PageInfo
+from listings import generate_listings, group_listings, output_url, paginate, slugify
+from site_test_case import SiteTestCase
+
+
+def page(output, date=None, tags=()):
+    return PageInfo(f"./content/{output}", output, output, date, False, None, list(tags), {})
+
+
+class TestListings(unittest.TestCase):
+    def test_group_in_one_pass(self):
+        pages = [
+            page("blog/b/index.html", "2024-06-01", ["Middle Earth"]),
+            page("blog/a/index.html", "2024-05-20", ["Middle Earth", "essays"]),
+            page("about.html", "2024-05-01"),
+            page("blog/index.html"),
+        ]
+        listings = group_listings(pages)
+        self.assertEqual(sorted(listings), ["archive/2024/05", "archive/2024/06", "blog", "tags/essays",
+                                            "tags/middle-earth"])
+        self.assertEqual([p.output for p in listings["blog"].pages], ["blog/b/index.html", "blog/a/index.html"])
+        self.assertEqual([p.output for p in listings["archive/2024/05"].pages], ["blog/a/index.html", "about.html"])
+        self.assertEqual(listings["tags/middle-earth"].title, "Tagged: Middle Earth")
+
+    def test_paginate(self):
+        listing = group_listings([page(f"blog/{i}.html") for i in range(5)])["blog"]
+        pages = list(paginate(listing, 2))
+        self.assertEqual([(output, number, count, len(members)) for output, number, count, members in pages], [
+            ("blog/index.html", 1, 3, 2),
+            ("blog/page/2/index.html", 2, 3, 2),
+            ("blog/page/3/index.html", 3, 3, 1),
+        ])
+
+    def test_urls(self):
+        self.assertEqual(output_url("blog/tom/index.html", "/SSG/"), "/SSG/blog/tom/")
+        self.assertEqual(output_url("index.html"), "/")
+        self.assertEqual(output_url("about.html"), "/about.html")
+        self.assertEqual(slugify("Middle Earth!"), "middle-earth")
+
+
+class TestGenerateListings(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.state_path = self.path("listings.json")
+        self.write("template.html", "{{ Title }}|{{ Content }}")
+        for day, tag in ((1, "a"), (2, "b"), (3, "a")):
+            self.write(f"content/blog/{day}.md", f"---\ndate: 2024-05-0{day}\ntags: [{tag}]\n---\n# Post {day}\n")
+        self.index = ContentIndex()
+        self.addCleanup(self.index.close)
+
+    def build(self):
+        self.index.refresh(self.content)
+        return generate_listings(self.index, self.template_path, self.docs, "/", 2, self.state_path)
+
+    def test_render(self):
+        summary = self.build()
+        self.assertEqual((summary.rendered, summary.unchanged), (6, 0))
+        self.assertEqual(
+            self.read("docs/blog/index.html"),
+            'Blog|<div><h1>Blog</h1><ul>'
+            '<li><a href="/blog/3.html">Post 3</a> <time datetime="2024-05-03">2024-05-03</time></li>'
+            '<li><a href="/blog/2.html">Post 2</a> <time datetime="2024-05-02">2024-05-02</time></li>'
+            '</ul><nav><a href="/blog/page/2/" rel="next">Older</a></nav></div>',
+        )
+        self.assertIn('<a href="/blog/" rel="prev">Newer</a>', self.read("docs/blog/page/2/index.html"))
+        self.assertIn("Post 1", self.read("docs/tags/a/index.html"))
+
+    def test_only_affected_listings_rerender(self):
+        self.build()
+        self.write("content/blog/4.md", "---\ndate: 2024-06-01\ntags: [c]\n---\n# Post 4\n")
+        summary = self.build()
+        # Both blog pages shift and two listings appear; tags a and b and May are untouched
+        self.assertEqual((summary.rendered, summary.unchanged), (4, 4))
+        os.remove(os.path.join(self.content, "blog", "4.md"))
+        self.write("content/blog/2.md", "---\ndraft: true\ndate: 2024-05-02\ntags: [b]\n---\n# Post 2\n")
+        summary = self.build()
+        self.assertEqual(len(summary.removed), 5)
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "tags", "b")))
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "archive", "2024", "06")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+from block_markdown import markdown_to_html_node, scan_blocks
+from parallel_render import iter_block_chunks, markdown_to_html_parallel
+
+DOCUMENT = "\n\n".join(
+    [
+        "# Changelog",
+        "```\ncode block\n\nwith a blank line\n```",
+        "> quoted **text**\n> more",
+        "- [link](/blog/tom)\n- ![img](/images/a.png)",
+        "1. first item\n2. second item",
+    ]
+    + [f"Paragraph {i} with _italic_ and `code`" for i in range(50)]
+)
+
+
+class TestParallelRender(unittest.TestCase):
+    def test_matches_serial_output(self):
+        expected = markdown_to_html_node(DOCUMENT, "/SSG/").to_html()
+        for engine in ("tree", "fast"):
+            with self.subTest(engine=engine):
+                html = markdown_to_html_parallel(DOCUMENT, "/SSG/", jobs=2, engine=engine, chunk_bytes=64)
+                self.assertEqual(html, expected)
+
+    def test_chunks_keep_blocks_whole_and_in_order(self):
+        blocks = list(scan_blocks(DOCUMENT.split("\n")))
+        chunks = list(iter_block_chunks(blocks, chunk_bytes=100))
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual([block for chunk in chunks for block in chunk], blocks)
+
+    def test_same_error_as_serial(self):
+        md = "- item\n-\n\nUnclosed **bold"
+        with self.assertRaises(Exception) as serial:
+            markdown_to_html_node(md).to_html()
+        with self.assertRaises(Exception) as parallel:
+            markdown_to_html_parallel(md, jobs=2, chunk_bytes=1)
+        self.assertEqual(str(parallel.exception), str(serial.exception))
+
+
+if __name__ == "__main__":
+    unittest.main()
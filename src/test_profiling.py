@@ -0,0 +1,37 @@
+import unittest
+from profiling import BuildProfiler, percentile, summarize
+
+
+class TestSummarize(unittest.TestCase):
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile([], 95), 0)
+
+    def test_totals_and_slowest(self):
+        spans = [
+            ("a.md", "read", 0, 1_000_000, 1),
+            ("a.md", "inline", 0, 3_000_000, 1),
+            ("b.md", "read", 0, 2_000_000, 2),
+            ("b.md", "inline", 0, 9_000_000, 2),
+        ]
+        summary = summarize(spans, slowest=1)
+        self.assertEqual(summary["pages"], 2)
+        self.assertEqual(summary["total_ms"], 15.0)
+        self.assertEqual(list(summary["stages"]), ["read", "inline"])
+        self.assertEqual(summary["stages"]["inline"]["total_ms"], 12.0)
+        self.assertEqual(summary["stages"]["inline"]["max_ms"], 9.0)
+        self.assertEqual([p["page"] for p in summary["slowest_pages"]], ["b.md"])
+
+    def test_stage_records_span(self):
+        profiler = BuildProfiler()
+        with profiler.stage("a.md", "read"):
+            pass
+        page, stage, _, duration, _ = profiler.spans[0]
+        self.assertEqual((page, stage), ("a.md", "read"))
+        self.assertGreaterEqual(duration, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
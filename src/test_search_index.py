@@ -0,0 +1,79 @@
+import contextlib
+import io
+import json
+import os
+import unittest
+from content_index import ContentIndex
+from search_index import build_search_index, page_terms
+from site_test_case import SiteTestCase
+
+
+class TestSearchIndex(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.state_path = self.path("search.json")
+        self.write("content/index.md", "# Home\n\nWelcome to the **Shire**, [hobbits](/blog/tom/).\n")
+        self.write("content/blog/tom.md", "---\ntitle: Tom Bombadil\n---\n# Tom\n\nTom sings. Tom dances.\n")
+        self.index = ContentIndex()
+        self.addCleanup(self.index.close)
+
+    def shard(self, name):
+        return json.loads(self.read("docs/search", name))
+
+    def build(self):
+        self.index.refresh(self.content)
+        self.index.parse_pending()
+        return build_search_index(self.index, self.docs, "/SSG/", self.state_path)
+
+    def terms(self, rel_path):
+        return page_terms(self.index, self.index.get(self.path("content", rel_path)))
+
+    def test_terms_skip_markup(self):
+        self.write("content/blog/code.md", "# Code\n\n```\nprint(tom)\n```\n\n`inline` text\n")
+        self.index.refresh(self.content)
+        self.index.parse_pending()
+        self.assertEqual(self.terms("index.md"),
+                         {"home": 1, "welcome": 1, "to": 1, "the": 1, "shire": 1, "hobbits": 1})
+        self.assertEqual(self.terms("blog/tom.md")["tom"], 4)
+        self.assertEqual(self.terms("blog/code.md"), {"code": 1, "print": 1, "tom": 1, "inline": 1, "text": 1})
+
+    def test_shards(self):
+        summary = self.build()
+        self.assertEqual((summary.pages, summary.tokenized), (2, 2))
+        docs = self.shard("docs.json")
+        self.assertEqual(docs["prefix_length"], 2)
+        ids = {url: int(doc_id) for doc_id, (url, _) in docs["docs"].items()}
+        self.assertEqual(sorted(ids), ["/SSG/", "/SSG/blog/tom.html"])
+        self.assertEqual(self.shard("to.json"), {"to": [[ids["/SSG/"], 1]], "tom": [[ids["/SSG/blog/tom.html"], 4]]})
+        self.assertEqual(self.shard("sh.json"), {"shire": [[ids["/SSG/"], 1]]})
+
+    def test_incremental(self):
+        self.build()
+        summary = self.build()
+        self.assertEqual((summary.tokenized, summary.shards_written), (0, 0))
+
+        self.write("content/blog/tom.md", "---\ntitle: Tom Bombadil\n---\n# Tom\n\nTom sings. Tom dances. Zebra.\n")
+        summary = self.build()
+        self.assertEqual((summary.tokenized, summary.shards_written), (1, 1))
+        self.assertIn("zebra", self.shard("ze.json"))
+
+        os.remove(os.path.join(self.content, "blog", "tom.md"))
+        summary = self.build()
+        self.assertEqual(summary.tokenized, 0)
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "search", "ze.json")))
+        (home_id, (url, _)), = self.shard("docs.json")["docs"].items()
+        self.assertEqual(url, "/SSG/")
+        self.assertEqual(self.shard("to.json"), {"to": [[int(home_id), 1]]})
+
+    def test_unparseable_page_is_skipped(self):
+        self.write("content/blog/broken.md", "# Broken\n\nunclosed **bold\n")
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            summary = self.build()
+        self.assertIn("broken.md", out.getvalue())
+        self.assertEqual((summary.pages, summary.tokenized), (3, 3))
+        self.assertIn("tom", self.shard("to.json"))
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "search", "un.json")))
+
+
+if __name__ == "__main__":
+    unittest.main()
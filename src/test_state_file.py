@@ -0,0 +1,35 @@
+import os
+import unittest
+from state_file import load_state, save_state
+from site_test_case import SiteTestCase
+
+
+class TestStateFile(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.state_path = self.path("cache/state.json")
+
+    def test_round_trip(self):
+        save_state(self.state_path, {"b": [1, 2], "a": None}, indent=1, sort_keys=True)
+        self.assertEqual(load_state(self.state_path, {}), {"a": None, "b": [1, 2]})
+        self.assertEqual(os.listdir(os.path.dirname(self.state_path)), ["state.json"])
+
+    def test_missing_corrupt_or_wrong_type_gives_default(self):
+        self.assertEqual(load_state(self.state_path, {}), {})
+        self.assertIsNone(load_state(self.state_path))
+        self.write(self.state_path, '{"truncated": ')
+        self.assertEqual(load_state(self.state_path, []), [])
+        save_state(self.state_path, ["a list"])
+        self.assertEqual(load_state(self.state_path, {}), {})
+        self.assertEqual(load_state(self.state_path), ["a list"])
+
+    def test_failed_write_keeps_previous_state(self):
+        save_state(self.state_path, {"kept": True})
+        with self.assertRaises(TypeError):
+            save_state(self.state_path, {"unserializable": object()})
+        self.assertEqual(load_state(self.state_path, {}), {"kept": True})
+        self.assertFalse(os.path.exists(f"{self.state_path}.tmp"))
+
+
+if __name__ == "__main__":
+    unittest.main()
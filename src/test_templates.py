@@ -0,0 +1,88 @@
+import io
+import os
+import unittest
+from templates import TemplateCache, compile_template
+from site_test_case import SiteTestCase
+
+
+class TestCompileTemplate(unittest.TestCase):
+    def test_render(self):
+        template = compile_template("<title>{{ Title }}</title><article>{{ Content }}</article>")
+        self.assertEqual(template.literals, ["<title>", "</title><article>", "</article>"])
+        self.assertEqual([name for name, _ in template.slots], ["Title", "Content"])
+        self.assertEqual(
+            template.render({"Title": "Hi", "Content": "<p>body</p>"}),
+            "<title>Hi</title><article><p>body</p></article>",
+        )
+
+    def test_unknown_slot_left_as_written(self):
+        template = compile_template("a {{Missing}} b")
+        self.assertEqual(template.render({}), "a {{Missing}} b")
+
+    def test_stream_with_callable(self):
+        template = compile_template("<div>{{ Content }}</div>")
+        sink = io.StringIO()
+        template.stream(sink, {"Content": lambda out: out.write("streamed")})
+        self.assertEqual(sink.getvalue(), "<div>streamed</div>")
+
+    def test_no_slots(self):
+        template = compile_template("plain")
+        self.assertEqual(template.render({"Title": "x"}), "plain")
+
+    def test_extract(self):
+        template = compile_template("<title>{{ Title }}</title><article>{{ Content }}</article>{{ Other }}")
+        page = template.render({"Title": "Hi", "Content": "<p>body</p>"})
+        self.assertEqual(template.extract(page, {"Title": "Hi"}), "<p>body</p>")
+        self.assertIsNone(template.extract(page, {"Title": "Bye"}))
+        self.assertIsNone(compile_template("{{ Content }}{{ Content }}").extract("aa", {}))
+
+    def test_for_basepath_rewrites_markup_only(self):
+        template = compile_template('<link href="/index.css" /><img src="/a.png">{{ Content }}')
+        rebased = template.for_basepath("/SSG/")
+        self.assertEqual(
+            rebased.render({"Content": 'href="/kept"'}),
+            '<link href="/SSG/index.css" /><img src="/SSG/a.png">href="/kept"',
+        )
+        self.assertIs(template.for_basepath("/SSG/"), rebased)
+        self.assertIs(template.for_basepath("/"), template)
+
+
+class TestPartials(SiteTestCase):
+    def test_partials_inlined(self):
+        nav_path = self.write("nav.html", "<nav>{{ Title }}</nav>")
+        template = compile_template("<body>{{> nav }}{{ Content }}</body>", self.root)
+        self.assertEqual(
+            template.render({"Title": "T", "Content": "C"}),
+            "<body><nav>T</nav>C</body>",
+        )
+        self.assertIn(nav_path, template.dependencies)
+
+    def test_recursive_partial(self):
+        self.write("loop.html", "{{> loop }}")
+        with self.assertRaises(ValueError):
+            compile_template("{{> loop }}", self.root)
+
+
+class TestTemplateCache(SiteTestCase):
+    def test_reuses_until_modified(self):
+        path = self.write("template.html", "v1 {{ Content }}")
+        cache = TemplateCache()
+        first = cache.get(path)
+        self.assertIs(cache.get(path), first)
+
+        self.write(path, "v2 {{ Content }}")
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+        self.assertEqual(cache.get(path).render({"Content": "x"}), "v2 x")
+
+    def test_resolve_layout_by_section(self):
+        self.write("template.html", "default")
+        self.write("layouts/blog.html", "blog")
+        cache = TemplateCache()
+        blog = cache.resolve_layout(self.path("content/blog/post/index.md"), self.content, self.template_path)
+        home = cache.resolve_layout(self.path("content/index.md"), self.content, self.template_path)
+        self.assertEqual(blog.render({}), "blog")
+        self.assertEqual(home.render({}), "default")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,5 @@
 import unittest
-from text_node import TextNode, TextType, text_node_to_html_node
+from text_node import TextNode, TextType, rewrite_url, text_node_to_html_node
 
 
 class TestTextNode(unittest.TestCase):
@@ -29,6 +29,10 @@ class TestTextNode(unittest.TestCase):
             "TextNode(This is a text node, text, https://www.boot.dev)", repr(node)
         )
 
+    def test_slotted(self):
+        node = TextNode("This is a text node", TextType.TEXT)
+        self.assertFalse(hasattr(node, "__dict__"))
+
 
 class TestTextNodeToHTMLNode(unittest.TestCase):
     def test_text(self):
@@ -52,3 +56,14 @@ class TestTextNodeToHTMLNode(unittest.TestCase):
         html_node = text_node_to_html_node(node)
         self.assertEqual(html_node.tag, "b")
         self.assertEqual(html_node.value, "This is bold")
+
+    def test_link_basepath(self):
+        node = TextNode("Home", TextType.LINK, "/blog/tom")
+        html_node = text_node_to_html_node(node, "/SSG/")
+        self.assertEqual(html_node.props, {"href": "/SSG/blog/tom"})
+
+    def test_rewrite_url(self):
+        self.assertEqual(rewrite_url("/images/tom.png", "/SSG/"), "/SSG/images/tom.png")
+        self.assertEqual(rewrite_url("/images/tom.png", "/"), "/images/tom.png")
+        self.assertEqual(rewrite_url("https://boot.dev", "/SSG/"), "https://boot.dev")
+        self.assertEqual(rewrite_url("//cdn.example.com/a.js", "/SSG/"), "//cdn.example.com/a.js")
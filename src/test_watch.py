@@ -0,0 +1,92 @@
+import os
+import unittest
+from build_manifest import BuildManifest
+from watch import SiteWatcher, diff_stamps, scan_tree
+from site_test_case import SiteTestCase
+
+
+class TestScan(SiteTestCase):
+    def test_scan_tree_skips_tmp_files(self):
+        for rel_path in ("top.md", "a/b/deep.md", "a/b/deep.md.tmp"):
+            self.write(rel_path, "x" * len(rel_path))
+        stamps = scan_tree(self.root)
+        self.assertEqual(sorted(stamps), [self.path("a/b/deep.md"), self.path("top.md")])
+        self.assertEqual(stamps[self.path("top.md")][1], len("top.md"))
+
+    def test_scan_tree_missing_dir(self):
+        self.assertEqual(scan_tree(self.path("no-such-dir")), {})
+
+    def test_diff_stamps(self):
+        old = {"a": (1, 1), "b": (1, 1), "c": (1, 1)}
+        new = {"a": (1, 1), "b": (2, 1), "d": (1, 1)}
+        self.assertEqual(diff_stamps(old, new), (["b", "d"], ["c"]))
+        self.assertEqual(diff_stamps(new, new), ([], []))
+
+
+class TestSiteWatcher(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.dest = self.docs
+        self.write(self.template_path, "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post\n")
+        self.write(os.path.join(self.static, "images", "logo.png"), "png")
+        self.manifest = BuildManifest(self.path("manifest.json"))
+        self.watcher = SiteWatcher(self.content, self.static, self.template_path, self.dest, "/",
+                                   manifest=self.manifest)
+
+    def test_rebuild_content_and_static(self):
+        page = os.path.join(self.content, "blog", "post.md")
+        asset = os.path.join(self.static, "images", "logo.png")
+        self.assertEqual(self.watcher.rebuild([page, asset], []), 2)
+        self.assertEqual(self.read("docs/blog", "post.html"), "<title>Post</title><div><h1>Post</h1></div>")
+        self.assertEqual(self.read("docs/images", "logo.png"), "png")
+        # Only the changed page was built
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "index.html")))
+
+    def test_template_change_still_syncs_static(self):
+        asset = os.path.join(self.static, "images", "logo.png")
+        self.write(self.template_path, "<h2>{{ Title }}</h2>{{ Content }}")
+        self.assertEqual(self.watcher.rebuild([self.template_path, asset], []), 3)
+        self.assertEqual(self.read("docs/index.html"), "<h2>Home</h2><div><h1>Home</h1></div>")
+        self.assertEqual(self.read("docs/blog", "post.html"), "<h2>Post</h2><div><h1>Post</h1></div>")
+        self.assertEqual(self.read("docs/images", "logo.png"), "png")
+
+    def test_poll_picks_up_changes(self):
+        self.assertEqual(self.watcher.poll(), 0)  # First scan only takes stamps
+        self.write(os.path.join(self.content, "new.md"), "# New\n")
+        self.assertEqual(self.watcher.poll(), 1)
+        self.assertEqual(self.read("docs/new.html"), "<title>New</title><div><h1>New</h1></div>")
+        self.assertEqual(self.watcher.poll(), 0)
+
+    def test_after_rebuild(self):
+        calls = []
+        self.watcher.after_rebuild = lambda: calls.append(len(os.listdir(self.dest)))
+        self.watcher.poll()
+        self.assertEqual(self.watcher.poll(), 0)
+        self.assertEqual(calls, [])
+        self.write(os.path.join(self.content, "new.md"), "# New\n")
+        self.watcher.poll()
+        # Called once the outputs are in place
+        self.assertEqual(calls, [1])
+
+    def test_remove_output(self):
+        page = os.path.join(self.content, "blog", "post.md")
+        asset = os.path.join(self.static, "images", "logo.png")
+        self.watcher.rebuild([page, asset], [])
+        self.assertIn(page, self.manifest.entries)
+        os.remove(page)
+        os.remove(asset)
+        self.assertEqual(self.watcher.rebuild([], [page, asset]), 2)
+        # Emptied directories go with their last output
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog")))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "images")))
+        self.assertTrue(os.path.isdir(self.dest))
+        self.assertNotIn(page, self.manifest.entries)
+        # Nothing left to remove, and paths outside the sources are ignored
+        self.assertFalse(self.watcher.remove_output(page))
+        self.assertFalse(self.watcher.remove_output(os.path.join(self.root, "other.md")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -12,6 +12,8 @@ class TextType(Enum):
     
 
 class TextNode:
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text: str, text_type: TextType, url: str = None):
         self.text = text
         self.text_type = text_type
@@ -28,7 +30,14 @@ class TextNode:
         return f"TextNode({self.text}, {self.text_type.value}, {self.url})"
   
     
-def text_node_to_html_node(text_node: TextNode) -> LeafNode:
+def rewrite_url(url: str, basepath: str = "/") -> str:
+    """Prefix a root-relative URL ("/blog/tom") with `basepath` ("/SSG/")."""
+    if basepath == "/" or not url.startswith("/") or url.startswith("//"):
+        return url
+    return basepath + url[1:]
+
+
+def text_node_to_html_node(text_node: TextNode, basepath: str = "/") -> LeafNode:
     match text_node.text_type:
         case TextType.TEXT:
             return LeafNode(None, text_node.text)
@@ -39,8 +48,30 @@ def text_node_to_html_node(text_node: TextNode) -> LeafNode:
         case TextType.CODE:
             return LeafNode("code", text_node.text)
         case TextType.LINK:
-            return LeafNode("a", text_node.text, {"href": text_node.url})
+            return LeafNode("a", text_node.text, {"href": rewrite_url(text_node.url, basepath)})
         case TextType.IMAGE:
-            return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
+            return LeafNode("img", "", {"src": rewrite_url(text_node.url, basepath), "alt": text_node.text})
         case _:
             raise ValueError(f"invalid text type: {text_node.text_type}")
+
+
+def text_to_html(text: str, text_type: TextType, url: str = None, basepath: str = "/") -> str:
+    """
+    Render one inline token straight to HTML, exactly as
+    `text_node_to_html_node(...).to_html()` would, without building nodes.
+    """
+    match text_type:
+        case TextType.TEXT:
+            return text
+        case TextType.BOLD:
+            return f"<b>{text}</b>"
+        case TextType.ITALIC:
+            return f"<i>{text}</i>"
+        case TextType.CODE:
+            return f"<code>{text}</code>"
+        case TextType.LINK:
+            return f'<a href="{rewrite_url(url, basepath)}">{text}</a>'
+        case TextType.IMAGE:
+            return f'<img src="{rewrite_url(url, basepath)}" alt="{text}"></img>'
+        case _:
+            raise ValueError(f"invalid text type: {text_type}")
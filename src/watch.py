@@ -0,0 +1,196 @@
+import os
+import time
+from build_manifest import hash_text, remove_empty_dirs
+from copy_static import sync_file
+from front_matter import read_front_matter
+from generate_content import discover_pages, generate_page, page_dest_path
+from page_facts import PageFacts
+from templates import layouts_dir_for, template_cache
+
+
+def scan_tree(dir_path, stamps=None) -> dict[str, tuple[int, int]]:
+    """Map every file below `dir_path` to its (mtime_ns, size) stamp."""
+    if stamps is None:
+        stamps = {}
+    try:
+        entries = os.scandir(dir_path)
+    except FileNotFoundError:
+        return stamps
+    with entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                scan_tree(entry.path, stamps)
+            elif not entry.name.endswith(".tmp"):
+                stat = entry.stat()
+                stamps[entry.path] = (stat.st_mtime_ns, stat.st_size)
+    return stamps
+
+
+def diff_stamps(old: dict, new: dict) -> tuple[list[str], list[str]]:
+    """Return (changed or added, removed) paths between two scans."""
+    changed = [path for path, stamp in new.items() if old.get(path) != stamp]
+    removed = [path for path in old if path not in new]
+    return changed, removed
+
+
+class SiteWatcher:
+    """
+    Polls the site sources and rebuilds only what each change affects:
+    one page per markdown edit, one asset per static edit, and every page
+    when the template or anything under `layouts/` changes. No
+    dependencies beyond the stdlib.
+
+    `after_rebuild`, if given, is called after every poll that found
+    changes, e.g. to refresh the content index and the listings. The
+    `PageFacts` of the pages rebuilt since are in `facts`, by source path,
+    for `ContentIndex.store_facts`; whoever stores them clears it.
+    """
+
+    def __init__(self, dir_path_content, dir_path_static, template_path, dest_dir_path,
+                 basepath, manifest=None, link_mode="copy", engine="tree", after_rebuild=None):
+        self.dir_path_content = dir_path_content
+        self.dir_path_static = dir_path_static
+        self.template_path = template_path
+        self.dest_dir_path = dest_dir_path
+        self.basepath = basepath
+        self.manifest = manifest
+        self.link_mode = link_mode
+        self.engine = engine
+        self.after_rebuild = after_rebuild
+        self.dir_path_layouts = layouts_dir_for(template_path)
+        self.facts = {}
+        self.stamps = None  # Taken on the first poll, or when `run` starts
+
+    def scan(self) -> dict[str, tuple[int, int]]:
+        stamps = scan_tree(self.dir_path_content)
+        scan_tree(self.dir_path_static, stamps)
+        scan_tree(self.dir_path_layouts, stamps)
+        try:
+            stat = os.stat(self.template_path)
+            stamps[self.template_path] = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            pass
+        return stamps
+
+    def poll(self) -> int:
+        """Scan once and rebuild whatever changed. Returns the number of outputs touched."""
+        stamps = self.scan()
+        if self.stamps is None:
+            self.stamps = stamps
+            return 0
+        changed, removed = diff_stamps(self.stamps, stamps)
+        self.stamps = stamps
+        if not changed and not removed:
+            return 0
+        touched = self.rebuild(changed, removed)
+        if self.after_rebuild is not None:
+            self.after_rebuild()
+        return touched
+
+    def rebuild(self, changed, removed) -> int:
+        """
+        Rebuild what the given source paths affect: `changed` were added or
+        modified, `removed` no longer exist. Returns the number of outputs
+        touched.
+        """
+        touched = 0
+        layouts_changed = any(
+            path == self.template_path or self.is_under(path, self.dir_path_layouts)
+            for path in changed + removed
+        )
+        if layouts_changed:
+            pages = discover_pages(self.dir_path_content, self.dest_dir_path)
+            touched += sum(self.build_page(from_path, dest_path) for from_path, dest_path in pages)
+        else:
+            for path in changed:
+                if self.is_under(path, self.dir_path_content):
+                    dest_path = page_dest_path(path, self.dir_path_content, self.dest_dir_path)
+                    touched += self.build_page(path, dest_path)
+        # Assets do not depend on the layouts: sync them whatever else changed
+        for path in changed:
+            if self.is_under(path, self.dir_path_static):
+                touched += self.sync_asset(path)
+
+        for path in removed:
+            touched += self.remove_output(path)
+
+        if self.manifest is not None:
+            self.manifest.save()
+        return touched
+
+    def build_page(self, from_path, dest_path) -> bool:
+        meta = read_front_matter(from_path)
+        if meta.get("draft") is True:
+            # A page turned into a draft is no longer published
+            return self.remove_output(from_path)
+        # The cache recompiles a layout only if it (or a partial) changed
+        try:
+            template = template_cache.resolve_layout(from_path, self.dir_path_content, self.template_path,
+                                                     meta.get("layout"))
+        except FileNotFoundError as e:
+            print(f"Error generating {from_path}: {e}")
+            return False
+        facts = PageFacts()
+        ok = generate_page(from_path, template, dest_path, self.basepath, engine=self.engine, facts=facts)
+        # A page that failed has reported its error: nothing to index
+        self.facts[from_path] = facts if ok else PageFacts()
+        if ok and self.manifest is not None:
+            self.manifest.record(from_path, dest_path, hash_text(template.digest, self.basepath))
+        return ok
+
+    def sync_asset(self, from_path) -> bool:
+        rel_path = os.path.relpath(from_path, self.dir_path_static)
+        dest_path = os.path.join(self.dest_dir_path, rel_path)
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        status = sync_file(from_path, dest_path, self.link_mode)
+        print(f"Static: {from_path} -> {dest_path} ({status})")
+        return status != "unchanged"
+
+    def remove_output(self, path) -> bool:
+        if self.is_under(path, self.dir_path_content):
+            dest_path = page_dest_path(path, self.dir_path_content, self.dest_dir_path)
+            if self.manifest is not None:
+                self.manifest.forget(path)
+        elif self.is_under(path, self.dir_path_static):
+            dest_path = os.path.join(self.dest_dir_path, os.path.relpath(path, self.dir_path_static))
+        else:
+            return False
+        if not os.path.exists(dest_path):
+            return False
+        os.remove(dest_path)
+        remove_empty_dirs(os.path.dirname(dest_path), self.dest_dir_path)
+        print(f"Removed: {dest_path}")
+        return True
+
+    def source_path(self, path) -> str:
+        """
+        Spell `path` the way a scan would ("content/a.md" -> "./content/a.md"),
+        so it matches manifest entries and `is_under`.
+        """
+        if os.path.normpath(path) == os.path.normpath(self.template_path):
+            return self.template_path
+        for dir_path in (self.dir_path_content, self.dir_path_static, self.dir_path_layouts):
+            rel_path = os.path.relpath(path, dir_path)
+            if not rel_path.startswith(os.pardir):
+                return os.path.join(dir_path, rel_path)
+        return path
+
+    @staticmethod
+    def is_under(path, dir_path) -> bool:
+        # Scanned paths are always built by joining onto the watched directory
+        return path.startswith(os.path.join(dir_path, ""))
+
+    def run(self, interval=0.05):
+        print(f"Watching {self.dir_path_content}, {self.dir_path_static} and {self.template_path} (Ctrl+C to stop)")
+        if self.stamps is None:
+            self.stamps = self.scan()
+        try:
+            while True:
+                time.sleep(interval)
+                start = time.perf_counter()
+                touched = self.poll()
+                if touched:
+                    elapsed = (time.perf_counter() - start) * 1000
+                    print(f"Rebuilt {touched} output(s) in {elapsed:.1f} ms")
+        except KeyboardInterrupt:
+            print("Stopped watching")